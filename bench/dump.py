@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+""" benchmark for writing migrated objects
+
+compare peak memory and time of serializing the dict returned by dump(),
+with writing events from iter_dump() to files, for a synthetic 2.0 spec
+migrated to 3.0.0. Time is measured with tracemalloc enabled, which is
+much slower than usual.
+
+usage: python bench/dump.py [count of paths]
+"""
+
+from __future__ import absolute_import, print_function
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import six
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from pyopenapi.migration.batch import ConvertApp
+from pyopenapi.migration.getter import DictGetter
+from pyopenapi.migration.resolve import Resolver
+from pyopenapi.migration.writer import write_json, write_yaml
+
+URL = 'https://synthetic.com/swagger.json'
+
+
+def _synthetic(count):
+    paths = {}
+    for idx in six.moves.xrange(count):
+        paths['/resource{}/{{id}}'.format(idx)] = {
+            'get': {
+                'parameters': [{
+                    'name': 'id',
+                    'in': 'path',
+                    'required': True,
+                    'type': 'string'
+                }],
+                'responses': {
+                    '200': {
+                        'description': 'ok',
+                        'schema': {
+                            'type': 'object',
+                            'properties': {
+                                'id': {
+                                    'type': 'integer',
+                                    'format': 'int64'
+                                },
+                                'name': {
+                                    'type': 'string',
+                                    'description': 'name of resource'
+                                },
+                                'tags': {
+                                    'type': 'array',
+                                    'items': {
+                                        'type': 'string'
+                                    }
+                                },
+                            },
+                        }
+                    }
+                }
+            }
+        }
+
+    return {
+        'swagger': '2.0',
+        'info': {
+            'title': 'synthetic',
+            'version': '1.0'
+        },
+        'paths': paths,
+    }
+
+
+def _measure(name, write, path):
+    tracemalloc.start()
+    start = time.time()
+    with open(path, 'w') as handle:
+        write(handle)
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('{:24s} {:10.3f} s, peak {:10.1f} MiB, output {:8.1f} MiB'.format(
+        name, elapsed, peak / 1024.0 / 1024.0,
+        os.path.getsize(path) / 1024.0 / 1024.0))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app = ConvertApp.create(
+        URL,
+        '3.0.0',
+        resolver=Resolver(
+            default_getter=DictGetter([URL], {URL: _synthetic(count)})))
+
+    path = os.path.join(tempfile.mkdtemp(), 'out')
+    print('{} paths'.format(count))
+    _measure('json.dump(dump())', lambda h: json.dump(app.root.dump(), h),
+             path)
+    _measure('write_json', lambda h: write_json(app.root, h), path)
+    _measure('yaml.safe_dump(dump())',
+             lambda h: yaml.safe_dump(app.root.dump(), h), path)
+    _measure('write_yaml', lambda h: write_yaml(app.root, h), path)
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+""" benchmark of parsing documents in tests/data with each backend
+
+usage: python bench/getter.py [rounds]
+"""
+
+from __future__ import absolute_import, print_function
+import io
+import json
+import os
+import sys
+import timeit
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from pyopenapi.migration.getter import Getter
+
+DATA_FOLDER = os.path.join(
+    os.path.dirname(__file__), '..', 'pyopenapi', 'tests', 'data')
+
+
+def _corpus():
+    docs = {'json': [], 'yaml': []}
+    for root, _, names in os.walk(DATA_FOLDER):
+        for name in names:
+            _, ext = os.path.splitext(name)
+            if ext not in ('.json', '.yaml', '.yml'):
+                continue
+            with io.open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                docs['json' if ext == '.json' else 'yaml'].append(f.read())
+    return docs
+
+
+def _backends():
+    json_backends = [('json', json.loads)]
+    for name in ('orjson', 'ujson'):
+        try:
+            json_backends.append((name, __import__(name).loads))
+        except ImportError:
+            print('{} is not installed, skipped'.format(name))
+
+    yaml_backends = [('yaml.SafeLoader',
+                      lambda doc: yaml.load(doc, Loader=yaml.SafeLoader))]
+    if hasattr(yaml, 'CSafeLoader'):
+        yaml_backends.append(
+            ('yaml.CSafeLoader',
+             lambda doc: yaml.load(doc, Loader=yaml.CSafeLoader)))
+    else:
+        print('libyaml is not available, yaml.CSafeLoader skipped')
+
+    return json_backends, yaml_backends
+
+
+def _measure(name, loads, docs, rounds):
+    def _run():
+        for doc in docs:
+            loads(doc)
+
+    elapsed = min(timeit.repeat(_run, number=1, repeat=rounds))
+    print('{:>18}: {:4d} documents, {:10.3f} ms, {:8.3f} ms/doc'.format(
+        name, len(docs), elapsed * 1000, elapsed * 1000 / len(docs)))
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    docs = _corpus()
+    json_backends, yaml_backends = _backends()
+
+    print('-- json documents')
+    for name, loads in json_backends + yaml_backends:
+        _measure(name, loads, docs['json'], rounds)
+    _measure('Getter.parse', Getter.parse, docs['json'], rounds)
+
+    print('-- yaml documents')
+    for name, loads in yaml_backends:
+        _measure(name, loads, docs['yaml'], rounds)
+    _measure('Getter.parse', Getter.parse, docs['yaml'], rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+""" benchmark for interning parsed documents
+
+compare memory kept by parsed documents, and time of accessing fields of
+2.0 Schema objects built from them, with and without a FragmentInterner,
+for a synthetic spec in JSON and YAML.
+
+usage: python bench/ingest.py [count of definitions]
+"""
+
+from __future__ import absolute_import, print_function
+import gc
+import json
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+import six
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from pyopenapi.migration.getter import DictGetter
+from pyopenapi.migration.spec import FragmentInterner
+from pyopenapi.migration.versions.v2_0.objects import Schema
+
+
+def _synthetic(count):
+    definitions = {}
+    for idx in six.moves.xrange(count):
+        definitions['Model{}'.format(idx)] = {
+            'type': 'object',
+            'required': ['id', 'name'],
+            'properties': {
+                'id': {
+                    'type': 'integer',
+                    'format': 'int64'
+                },
+                'name': {
+                    'type': 'string',
+                    'description': 'name of model {}'.format(idx)
+                },
+                'createdAt': {
+                    'type': 'string',
+                    'format': 'date-time'
+                },
+                'owner': {
+                    '$ref': '#/definitions/User'
+                },
+            },
+        }
+
+    return {'swagger': '2.0', 'definitions': definitions}
+
+
+def _load(doc, interner):
+    getter = DictGetter(['/bench/swagger'], {'/bench/swagger': doc})
+    getter.interner = interner
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+    ret = next(getter)
+    elapsed = time.time() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ret, elapsed, current
+
+
+def _fields(spec):
+    schemas = [
+        Schema(s) for d in six.itervalues(spec['definitions'])
+        for s in six.itervalues(d['properties'])
+    ]
+
+    def _access():
+        for schema in schemas:
+            _ = schema.type, schema.format, schema.description
+
+    return min(timeit.repeat(_access, number=5, repeat=3))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    raw = _synthetic(count)
+    print('{} definitions'.format(count))
+    for fmt, doc in (('json', json.dumps(raw)), ('yaml', yaml.safe_dump(raw))):
+        for name, interner in (('plain', None), ('interned',
+                                                 FragmentInterner())):
+            spec, elapsed, kept = _load(doc, interner)
+            print('{} {:10s} parse {:8.3f} s, kept {:8.1f} MiB, '
+                  'fields {:8.3f} s'.format(fmt, name, elapsed,
+                                           kept / 1024.0 / 1024.0,
+                                           _fields(spec)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+""" benchmark for interning fragments of migrated specs
+
+compare memory kept by migrated objects, and time of migration, with and
+without 'intern_fragments', for a synthetic 2.0 spec with fragments
+repeated in each path. Time is measured with tracemalloc enabled, which
+is much slower than usual.
+
+usage: python bench/intern.py [count of paths]
+"""
+
+from __future__ import absolute_import, print_function
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from pyopenapi.migration.batch import ConvertApp
+from pyopenapi.migration.getter import DictGetter
+from pyopenapi.migration.resolve import Resolver
+
+URL = 'https://synthetic.com/swagger.json'
+
+
+def _synthetic(count):
+    paths = {}
+    for idx in six.moves.xrange(count):
+        paths['/resource{}/{{id}}'.format(idx)] = {
+            'get': {
+                'produces': ['application/json'],
+                'parameters': [{
+                    'name': 'id',
+                    'in': 'path',
+                    'required': True,
+                    'type': 'string'
+                }, {
+                    'name': 'limit',
+                    'in': 'query',
+                    'type': 'integer',
+                    'format': 'int32'
+                }],
+                'responses': {
+                    '200': {
+                        'description': 'ok',
+                        'schema': {
+                            'type': 'object',
+                            'properties': {
+                                'id': {
+                                    'type': 'integer',
+                                    'format': 'int64'
+                                },
+                                'name': {
+                                    'type': 'string',
+                                    'description': 'name of resource'
+                                },
+                                'tags': {
+                                    'type': 'array',
+                                    'items': {
+                                        'type': 'string'
+                                    }
+                                },
+                            },
+                        }
+                    },
+                    'default': {
+                        'description': 'error',
+                        'schema': {
+                            'type': 'object',
+                            'properties': {
+                                'code': {
+                                    'type': 'integer'
+                                },
+                                'message': {
+                                    'type': 'string'
+                                },
+                            },
+                        }
+                    }
+                }
+            }
+        }
+
+    return {
+        'swagger': '2.0',
+        'info': {
+            'title': 'synthetic',
+            'version': '1.0'
+        },
+        'paths': paths,
+    }
+
+
+def _measure(name, count, **kwargs):
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+    app = ConvertApp.create(
+        URL,
+        '3.0.0',
+        resolver=Resolver(
+            default_getter=DictGetter([URL], {URL: _synthetic(count)})),
+        **kwargs)
+    elapsed = time.time() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('{:12s} {:10.3f} s, kept {:10.1f} MiB, peak {:10.1f} MiB'.format(
+        name, elapsed, current / 1024.0 / 1024.0, peak / 1024.0 / 1024.0))
+    return app
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print('{} paths'.format(count))
+    _measure('plain', count)
+    app = _measure('interned', count, intern_fragments=True)
+    print('{} shared fragments, {} hits'.format(
+        len(app.fragment_interner), app.fragment_interner.hits))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+""" benchmark for loading large local documents
+
+compare peak RSS and time of parsing large synthetic JSON documents by
+LocalGetter, read into a string or memory-mapped. Each one is measured in
+a new process, peak RSS includes pages of the mapped file. Documents are
+parsed without decoding to a string only when orjson is installed.
+
+ - models: many small schemas, parsed objects are much larger than text
+ - descriptions: schemas with long descriptions
+
+usage: python bench/load.py [size in MiB]
+"""
+
+from __future__ import absolute_import, print_function
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from pyopenapi.migration.getter import LocalGetter
+
+
+def _model(idx):
+    return {
+        'type': 'object',
+        'description': u'model {} \u4e2d\u6587'.format(idx),
+        'properties': {
+            'id': {
+                'type': 'integer',
+                'format': 'int64'
+            },
+            'name': {
+                'type': 'string'
+            },
+        },
+    }
+
+
+def _description(idx):
+    return {
+        'type': 'object',
+        'description': u'model {} \u4e2d\u6587 '.format(idx) + 'x' * 2000,
+    }
+
+
+def _synthetic(path, size, make):
+    with io.open(path, 'w', encoding='utf-8') as handle:
+        handle.write(u'{"swagger": "2.0", "definitions": {')
+        idx, written = 0, 0
+        while written < size:
+            chunk = json.dumps(make(idx), ensure_ascii=False)
+            handle.write(u'{}"Model{}": {}'.format(u',' if idx else u'', idx,
+                                                   chunk))
+            idx += 1
+            written += len(chunk)
+        handle.write(u'}}')
+
+
+def _child(path, mode):
+    getter = LocalGetter(path)
+    getter.mmap_threshold = 1 if mode == 'mmap' else None
+
+    start = time.time()
+    obj = next(getter)
+    elapsed = time.time() - start
+
+    # in KiB on linux, in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak /= 1024.0
+    print('{:6s} {:8.3f} s, peak RSS {:8.1f} MiB, {} definitions'.format(
+        mode, elapsed, peak / 1024.0, len(obj['definitions'])))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        _child(sys.argv[2], sys.argv[3])
+        return
+
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, 'swagger.json')
+        for name, make in (('models', _model), ('descriptions',
+                                                 _description)):
+            _synthetic(path, int(size * 1024 * 1024), make)
+            print('{}, {:.1f} MiB'.format(
+                name, os.path.getsize(path) / 1024.0 / 1024.0))
+            for mode in ('read', 'mmap'):
+                six.print_(
+                    subprocess.check_output(
+                        [sys.executable, __file__, '--child', path, mode])
+                    .decode('utf-8').strip())
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
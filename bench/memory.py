@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+""" memory benchmark for constructing spec objects
+
+measure memory allocated by objects of the bitbucket spec and a
+synthetic spec with lots of schemas, in eager and lazy construction,
+and compare it with a baseline revision, by default the one before spec
+objects kept their attributes in __slots__ instead of __dict__. Each
+tree is measured in its own process.
+
+usage: python bench/memory.py [--baseline revision] [count of schemas in synthetic spec]
+"""
+
+from __future__ import absolute_import, print_function
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import tracemalloc
+
+import six
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+BITBUCKET = os.path.join(ROOT, 'pyopenapi', 'tests', 'data', 'v2_0',
+                         'bitbucket', 'swagger.json')
+
+
+def _synthetic(count):
+    definitions = {}
+    for idx in six.moves.xrange(count):
+        definitions['Model{}'.format(idx)] = {
+            'type': 'object',
+            'required': ['id'],
+            'properties': {
+                'id': {
+                    'type': 'integer',
+                    'format': 'int64'
+                },
+                'name': {
+                    'type': 'string'
+                },
+                'tags': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'string'
+                    }
+                },
+                'parent': {
+                    '$ref': '#/definitions/Model{}'.format(max(idx - 1, 0))
+                },
+            },
+        }
+
+    return {
+        'swagger': '2.0',
+        'info': {
+            'title': 'synthetic',
+            'version': '1.0'
+        },
+        'paths': {},
+        'definitions': definitions,
+    }
+
+
+def _touch_all(obj):
+    """ visit all objects to materialize lazy ones """
+    count = 1
+    for chd in six.itervalues(obj.get_children()):
+        count += _touch_all(chd)
+    return count
+
+
+def _measure(spec, lazy):
+    # imported here to measure the tree in sys.path
+    # pylint: disable=import-outside-toplevel
+    from pyopenapi.migration.spec import lazy_construction
+    from pyopenapi.migration.versions.v2_0.objects import Swagger
+
+    tracemalloc.start()
+    with lazy_construction(lazy):
+        root = Swagger(spec, path='#')
+    built, _ = tracemalloc.get_traced_memory()
+    count = _touch_all(root)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(built=built, current=current, peak=peak, count=count)
+
+
+def _measure_all(count):
+    with open(BITBUCKET, 'r') as handle:
+        bitbucket = json.load(handle)
+    synthetic = _synthetic(count)
+
+    ret = []
+    for lazy in (False, True):
+        for name, spec in (('bitbucket', bitbucket), ('synthetic', synthetic)):
+            result = _measure(spec, lazy)
+            result.update(name=name, lazy=lazy)
+            ret.append(result)
+    return ret
+
+
+def _default_baseline():
+    """ the revision before __slots__ were added to spec objects """
+    revs = subprocess.check_output(
+        [
+            'git', 'log', '--reverse', '--format=%H',
+            "-Sspc.setdefault('__slots__', ())", '--',
+            'pyopenapi/migration/spec/obj.py'
+        ],
+        cwd=ROOT).decode('utf-8').split()
+    return revs[0] + '^'
+
+
+def _run(path, count):
+    """ measure the pyopenapi under 'path' in another process """
+    out = subprocess.check_output([
+        sys.executable,
+        os.path.abspath(__file__), '--measure', '--path', path,
+        str(count)
+    ])
+    return json.loads(out.decode('utf-8'))
+
+
+def _mb(size):
+    return size / 1024.0 / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('count', nargs='?', type=int, default=100000)
+    parser.add_argument('--baseline', default=None)
+    parser.add_argument('--measure', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--path', default=ROOT, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        sys.path.insert(0, args.path)
+        print(json.dumps(_measure_all(args.count)))
+        return
+
+    baseline = args.baseline or _default_baseline()
+    folder = tempfile.mkdtemp()
+    try:
+        archive = subprocess.check_output(
+            ['git', 'archive', baseline, 'pyopenapi'], cwd=ROOT)
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(folder)
+        before = _run(folder, args.count)
+    finally:
+        shutil.rmtree(folder)
+    after = _run(ROOT, args.count)
+
+    print('baseline: {}'.format(baseline))
+    for old, new in zip(before, after):
+        old_per, new_per = [
+            float(r['current']) / r['count'] for r in (old, new)
+        ]
+        print('{:>10} {:>5}: {} objects\n'
+              '    after construction {:8.2f} MB -> {:8.2f} MB\n'
+              '    current/peak       {:8.2f} MB / {:8.2f} MB -> '
+              '{:8.2f} MB / {:8.2f} MB\n'
+              '    per object         {:8.1f} B -> {:8.1f} B ({:+.1f}%)'.format(
+                  new['name'], 'lazy' if new['lazy'] else 'eager',
+                  new['count'], _mb(old['built']), _mb(new['built']),
+                  _mb(old['current']), _mb(old['peak']), _mb(new['current']),
+                  _mb(new['peak']), old_per, new_per,
+                  (new_per - old_per) * 100 / old_per))
+
+
+if __name__ == '__main__':
+    main()
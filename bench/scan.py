@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+""" benchmark for dispatching in scan.scan
+
+scan the 2.0 bitbucket spec repeatedly, compare the scan we used
+before, which visited every node, with the pruned traversal skipping
+subtrees where no handler could be reached.
+
+usage: python bench/scan.py [rounds]
+"""
+
+from __future__ import absolute_import, print_function
+import os
+import sys
+import timeit
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from pyopenapi.migration.scan import (
+    DispatcherMeta,
+    Dispatcher,
+    default_tree_traversal,
+    scan,
+)
+from pyopenapi.migration.versions.v2_0.objects import (
+    Operation,
+    Parameter,
+    PathItem,
+    Response,
+    Schema,
+)
+from pyopenapi.migration.versions.v2_0.scanner import NormalizeRef, YamlFixer
+from pyopenapi.tests.utils import get_test_data_folder, SampleApp
+
+
+class _Count(object):
+    class Disp(Dispatcher):
+        pass
+
+    def __init__(self):
+        self.total = 0
+
+    @Disp.register([Schema, Parameter, Response, Operation, PathItem])
+    def _count(self, _, __):
+        self.total += 1
+
+
+def _legacy_scan(route, root, nexter=default_tree_traversal, leaves=None):
+    merged_r = []
+    for r in route:
+        for obj in six.itervalues(vars(r.__class__)):
+            if isinstance(obj, DispatcherMeta):
+                merged_r.append((r, obj.obj_route, obj.result_fn[0]))
+                break
+
+    for path, obj in nexter(root, leaves or []):
+        for the_self, obj_route, res in merged_r:
+            funcs = obj_route.get(obj.__class__, None)
+            if not funcs:
+                continue
+            for handler in funcs:
+                ret = handler(the_self, path, obj)
+                if res:
+                    res(the_self, ret)
+
+
+def _run(name, scanner, root, routes, rounds):
+    def _scan():
+        scanner(route=routes(), root=root)
+
+    elapsed = timeit.timeit(_scan, number=rounds)
+    print('{:>8}: {:10.3f} ms/scan'.format(name, elapsed * 1000 / rounds))
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    app = SampleApp.create(
+        get_test_data_folder(version='2.0', which='bitbucket'),
+        to_spec_version='2.0')
+
+    # warm up caches of children
+    for _ in default_tree_traversal(app.root, []):
+        pass
+
+    cases = [
+        ('NormalizeRef + counting',
+         lambda: [NormalizeRef(app.url), _Count()]),
+        ('YamlFixer', lambda: [YamlFixer()]),
+    ]
+    for case, routes in cases:
+        print('scan bitbucket {} times, {}'.format(rounds, case))
+        _run('legacy', _legacy_scan, app.root, routes, rounds)
+        _run('current', scan, app.root, routes, rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+""" micro-benchmark for SpecObjStore.get_under
+
+compare enumeration/removal of descendants of a JSON pointer between
+the linear scan we used before and the JSON pointer index.
+
+usage: python bench/store.py [count of cached objects]
+"""
+
+from __future__ import absolute_import, print_function
+import os
+import sys
+import timeit
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from pyopenapi.migration.spec import _Base
+from pyopenapi.migration.store import SpecObjStore
+
+URL = 'http://localhost/swagger.json'
+VERSION = '2.0'
+PROPERTIES_PER_SCHEMA = 9
+
+
+def _jps(count):
+    for idx in six.moves.xrange(count // (PROPERTIES_PER_SCHEMA + 1)):
+        base = '#/definitions/Model{}'.format(idx)
+        yield base
+        for prop in six.moves.xrange(PROPERTIES_PER_SCHEMA):
+            yield base + '/properties/p{}'.format(prop)
+
+
+class _LinearStore(object):
+    """ the layout of SpecObjStore before indexing: url -> jp -> version -> obj
+    """
+
+    def __init__(self):
+        self.spec_objs = {}
+
+    def set(self, obj, url, jp, spec_version):
+        self.spec_objs.setdefault(url, {}).setdefault(jp, {}).update({
+            spec_version:
+            obj
+        })
+
+    def get_under(self, url, jp, spec_version, remove=True):
+        url_cache = self.spec_objs.get(url, None)
+        if not url_cache:
+            return None
+
+        ret = {}
+        for path, cache in six.iteritems(url_cache):
+            if path.startswith(jp) and spec_version in cache:
+                ret[path[len(jp) + 1:]] = cache[spec_version]
+                if remove:
+                    del cache[spec_version]
+
+        return ret
+
+
+def _fill(store, count):
+    obj = _Base({})
+    for jp in _jps(count):
+        store.set(obj, URL, jp, VERSION)
+    return store
+
+
+def _run(name, factory, count, number):
+    targets = [
+        '#/definitions/Model{}'.format(idx)
+        for idx in six.moves.xrange(number)
+    ]
+    store = _fill(factory(), count)
+
+    def _enum():
+        for jp in targets:
+            store.get_under(URL, jp, VERSION, remove=False)
+
+    def _remove():
+        for jp in targets:
+            store.get_under(URL, jp, VERSION, remove=True)
+
+    enum = timeit.timeit(_enum, number=1)
+    remove = timeit.timeit(_remove, number=1)
+    print('{:>8}: enumerate {:10.6f} ms/call, remove {:10.6f} ms/call'.format(
+        name, enum * 1000 / number, remove * 1000 / number))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    number = 200
+
+    print('get_under over {} cached objects, {} calls each'.format(
+        count, number))
+    _run('linear', _LinearStore, count, number)
+    _run('indexed', SpecObjStore, count, number)
+
+
+if __name__ == '__main__':
+    main()
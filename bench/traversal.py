@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+""" benchmark for scan.default_tree_traversal
+
+compare nodes/sec of the traversal we used before, which composed
+paths via map/lambda and '/'.join, with the current one.
+
+usage: python bench/traversal.py [rounds]
+"""
+
+from __future__ import absolute_import, print_function
+import os
+import sys
+import timeit
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from pyopenapi.migration.scan import default_tree_traversal
+from pyopenapi.tests.utils import get_test_data_folder, SampleApp
+
+
+def _legacy_tree_traversal(root, leaves):
+    objs = [('#', root)]
+    while objs:
+        path, obj = objs.pop()
+        if obj.__class__ not in leaves:
+            objs.extend(
+                map(lambda i: ('/'.join([path, i[0]]), i[1]),
+                    six.iteritems(obj.get_children())))
+        yield path, obj
+
+
+def _run(name, nexter, root, rounds):
+    count = [0]
+
+    def _walk():
+        for _ in nexter(root, []):
+            count[0] += 1
+
+    elapsed = timeit.timeit(_walk, number=rounds)
+    print('{:>8}: {:12.0f} nodes/sec'.format(name, count[0] / elapsed))
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    app = SampleApp.create(
+        get_test_data_folder(version='2.0', which='bitbucket'),
+        to_spec_version='3.0.0')
+
+    # warm up caches of children
+    for _ in default_tree_traversal(app.root, []):
+        pass
+
+    print('traverse bitbucket {} times'.format(rounds))
+    _run('legacy', _legacy_tree_traversal, app.root, rounds)
+    _run('current', default_tree_traversal, app.root, rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+""" benchmark for ApiBase.update_obj
+
+replace a schema of a synthetic 2.0 spec migrated to 3.0.0, and compare
+with creating the whole app again.
+
+usage: python bench/update.py [count of paths]
+"""
+
+from __future__ import absolute_import, print_function
+import copy
+import os
+import sys
+import timeit
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from pyopenapi.migration.getter import DictGetter
+from pyopenapi.migration.resolve import Resolver
+from pyopenapi.tests.utils import SampleApp
+
+URL = 'https://synthetic.com/swagger.json'
+PATHS_PER_SCHEMA = 10
+
+
+def _synthetic(count):
+    paths, definitions = {}, {}
+    for idx in six.moves.xrange(count):
+        paths['/resource{}'.format(idx)] = {
+            'get': {
+                'responses': {
+                    '200': {
+                        'description': 'ok',
+                        'schema': {
+                            '$ref':
+                            '#/definitions/Model{}'.format(
+                                idx // PATHS_PER_SCHEMA)
+                        }
+                    }
+                }
+            }
+        }
+
+    for idx in six.moves.xrange(count // PATHS_PER_SCHEMA):
+        definitions['Model{}'.format(idx)] = {
+            'type': 'object',
+            'properties': {
+                'id': {
+                    'type': 'integer'
+                },
+                'name': {
+                    'type': 'string'
+                },
+            },
+        }
+
+    return {
+        'swagger': '2.0',
+        'info': {
+            'title': 'synthetic',
+            'version': '1.0'
+        },
+        'paths': paths,
+        'definitions': definitions,
+    }
+
+
+def _create(spec):
+    return SampleApp.create(
+        URL,
+        resolver=Resolver(default_getter=DictGetter([URL], {URL: spec})),
+        to_spec_version='3.0.0')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    spec = _synthetic(count)
+
+    created = timeit.timeit(lambda: _create(copy.deepcopy(spec)), number=1)
+    app = _create(copy.deepcopy(spec))
+
+    number = 50
+    schema = {'type': 'object', 'properties': {'id': {'type': 'string'}}}
+
+    def _update():
+        app.update_obj('#/definitions/Model1', copy.deepcopy(schema))
+
+    updated = timeit.timeit(_update, number=number)
+
+    print('{} paths: create {:10.3f} ms, update one schema {:10.3f} ms'.format(
+        count, created * 1000, updated * 1000 / number))
+
+
+if __name__ == '__main__':
+    main()
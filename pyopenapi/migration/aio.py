@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+""" asyncio API: documents are fetched concurrently without blocking the
+event loop, while parsing, constructing and migrating objects, which are
+CPU-bound, run in an executor. It requires python 3.5 or later.
+
+Calls on the same App should not overlap, while Apps loading/migrating at
+the same time, ex. hot-reloading specs, are fine.
+"""
+
+from __future__ import absolute_import
+import asyncio
+import functools
+import logging
+
+import six
+
+from ..utils import jr_split
+from .getter import Getter
+from .resolve import _external_urls
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGetter(Getter):
+    """ base of getters loading documents asynchronously, override 'aload'
+    to return an awaitable. Loaded documents are parsed in 'executor'.
+
+    It's still an iterator: 'load' runs 'aload' in a new event loop,
+    which is only possible in threads without a running event loop.
+    """
+
+    executor = None
+    """ an instance of concurrent.futures.Executor to parse documents,
+    the default executor of the event loop is used when None.
+    """
+
+    def __init__(self, path):
+        super(AsyncGetter, self).__init__(path)
+        self.urls = [path]
+
+    def load(self, path):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.aload(path))
+        finally:
+            loop.close()
+
+    def aload(self, path):
+        """ load the resource asynchronously, and return for parsing.
+
+        :return: an awaitable, ex. a coroutine
+        """
+        raise NotImplementedError()
+
+    async def load_next(self):
+        """ the asynchronous version of next()
+        """
+        if not self.urls:
+            raise StopAsyncIteration
+
+        path = self.urls.pop(0)
+        raw = self._check_raw(await self.aload(path))
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, self._parse_raw, path, raw)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.load_next()
+
+
+async def _load(resolver, url, getter, executor):
+    # pylint: disable=protected-access
+    getter = resolver._getter(url, getter)
+    if isinstance(getter, AsyncGetter):
+        obj = await getter.load_next()
+    else:
+        # getters blocking on IO are run in executor
+        obj = await asyncio.get_event_loop().run_in_executor(
+            executor, six.advance_iterator, getter)
+    return obj, getattr(getter, 'last_stamp', None)
+
+
+async def fetch(resolver, url, getter=None, concurrency=8, executor=None):
+    """ load a document and external documents it references, transitively
+    and concurrently, into the cache of a resolver. Failures of external
+    documents are left to the time they are really resolved.
+
+    args:
+     - resolver: pyopenapi.migration.resolve.Resolver
+     - url: the url of the document
+     - getter: the getter to load the document, the default one of the
+               resolver is used for external documents
+     - concurrency: the count of documents loaded at the same time
+     - executor: concurrent.futures.Executor to run sync getters and parse
+                 documents, the default executor of the event loop is
+                 used when None
+
+    :return: the document
+    """
+    url, _ = jr_split(url)
+    loop = asyncio.get_event_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _fetch(target, target_getter):
+        async with semaphore:
+            obj, stamp = await _load(resolver, target, target_getter,
+                                     executor)
+
+        refs = set()
+        if obj:
+            refs = await loop.run_in_executor(executor, _external_urls, obj,
+                                              target)
+        return target, obj, stamp, refs
+
+    async def _try_fetch(target):
+        try:
+            return await _fetch(target, None)
+        except Exception:  # pylint: disable=broad-except
+            logger.info('unable to fetch: %s', target, exc_info=True)
+            return target, None, None, set()
+
+    doc = resolver.get_document(url)
+    if doc:
+        refs = await loop.run_in_executor(executor, _external_urls, doc, url)
+    else:
+        _, doc, stamp, refs = await _fetch(url, getter)
+        if not doc:
+            raise Exception('Unable to resolve: {0}'.format(url))
+        resolver.set_document(url, doc, stamp)
+
+    # documents are fetched once they are found, rather than level by level
+    scheduled, tasks = set(), set()
+
+    def _schedule(targets):
+        for target in targets:
+            if target in scheduled or resolver.get_document(target):
+                continue
+            scheduled.add(target)
+            tasks.add(asyncio.ensure_future(_try_fetch(target)))
+
+    _schedule(refs)
+    try:
+        while tasks:
+            done, tasks = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                target, obj, stamp, refs = task.result()
+                if obj:
+                    resolver.set_document(target, obj, stamp)
+                    _schedule(refs)
+    finally:
+        # ex. cancelled
+        for task in tasks:
+            task.cancel()
+
+    return doc
+
+
+async def resolve(resolver, jref, getter=None, concurrency=8, executor=None):
+    """ the same as Resolver.resolve, but documents are fetched by 'fetch'
+    """
+    await fetch(
+        resolver,
+        jref,
+        getter=getter,
+        concurrency=concurrency,
+        executor=executor)
+    return resolver.resolve(jref, getter)
+
+
+async def load_obj(app,
+                   jref,
+                   getter=None,
+                   parser=None,
+                   remove_dummy=False,
+                   executor=None):
+    """ the same as ApiBase.load_obj, but documents are fetched by 'fetch',
+    and objects are constructed in 'executor'.
+    """
+    await fetch(app.resolver, jref, getter=getter, executor=executor)
+    return await asyncio.get_event_loop().run_in_executor(
+        executor,
+        functools.partial(
+            app.load_obj,
+            jref,
+            getter=getter,
+            parser=parser,
+            remove_dummy=remove_dummy))
+
+
+async def migrate_obj(app, obj, jref, spec_version, executor=None):
+    """ the same as ApiBase.migrate_obj, but run in 'executor'. External
+    documents are fetched by 'load_obj' before.
+    """
+    return await asyncio.get_event_loop().run_in_executor(
+        executor, app.migrate_obj, obj, jref, spec_version)
+
+
+async def resolve_obj(app,
+                      jref,
+                      from_spec_version,
+                      parser=None,
+                      to_spec_version=None,
+                      remove_dummy=False,
+                      executor=None):
+    """ the same as ApiBase.resolve_obj, but documents are fetched by
+    'fetch', and objects are constructed and migrated in 'executor'.
+    """
+    url, _ = jr_split(jref)
+    if url:
+        await fetch(app.resolver, url, executor=executor)
+
+    return await asyncio.get_event_loop().run_in_executor(
+        executor,
+        functools.partial(
+            app.resolve_obj,
+            jref,
+            from_spec_version,
+            parser=parser,
+            to_spec_version=to_spec_version,
+            remove_dummy=remove_dummy))
@@ -3,38 +3,76 @@
 from __future__ import absolute_import
 
 import abc
+import contextlib
 import logging
 import pkgutil
 import weakref
 import os
+from multiprocessing import Pool
 from distutils.version import StrictVersion  # pylint: disable=no-name-in-module,import-error
 
 import six
 from .. import utils, consts
-from .resolve import Resolver
-from .store import SpecObjStore
+from . import snapshot
+from .resolve import Resolver, iter_refs
+from .scan import scan, default_tree_traversal
+from .spec import (
+    lazy_construction,
+    collect_refs,
+    interned_by,
+    FragmentInterner,
+)
+from .store import SpecObjStore, RefIndex
 from .versions.v1_2.objects import ResourceListing, ApiDeclaration
 from .versions.v2_0.objects import Swagger
+from .versions.v2_0.scanner import Merge as Merge_2_0
 from .versions.v3_0_0.objects import OpenApi
+from .versions.v3_0_0.scanner import Merge as Merge_3_0_0
+from .versions.v3_0_0.main import is_upgradable as is_upgradable_3_0_0
 
 logger = logging.getLogger(__name__)
 
+# scanners to merge path items referencing others, by spec version
+_MERGERS = {
+    '2.0': Merge_2_0,
+    '3.0.0': Merge_3_0_0,
+}
+
+# spec version -> a function to check if an object could be migrated
+# to this version alone
+_UPGRADABLE = {
+    '3.0.0': is_upgradable_3_0_0,
+}
+
 
 class ApiBase(six.with_metaclass(abc.ABCMeta, object)):
     """
     """
 
+    __snapshot_fields__ = ()
+    """ names of attributes of subclasses to be kept in snapshots
+    along with loaded objects, ex. the root object
+    """
+
     def __init__(self,
                  url=None,
                  url_load_hook=None,
                  resolver=None,
-                 sep=consts.SCOPE_SEPARATOR):
+                 sep=consts.SCOPE_SEPARATOR,
+                 lazy=False,
+                 processes=None,
+                 spec_obj_store=None,
+                 intern_fragments=False):
         """ constructor
 
         :param url str: url of swagger.json
         :param func url_load_hook: a way to redirect url to a accessible place. for self testing.
         :param resolver: pyopenapi.resolve.Resolver: customized resolver used as default when none is provided when resolving
         :param sep str: separator used by pyopenapi.migration.utils.ScopeDict
+        :param lazy bool: build children of loaded objects on first access
+        :param processes int: migrate independent external documents in a pool of processes of this size
+        :param spec_obj_store: pyopenapi.migration.store.SpecObjStore: shared with other instances
+        :param intern_fragments bool: share strings and identical fragments of migrated specs, and those of parsed documents when no resolver is provided, to save memory
         """
 
         self.__original_spec_version = ''
@@ -54,7 +92,7 @@ class ApiBase(six.with_metaclass(abc.ABCMeta, object)):
         #
         # and a map from json-reference in older OpenApi spec
         # to json-reference in migrated OpenApi spec
-        self.__store = SpecObjStore(
+        self.__store = spec_obj_store or SpecObjStore(
             migratable_spec_versions=self.migratable_spec_versions)
 
         if url_load_hook and resolver:
@@ -62,12 +100,36 @@ class ApiBase(six.with_metaclass(abc.ABCMeta, object)):
                 'when use customized Resolver, please pass url_load_hook to that one'
             )
 
+        # share identical fragments of parsed documents and migrated specs,
+        # along with the resolver provided
+        self.__interner = None
+        if intern_fragments:
+            self.__interner = getattr(resolver, 'interner', None)
+            if self.__interner is None:
+                self.__interner = FragmentInterner()
+
         # the start-point when you want to traverse the code to laod new object
-        self.__resolver = resolver or Resolver(url_load_hook)
+        self.__resolver = resolver or Resolver(
+            url_load_hook, interner=self.__interner)
 
         # allow init App-wised SCOPE_SEPARATOR
         self.__sep = sep
 
+        # stamps of source documents restored from snapshot
+        self.__snapshot_sources = {}
+
+        # construction mode of loaded objects
+        self.__lazy = lazy
+
+        # objects with '$ref', collected when constructing
+        self.__ref_index = RefIndex()
+
+        # size of process pool for migration, the pool is shared by
+        # nested migrations and closed when the outermost one is done
+        self.__processes = processes
+        self.__pool = None
+        self.__migrating = 0
+
     @property
     def sep(self):
         """ separator used by pyswager.utils.ScopeDict
@@ -120,9 +182,41 @@ class ApiBase(six.with_metaclass(abc.ABCMeta, object)):
         """
         return self.__store
 
+    @property
+    def fragment_interner(self):
+        """ interner of parsed documents and migrated fragments, None
+        when 'intern_fragments' is not enabled
+
+        :type: pyopenapi.migration.spec.intern.FragmentInterner
+        """
+        return self.__interner
+
+    @property
+    def ref_index(self):
+        """ index of objects with '$ref' by normalized references, for
+        objects loaded and migrated by this instance.
+
+        :rtype: pyopenapi.migration.store.RefIndex
+        """
+        return self.__ref_index
+
+    @contextlib.contextmanager
+    def __collect_refs(self, url):
+        # objects are told which interner their raw specs might be shared by
+        interner = self.__interner
+        if interner is None:
+            interner = getattr(self.__resolver, 'interner', None)
+        with collect_refs(self.__ref_index.collector(url)), \
+                interned_by(interner):
+            yield
+
     def load_obj(self, jref, getter=None, parser=None, remove_dummy=False):
         """ load a object(those in spec._version_.objects) from a JSON reference.
         """
+        with lazy_construction(self.__lazy):
+            return self.__load_obj(jref, getter, parser, remove_dummy)
+
+    def __load_obj(self, jref, getter, parser, remove_dummy):
         src_spec = self.__resolver.resolve(jref, getter)
 
         # get root document to check its swagger version.
@@ -141,6 +235,28 @@ class ApiBase(six.with_metaclass(abc.ABCMeta, object)):
 
         override = self.spec_obj_store.get_under(
             url, jp, version, remove=remove_dummy)
+        with self.__collect_refs(url):
+            obj = self.__construct(src_spec, jref, getter, parser, version,
+                                   override)
+
+        if not obj:
+            raise Exception('Unable to parse object from {0}'.format(jref))
+
+        version = obj.__swagger_version__ if version is None and hasattr(
+            obj, '__swagger_version__') else version
+        logger.info('version: %s', version)
+
+        # cache obj before migration, or we may load an object multiple times when resolve
+        # $ref in the same spec
+        self.spec_obj_store.set(obj, url, jp, spec_version=version)
+
+        if isinstance(obj, (OpenApi, Swagger, ResourceListing)):
+            self.__original_spec_version = obj.__swagger_version__
+
+        return obj
+
+    def __construct(self, src_spec, jref, getter, parser, version, override):
+        obj = None
         if version == '1.2':
             obj = ResourceListing(src_spec, jref, {})
 
@@ -179,30 +295,31 @@ class ApiBase(six.with_metaclass(abc.ABCMeta, object)):
 
         elif version is None and parser:
             obj = parser(src_spec, jref, {})
-            version = obj.__swagger_version__ if hasattr(
-                obj, '__swagger_version__') else version
         else:
             raise NotImplementedError(
                 'Unsupported Swagger Version: {0} from {1}'.format(
                     version, jref))
 
-        if not obj:
-            raise Exception('Unable to parse object from {0}'.format(jref))
-
-        logger.info('version: %s', version)
-
-        # cache obj before migration, or we may load an object multiple times when resolve
-        # $ref in the same spec
-        self.spec_obj_store.set(obj, url, jp, spec_version=version)
-
-        if isinstance(obj, (OpenApi, Swagger, ResourceListing)):
-            self.__original_spec_version = obj.__swagger_version__
-
         return obj
 
     def migrate_obj(self, obj, jref, spec_version):
         """ migrate an object(those in spec._version_.objects)
         """
+        self.__migrating += 1
+        try:
+            return self.__migrate_obj(obj, jref, spec_version)
+        finally:
+            self.__migrating -= 1
+            if not self.__migrating:
+                self.__close_pool()
+
+    def __close_pool(self):
+        pool, self.__pool = self.__pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    def __migrate_obj(self, obj, jref, spec_version):
         spec_version = spec_version
         supported_versions = self.migratable_spec_versions
 
@@ -238,7 +355,8 @@ class ApiBase(six.with_metaclass(abc.ABCMeta, object)):
                     migration_module_path))
 
             # preform migration
-            obj, reloc = migration_module.upgrade(obj, self, jref)
+            with self.__collect_refs(url):
+                obj, reloc = migration_module.upgrade(obj, self, jref)
 
             # update route for object relocation
             self.spec_obj_store.update_routes(url, version,
@@ -262,6 +380,172 @@ class ApiBase(six.with_metaclass(abc.ABCMeta, object)):
 
         return obj
 
+    def update_obj(self, jref, spec):
+        """ replace raw content under a JSON reference of loaded documents,
+        ex. '#/definitions/Pet', and only rebuild/migrate objects under it.
+        Objects referencing them are linked to new ones.
+
+        :param str jref: a JSON reference in the source spec version
+        :param spec: new content, something parsed from json
+        :return: the new object, migrated to current spec version if needed
+        :raises ValueError: if the object is not loaded yet, it's a root object,
+        or it can't be migrated alone, ex. an Operation of 2.0
+        """
+        url, jp = utils.jr_split(jref)
+        url = url or self.url
+        from_version = self.original_spec_version
+        to_version = self.current_spec_version or from_version
+        if from_version not in _MERGERS:
+            raise ValueError(
+                'unable to update objects of {}'.format(from_version))
+
+        # old objects to be replaced, in source/migrated spec version
+        targets = [(from_version, jp)]
+        if to_version != from_version:
+            targets.append((to_version,
+                            self.spec_obj_store.relocate(
+                                url, jp, from_version, to_version)))
+
+        olds = []
+        for version, target_jp in targets:
+            old = self.spec_obj_store.get(url, target_jp, version)
+            if old is None or old.get_parent() is None:
+                raise ValueError(
+                    'unable to update {}, not loaded or a root object'.format(
+                        jref))
+            olds.append(old)
+
+        # nothing is changed until the new one is known to be migratable
+        if to_version != from_version and \
+                not _UPGRADABLE[to_version](olds[0]):
+            raise ValueError('unable to update {}, {} can\'t be migrated to {} '
+                             'alone'.format(jref, olds[0].__class__.__name__,
+                                            to_version))
+
+        # forget old objects
+        for (version, target_jp), old in zip(targets, olds):
+            for _, obj in default_tree_traversal(old, []):
+                if '$ref' in obj.spec:
+                    self.__ref_index.remove(obj, url)
+
+            self.spec_obj_store.get_under(url, target_jp, version, remove=True)
+            if target_jp != jp:
+                # migrated objects might be cached under
+                # JSON pointers of source spec version as well
+                self.spec_obj_store.get_under(url, jp, version, remove=True)
+
+        # build and migrate new objects
+        with lazy_construction(self.__lazy), self.__collect_refs(url):
+            new = olds[0].get_parent().replace_child(
+                utils.jp_split(jp)[-1], spec)
+        self.spec_obj_store.set(new, url, jp, spec_version=from_version)
+
+        news = [new]
+        migrated = self.migrate_obj(new, url + jp, to_version)
+        if to_version != from_version:
+            news.append(olds[1].get_parent().replace_child(
+                utils.jp_split(targets[1][1])[-1], migrated))
+            self.spec_obj_store.set(
+                news[1], url, targets[1][1], spec_version=to_version)
+
+        # link referrers to new objects
+        for (version, target_jp), obj in zip(targets, news):
+            self.__relink(url, jp, version, target_jp, obj)
+
+        return news[-1]
+
+    def __relink(self, url, jp, version, target_jp, obj):
+        """ link referrers of objects under 'jp' to new ones
+        """
+        prefix = url + jp
+        for ref, referrers in list(self.__ref_index.iteritems(version)):
+            if ref != prefix and not ref.startswith(prefix + '/'):
+                continue
+
+            _, ref_jp = utils.jr_split(ref)
+            if version != self.original_spec_version:
+                ref_jp = self.spec_obj_store.relocate(
+                    url, ref_jp, self.original_spec_version, version)
+
+            resolved = obj.resolve(utils.jp_split(ref_jp[len(target_jp) + 1:]))
+            for referrer in referrers:
+                attrs = referrer.get_attrs('migration')
+                if attrs is None or attrs.ref_obj is None:
+                    continue
+
+                attrs.ref_obj = weakref.proxy(resolved)
+                if getattr(attrs, 'final_obj', None) is not None:
+                    # merge again
+                    attrs.final_obj = None
+                    scan(route=[_MERGERS[version](self)], root=referrer)
+
+    def premigrate(self, jrefs, from_spec_version, to_spec_version):
+        """ migrate independent documents in a pool of processes, when
+        'processes' is passed to the constructor. A document is independent
+        when it doesn't reference others. Raw specs are shipped to workers,
+        then migrated ones are built and cached here with their routes and
+        paths. The pool is kept until the outermost migration is done.
+
+        :param list jrefs: normalized JSON references of loaded objects
+        :param str from_spec_version: the spec version of loaded objects
+        :param str to_spec_version: the spec version to migrate to
+        """
+        if not self.__processes or from_spec_version == to_spec_version:
+            return
+
+        tasks = []
+        for jref in jrefs:
+            url, jp = utils.jr_split(jref)
+            if url == self.url:
+                continue
+
+            obj = self.spec_obj_store.get(url, jp, from_spec_version)
+            if obj is None or next(iter_refs(obj.spec), None) is not None:
+                continue
+
+            relocated_jp = self.spec_obj_store.relocate(
+                url, jp, from_spec_version, to_spec_version)
+            if self.spec_obj_store.get(url, relocated_jp,
+                                       to_spec_version) is not None:
+                continue
+
+            tasks.append((obj.__class__, obj.spec, obj.get_path(), url, jp,
+                          to_spec_version))
+
+        if len(tasks) < 2:
+            # not worth a pool, leave them to resolve_obj
+            return
+
+        if self.__pool is None:
+            self.__pool = Pool(self.__processes)
+        try:
+            results = self.__pool.map(_migrate_in_worker, tasks)
+        except Exception:
+            pool, self.__pool = self.__pool, None
+            pool.terminate()
+            raise
+        finally:
+            if not self.__migrating:
+                self.__close_pool()
+
+        for (_, _, _, url, jp, _), (cls, spec, path, routes) in zip(
+                tasks, results):
+            for version, version_routes in six.iteritems(routes):
+                if version_routes:
+                    self.spec_obj_store.update_routes(url, version,
+                                                      version_routes)
+
+            relocated_jp = self.spec_obj_store.relocate(
+                url, jp, from_spec_version, to_spec_version)
+            override = self.spec_obj_store.get_under(
+                url, relocated_jp, to_spec_version, remove=False)
+            with lazy_construction(self.__lazy), self.__collect_refs(url):
+                obj = cls(spec, path=path, override=override)
+
+            obj = self.prepare_obj(obj, url + relocated_jp)
+            self.spec_obj_store.set(
+                obj, url, relocated_jp, spec_version=to_spec_version)
+
     def resolve_obj(self,
                     jref,
                     from_spec_version,
@@ -335,6 +619,107 @@ class ApiBase(six.with_metaclass(abc.ABCMeta, object)):
 
         return weakref.proxy(obj), url + relocated_jp
 
+    def dump_snapshot(self, file_obj, stamp=None):
+        """ write loaded/migrated objects to a snapshot, which could be
+        restored by 'load_snapshot' without loading/migrating again.
+
+        Hash of content of source documents, recorded when they were
+        parsed, is kept to check if they are changed when restoring.
+
+        :param file_obj: a file object opened in binary mode
+        :param stamp: an optional stamp of source documents, ex. ETag
+        """
+        sources = dict(self.__snapshot_sources)
+        for url in self.__resolver.loaded_urls:
+            sources[url] = self.__resolver.get_stamp(url)
+
+        header = dict(
+            version=snapshot.get_version(),
+            url=self.__url,
+            stamp=stamp,
+            sources=sources,
+        )
+        state = dict(
+            store=self.__store,
+            ref_index=self.__ref_index,
+            fragment_interner=self.__interner,
+            original_spec_version=self.__original_spec_version,
+            current_spec_version=self.__current_spec_version,
+            fields={
+                name: getattr(self, name)
+                for name in self.__snapshot_fields__
+            },
+        )
+        snapshot.dump(header, state, file_obj)
+
+    def load_snapshot(self, file_obj, stamp=None, check_sources=True):
+        """ restore loaded/migrated objects from a snapshot written by
+        'dump_snapshot'. A snapshot is stale when it's written by another
+        version of pyopenapi, for another url, with another 'stamp', or
+        any source document is changed.
+
+        :param file_obj: a file object opened in binary mode
+        :param stamp: the stamp passed to 'dump_snapshot'
+        :param bool check_sources: load source documents (without parsing) to
+        check if they are changed. Documents loaded via initialized getters
+        can't be loaded again, snapshots with them are treated as stale
+        unless this is False.
+        :return: True when restored, False when the snapshot is stale
+        """
+        header = snapshot.load_header(file_obj)
+        if not header:
+            return False
+
+        if header.get('version') != snapshot.get_version() or \
+                header.get('url') != self.__url or \
+                header.get('stamp') != stamp:
+            return False
+
+        sources = header.get('sources', {})
+        if check_sources:
+            for url, src_stamp in six.iteritems(sources):
+                try:
+                    if self.__resolver.stamp(url) != src_stamp:
+                        return False
+                except Exception:  # pylint: disable=broad-except
+                    logger.info('unable to check %s', url, exc_info=True)
+                    return False
+
+        state = snapshot.load_state(file_obj)
+        self.__store = state['store']
+        self.__ref_index = state['ref_index']
+        self.__interner = state['fragment_interner']
+        self.__original_spec_version = state['original_spec_version']
+        self.__current_spec_version = state['current_spec_version']
+        for name, val in six.iteritems(state['fields']):
+            setattr(self, name, val)
+        self.__snapshot_sources = sources
+
+        return True
+
     @abc.abstractmethod
     def prepare_obj(self, obj, jref):
         return obj
+
+
+class _MigrationWorker(ApiBase):
+    """ migrate objects in worker processes, see ApiBase.premigrate
+    """
+
+    def prepare_obj(self, obj, jref):
+        return obj
+
+
+def _migrate_in_worker(task):
+    """ build an object from raw spec and migrate it
+
+    :return: (class of migrated object, its raw spec, its path,
+    relocation routes)
+    """
+    cls, spec, path, url, jp, to_spec_version = task
+
+    # built with the same path as the loaded one in the main process
+    worker = _MigrationWorker(url)
+    obj = worker.migrate_obj(cls(spec, path, {}), url + jp, to_spec_version)
+    return obj.__class__, obj.dump(), obj.get_path(), dict(
+        worker.spec_obj_store.routes.get(url, {}))
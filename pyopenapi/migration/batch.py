@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+""" convert many specs in one process, documents shared by them
+(ex. common/errors.yaml) are parsed and migrated only once.
+
+usage: python -m pyopenapi.migration.batch [-h] [--to VERSION] [-p N] OUTPUT URL [URL ...]
+"""
+
+from __future__ import absolute_import, print_function
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import six
+
+from .. import utils
+from .base import ApiBase
+from .resolve import Resolver, _external_urls
+from .store import SpecObjStore
+from .writer import write_json
+
+logger = logging.getLogger(__name__)
+
+
+class ConvertApp(ApiBase):
+    """ load a spec and migrate it to another spec version
+    """
+
+    def __init__(self, url, **kwargs):
+        super(ConvertApp, self).__init__(url, **kwargs)
+
+        self.raw = None
+        self.root = None
+
+        # phase name -> seconds
+        self.timings = {}
+
+    def prepare_obj(self, obj, jref):
+        return obj
+
+    @classmethod
+    def create(cls, url, to_spec_version, **kwargs):
+        """ load and migrate a spec
+
+        :param str url: url of the spec
+        :param str to_spec_version: the spec version to migrate to
+        :param kwargs: passed to ApiBase
+        """
+        url = utils.normalize_url(url)
+        app = cls(url, **kwargs)
+
+        start = time.time()
+        app.raw = app.load_obj(url)
+        app.timings['load'] = time.time() - start
+
+        start = time.time()
+        app.root = app.migrate_obj(app.raw, url, to_spec_version)
+        app.timings['migrate'] = time.time() - start
+
+        return app
+
+
+class BatchConverter(object):
+    """ convert specs with a shared Resolver and SpecObjStore. Objects of
+    a spec are dropped once it's converted, while those of documents it
+    references are kept for upcoming specs, unless they reference the
+    dropped ones.
+    """
+
+    def __init__(self,
+                 output,
+                 to_spec_version='3.0.0',
+                 doc_cache=None,
+                 processes=None):
+        """
+        args:
+         - output: the folder to write converted specs
+         - to_spec_version: the spec version to migrate to
+         - doc_cache: pyopenapi.migration.cache.DocumentCache to keep parsed documents
+         - processes: passed to ApiBase, to migrate independent documents of
+                      each spec in a pool of processes of this size
+        """
+        self.output = output
+        self.to_spec_version = to_spec_version
+        self.processes = processes
+
+        self.__resolver = Resolver(doc_cache=doc_cache)
+        self.__store = SpecObjStore()
+
+        # url -> urls of documents it references
+        self.__external_urls = {}
+
+        if not os.path.isdir(output):
+            os.makedirs(output)
+
+    def convert(self, url, name):
+        """ convert a spec and write it to 'name' under output folder
+
+        :return: a dict of per-spec report, with url, output, error and timings
+        """
+        url = utils.normalize_url(url)
+        report = {'url': url, 'output': None, 'error': None, 'timings': {}}
+
+        start = time.time()
+        try:
+            app = ConvertApp.create(
+                url,
+                self.to_spec_version,
+                resolver=self.__resolver,
+                spec_obj_store=self.__store,
+                processes=self.processes)
+            report['timings'].update(app.timings)
+
+            dump_start = time.time()
+            path = os.path.join(self.output, name)
+            with open(path, 'w') as handle:
+                write_json(app.root, handle)
+            report['timings']['dump'] = time.time() - dump_start
+            report['output'] = path
+        except Exception as err:  # pylint: disable=broad-except
+            logger.info('unable to convert: %s', url, exc_info=True)
+            report['error'] = '{}: {}'.format(type(err).__name__, err)
+        finally:
+            self.__discard(url)
+
+        report['timings']['total'] = time.time() - start
+        return report
+
+    @property
+    def spec_obj_store(self):
+        """ the SpecObjStore shared by converted specs
+        """
+        return self.__store
+
+    def __referenced(self, url):
+        ret = self.__external_urls.get(url, None)
+        if ret is None:
+            spec = self.__resolver.get_document(url)
+            ret = _external_urls(spec, url) if spec else set()
+            self.__external_urls[url] = ret
+        return ret
+
+    def __discard(self, url):
+        """ drop objects of a spec, and those of documents referencing
+        it directly or not, they might be linked to dropped objects.
+        """
+        dropped, found = set(), set([url])
+        while found:
+            dropped |= found
+            found = set(u for u in self.__resolver.loaded_urls
+                        if u not in dropped and self.__referenced(u) & dropped)
+
+        for dropped_url in dropped:
+            self.__store.discard(dropped_url)
+            self.__resolver.discard(dropped_url)
+            self.__external_urls.pop(dropped_url, None)
+
+
+def _output_names(urls):
+    """ names of output files, made from the last part of urls
+    """
+    ret, used = [], set()
+    for url in urls:
+        path = six.moves.urllib.parse.urlparse(utils.normalize_url(url)).path
+        stem = os.path.splitext(os.path.basename(path.rstrip('/')))[0] or 'spec'
+
+        name, idx = stem + '.json', 1
+        while name in used:
+            name = '{}_{}.json'.format(stem, idx)
+            idx += 1
+
+        used.add(name)
+        ret.append(name)
+    return ret
+
+
+# the converter of each worker process
+_WORKER = {}
+
+
+def _init_worker(output, to_spec_version, doc_cache):
+    _WORKER['converter'] = BatchConverter(
+        output, to_spec_version=to_spec_version, doc_cache=doc_cache)
+
+
+def _convert_in_worker(task):
+    return _WORKER['converter'].convert(*task)
+
+
+def convert(urls,
+            output,
+            to_spec_version='3.0.0',
+            processes=None,
+            doc_cache=None,
+            migrate_processes=None):
+    """ convert specs and write them under 'output' folder, a summary report
+    is also written to 'summary.json' there.
+
+    args:
+     - urls: list of urls of specs
+     - output: the folder to write converted specs
+     - to_spec_version: the spec version to migrate to
+     - processes: convert in a pool of processes of this size, each process
+                  has its own shared caches. Specs are converted in this
+                  process when None.
+     - doc_cache: pyopenapi.migration.cache.DocumentCache to keep parsed documents,
+                  ex. pyopenapi.migration.cache.FileDocumentCache to share them
+                  between processes.
+     - migrate_processes: passed to BatchConverter, to migrate independent
+                  documents of each spec in a pool of processes of this size.
+                  Workers of 'processes' are daemonic and can't have pools,
+                  so only one of them could be set.
+
+    :return: list of per-spec reports, in the order of 'urls'
+    :raises ValueError: if both 'processes' and 'migrate_processes' are set
+    """
+    if processes and migrate_processes:
+        raise ValueError(
+            'unable to migrate in a pool of processes in worker processes, '
+            'set either processes or migrate_processes')
+
+    tasks = list(zip(urls, _output_names(urls)))
+
+    start = time.time()
+    if processes:
+        pool = Pool(
+            processes,
+            initializer=_init_worker,
+            initargs=(output, to_spec_version, doc_cache))
+        try:
+            reports = pool.map(_convert_in_worker, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        converter = BatchConverter(
+            output,
+            to_spec_version=to_spec_version,
+            doc_cache=doc_cache,
+            processes=migrate_processes)
+        reports = [converter.convert(*task) for task in tasks]
+
+    summary = {
+        'to_spec_version': to_spec_version,
+        'elapsed': time.time() - start,
+        'converted': len([r for r in reports if not r['error']]),
+        'failed': len([r for r in reports if r['error']]),
+        'specs': reports,
+    }
+    with open(os.path.join(output, 'summary.json'), 'w') as handle:
+        json.dump(summary, handle, indent=2, sort_keys=True)
+
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pyopenapi.migration.batch',
+        description='convert many specs to another spec version')
+    parser.add_argument('output', help='the folder to write converted specs')
+    parser.add_argument('urls', nargs='+', help='urls or paths of specs')
+    parser.add_argument(
+        '--to',
+        dest='to_spec_version',
+        default='3.0.0',
+        help='the spec version to migrate to, default: 3.0.0')
+    parser.add_argument(
+        '-p',
+        '--processes',
+        type=int,
+        default=None,
+        help='count of worker processes')
+    args = parser.parse_args(argv)
+
+    reports = convert(
+        args.urls,
+        args.output,
+        to_spec_version=args.to_spec_version,
+        processes=args.processes)
+
+    for report in reports:
+        print('{:8.3f}s {} {}'.format(report['timings']['total'], report[
+            'url'], report['error'] or report['output']))
+
+    return 1 if [r for r in reports if r['error']] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import six
+from six.moves import cPickle as pickle
+
+logger = logging.getLogger(__name__)
+
+# os.rename can't overwrite an existing file on windows
+_replace = getattr(os, 'replace', os.rename)
+
+
+class DocumentCache(object):
+    """ base of cache for parsed documents
+
+    A parsed document is keyed by the path it's loaded from, and
+    a stamp of its content (ex. hash of content), a document with
+    different stamp would never be returned.
+    """
+
+    def get(self, path, stamp):
+        """ get a parsed document from cache
+
+        :return: the parsed document, or None when not found
+        """
+        raise NotImplementedError()
+
+    def set(self, path, stamp, obj):
+        """ put a parsed document to cache
+        """
+        raise NotImplementedError()
+
+
+class FileDocumentCache(DocumentCache):
+    """ cache parsed documents as pickled files under a folder
+
+    args:
+     - folder: the folder to keep cached files
+     - max_size: the upper bound of total size of cached files in bytes,
+                 least recently used ones would be evicted first.
+     - max_age: cached files not used for 'max_age' seconds would be evicted.
+
+    Sizes and usage of cached files are tracked in memory, the folder is
+    only scanned on the first write. Files written by others, ex. another
+    process, are tracked once they are used.
+    """
+
+    __ext__ = '.pickle'
+
+    def __init__(self, folder, max_size=None, max_age=None):
+        self.folder = folder
+        self.max_size = max_size
+        self.max_age = max_age
+
+        # a map from cached file to (time of last use, size),
+        # least recently used first
+        self.__entries = None
+        self.__total = 0
+        self.__lock = threading.Lock()
+
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+    def __getstate__(self):
+        # locks can't be pickled, ex. when passed to processes
+        # started by 'spawn'. Each process tracks cached files
+        # on its own.
+        state = self.__dict__.copy()
+        del state['_FileDocumentCache__lock']
+        state['_FileDocumentCache__entries'] = None
+        state['_FileDocumentCache__total'] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    def _path(self, path, stamp):
+        key = hashlib.sha1('\0'.join([path, stamp]).encode('utf-8'))
+        return os.path.join(self.folder, key.hexdigest() + self.__ext__)
+
+    def _scan(self):
+        """ collect cached files under the folder, ordered by
+        time of last use
+        """
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith(self.__ext__):
+                continue
+
+            target = os.path.join(self.folder, name)
+            try:
+                stat = os.stat(target)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, target))
+
+        entries.sort()
+        return OrderedDict(
+            (target, (mtime, size)) for mtime, size, target in entries)
+
+    def _use(self, target, size):
+        """ mark a cached file as the most recently used one
+        """
+        with self.__lock:
+            if self.__entries is None:
+                return
+            self.__total -= self.__entries.pop(target, (0, 0))[1]
+            self.__entries[target] = (time.time(), size)
+            self.__total += size
+
+    def _drop(self, target):
+        with self.__lock:
+            if self.__entries is not None:
+                self.__total -= self.__entries.pop(target, (0, 0))[1]
+
+    def get(self, path, stamp):
+        target = self._path(path, stamp)
+        try:
+            if self.max_age is not None and \
+                    time.time() - os.path.getmtime(target) > self.max_age:
+                self._drop(target)
+                os.remove(target)
+                return None
+
+            with open(target, 'rb') as handle:
+                obj = pickle.load(handle)
+                size = os.fstat(handle.fileno()).st_size
+        except (IOError, OSError):
+            return None
+        except Exception:  # pylint: disable=broad-except
+            logger.info('remove corrupted cache: %s', target, exc_info=True)
+            self._drop(target)
+            os.remove(target)
+            return None
+
+        # mark it as recently used
+        os.utime(target, None)
+        self._use(target, size)
+        return obj
+
+    def set(self, path, stamp, obj):
+        target = self._path(path, stamp)
+        handle, tmp = tempfile.mkstemp(dir=self.folder)
+        try:
+            with os.fdopen(handle, 'wb') as tmp_handle:
+                pickle.dump(obj, tmp_handle, pickle.HIGHEST_PROTOCOL)
+                size = tmp_handle.tell()
+            _replace(tmp, target)
+        except Exception:
+            os.remove(tmp)
+            raise
+
+        self._use(target, size)
+        self.evict()
+
+    def evict(self):
+        """ evict cached files by age and total size
+        """
+        if self.max_size is None and self.max_age is None:
+            return
+
+        now = time.time()
+        victims = []
+        with self.__lock:
+            if self.__entries is None:
+                self.__entries = self._scan()
+                self.__total = sum(
+                    size for _, size in six.itervalues(self.__entries))
+
+            # remove least recently used ones first
+            while self.__entries:
+                target = next(iter(self.__entries))
+                mtime, size = self.__entries[target]
+                if not (self.max_age is not None and
+                        now - mtime > self.max_age) and \
+                        not (self.max_size is not None and
+                             self.__total > self.max_size):
+                    break
+
+                del self.__entries[target]
+                self.__total -= size
+                victims.append(target)
+
+        for target in victims:
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+
+
+class ResponseCache(object):
+    """ base of cache for responses of remote documents, which provides
+    validators (ETag and Last-Modified) for conditional requests.
+
+    A response is a dict with 'body' (bytes), 'etag', 'last_modified'
+    and 'content_type', keyed by url.
+    """
+
+    def get(self, url):
+        """ get a response from cache
+
+        :return: the response, or None when not found
+        """
+        raise NotImplementedError()
+
+    def set(self, url, response):
+        """ put a response to cache
+        """
+        raise NotImplementedError()
+
+
+class MemoryResponseCache(ResponseCache):
+    """ cache responses in memory
+    """
+
+    def __init__(self):
+        self.__responses = {}
+        self.__lock = threading.Lock()
+
+    def get(self, url):
+        with self.__lock:
+            return self.__responses.get(url, None)
+
+    def set(self, url, response):
+        with self.__lock:
+            self.__responses[url] = response
+
+
+class FileResponseCache(ResponseCache):
+    """ cache responses as pickled files under a folder, arguments
+    are the same as FileDocumentCache.
+    """
+
+    # responses of an url are always kept with this stamp
+    __stamp__ = 'response'
+
+    def __init__(self, folder, max_size=None, max_age=None):
+        self.__files = FileDocumentCache(
+            folder, max_size=max_size, max_age=max_age)
+
+    def get(self, url):
+        return self.__files.get(url, self.__stamp__)
+
+    def set(self, url, response):
+        self.__files.set(url, self.__stamp__, response)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+""" pyopenapi-convert: load a spec, migrate it to another spec version,
+and write it out.
+
+usage: pyopenapi-convert [-h] [-o OUTPUT] [--to VERSION] [--format {json,yaml}]
+                         [--indent N] [--profile] URL
+"""
+
+from __future__ import absolute_import, print_function
+import argparse
+import codecs
+import os
+import sys
+import time
+
+from .batch import ConvertApp
+from .writer import write_json, write_yaml
+
+
+def _format(args):
+    if args.format:
+        return args.format
+
+    ext = os.path.splitext(args.output or '')[1].lower()
+    return 'yaml' if ext in ('.yaml', '.yml') else 'json'
+
+
+def _write(app, args, handle):
+    if _format(args) == 'yaml':
+        write_yaml(app.root, handle)
+    else:
+        write_json(app.root, handle, indent=args.indent)
+        handle.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='pyopenapi-convert',
+        description='convert a spec to another spec version')
+    parser.add_argument('url', help='url or path of the spec')
+    parser.add_argument(
+        '-o',
+        '--output',
+        default=None,
+        help='the file to write, default to stdout')
+    parser.add_argument(
+        '--to',
+        dest='to_spec_version',
+        default='3.0.0',
+        help='the spec version to migrate to, default: 3.0.0')
+    parser.add_argument(
+        '--format',
+        choices=['json', 'yaml'],
+        default=None,
+        help='the output format, default to the extension of output, or json')
+    parser.add_argument(
+        '--indent', type=int, default=None, help='indent of JSON output')
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='print timings of each phase to stderr')
+    args = parser.parse_args(argv)
+
+    app = ConvertApp.create(args.url, args.to_spec_version)
+
+    start = time.time()
+    if args.output:
+        with codecs.open(args.output, 'w', encoding='utf-8') as handle:
+            _write(app, args, handle)
+    else:
+        _write(app, args, sys.stdout)
+    app.timings['write'] = time.time() - start
+
+    if args.profile:
+        for phase in ('load', 'migrate', 'write'):
+            print(
+                '{:8s}{:10.3f}s'.format(phase, app.timings[phase]),
+                file=sys.stderr)
+        print(
+            '{:8s}{:10.3f}s'.format('total', sum(app.timings.values())),
+            file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import absolute_import
+import hashlib
 import json
+import mmap
 import os
 import logging
 import re
+import socket
+import threading
+import zlib
 
 import six
 import yaml
@@ -14,6 +19,58 @@ from ..utils import patch_path
 
 logger = logging.getLogger(__name__)
 
+# prefer faster json backends when installed
+try:
+    import orjson  # pylint: disable=import-error
+    _json_loads = orjson.loads
+
+    def _json_loads_buffer(buf, start):
+        # parsed without copying
+        return orjson.loads(memoryview(buf)[start:])
+except ImportError:
+    try:
+        import ujson  # pylint: disable=import-error
+        _json_loads = ujson.loads
+    except ImportError:
+        _json_loads = json.loads
+
+    def _json_loads_buffer(buf, _):
+        # decoded once without copying to bytes first, BOM is skipped
+        text = six.text_type(buf, 'utf-8-sig')
+        if hasattr(buf, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+            # pages of mapped files are not needed anymore
+            buf.madvise(mmap.MADV_DONTNEED)
+        return _json_loads(text)
+
+# prefer the one based on libyaml when available
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+_BOM = u'\ufeff'
+_BOM_UTF8 = b'\xef\xbb\xbf'
+_SPACES = re.compile(br'\s*')
+
+
+def _guess_format(path, content_type):
+    """ guess the format of a document from content type or
+    extension of path, return None when unknown.
+    """
+    if content_type:
+        content_type = content_type.split(';', 1)[0].strip().lower()
+        if content_type.endswith('json'):
+            return consts.FILE_EXT_JSON
+        if content_type.endswith('yaml') or content_type.endswith('yml'):
+            return consts.FILE_EXT_YAML
+
+    if path:
+        _, ext = os.path.splitext(
+            six.moves.urllib.parse.urlparse(path).path.lower())
+        if ext == '.' + consts.FILE_EXT_JSON:
+            return consts.FILE_EXT_JSON
+        if ext in ('.' + consts.FILE_EXT_YAML, '.' + consts.FILE_EXT_YML):
+            return consts.FILE_EXT_YAML
+
+    return None
+
 
 class Getter(six.Iterator):
     """ base of getter object
@@ -22,39 +79,169 @@ class Getter(six.Iterator):
     The part to extend getter would be finalized once Swagger 2.0 is ready.
     """
 
+    doc_cache = None
+    """ an instance of pyopenapi.migration.cache.DocumentCache, parsed documents
+    are cached there, keyed by path and hash of content.
+    """
+
+    interner = None
+    """ an instance of pyopenapi.migration.spec.FragmentInterner, strings and
+    identical fragments of parsed documents are shared by it when provided.
+    """
+
+    content_type = None
+    """ the content type of the last loaded document, could be
+    provided by 'load' to help detecting the format of documents
+    """
+
+    last_stamp = None
+    """ the hash of content of the last parsed document
+    """
+
     def __init__(self, path):
         self.base_path = path
 
     def __iter__(self):
         return self
 
-    def __next__(self):
+    def _next_raw(self):
         if not self.urls:
             raise StopIteration
 
-        obj = self.load(self.urls.pop(0))
+        path = self.urls.pop(0)
+        return path, self._check_raw(self.load(path))
 
+    @staticmethod
+    def _check_raw(obj):
         # make sure data is string type
-        if isinstance(obj, dict):
-            pass
-        elif isinstance(obj, six.binary_type):
-            obj = obj.decode('utf-8')
-        elif not isinstance(obj, six.string_types):
+        if not isinstance(obj, (dict, six.binary_type, six.string_types,
+                                mmap.mmap)):
             raise ValueError('Unknown types: [{0}]'.format(str(type(obj))))
+        return obj
 
-        # a very simple logic to distinguish json and yaml
-        if isinstance(obj, six.string_types):
+    @staticmethod
+    def _stamp(obj):
+        if isinstance(obj, dict):
             try:
-                if obj.startswith('{'):
-                    obj = json.loads(obj)
-                else:
-                    obj = yaml.load(obj)
-            except ValueError:
-                raise Exception('Unknown format startswith {0} ...'.format(
-                    obj[:10]))
+                obj = json.dumps(obj, sort_keys=True)
+            except (TypeError, ValueError):
+                # ex. keys in different types
+                return None
+        if isinstance(obj, six.text_type):
+            obj = obj.encode('utf-8')
+        return hashlib.sha1(obj).hexdigest()
+
+    def _intern(self, obj):
+        if self.interner is None or obj is None:
+            return obj
+        # interned documents are returned as they are, others, ex. those
+        # in doc_cache interned by another interner, are copied.
+        return self.interner.intern(obj)
+
+    def __next__(self):
+        path, raw = self._next_raw()
+        return self._parse_raw(path, raw)
+
+    def _parse_raw(self, path, raw):
+        """ parse a document returned by 'load', with doc_cache and interner
+        """
+        self.last_stamp = stamp = self._stamp(raw)
+        if isinstance(raw, dict):
+            return self._intern(raw)
+
+        try:
+            if self.doc_cache is not None:
+                cached = self.doc_cache.get(path, stamp)
+                if cached is not None:
+                    return self._intern(cached)
+
+            fmt = _guess_format(path, self.content_type)
+            if isinstance(raw, (six.binary_type, mmap.mmap)):
+                obj = self.parse_buffer(raw, fmt=fmt)
+            else:
+                obj = self.parse(raw, fmt=fmt)
+        finally:
+            if isinstance(raw, mmap.mmap):
+                raw.close()
+
+        obj = self._intern(obj)
+        if self.doc_cache is not None and obj is not None:
+            self.doc_cache.set(path, stamp, obj)
 
         return obj
 
+    def next_stamp(self):
+        """ load the next document, and return the hash of its
+        content without parsing it, the same as 'last_stamp' after
+        parsing it.
+        """
+        _, obj = self._next_raw()
+        try:
+            return self._stamp(obj)
+        finally:
+            if isinstance(obj, mmap.mmap):
+                obj.close()
+
+    @staticmethod
+    def parse(obj, fmt=None):
+        """ parse a loaded document in json or yaml
+
+        :param str obj: the loaded document
+        :param str fmt: the expected format, 'json' or 'yaml', None when unknown
+        """
+        if not isinstance(obj, six.string_types):
+            return obj
+
+        if obj.startswith(_BOM):
+            obj = obj[len(_BOM):]
+
+        # json documents always start with '{' or '[', but yaml
+        # documents in flow style might start with them, too.
+        head = obj.lstrip()[:1]
+        if head in ('{', '[') and fmt != consts.FILE_EXT_YAML:
+            try:
+                return _json_loads(obj)
+            except ValueError:
+                if fmt == consts.FILE_EXT_JSON:
+                    raise Exception(
+                        'Unknown format startswith {0} ...'.format(obj[:10]))
+
+        try:
+            return yaml.load(obj, Loader=_YamlLoader)
+        except yaml.YAMLError:
+            raise Exception('Unknown format startswith {0} ...'.format(
+                obj[:10]))
+
+    @staticmethod
+    def parse_buffer(buf, fmt=None):
+        """ parse a loaded document in json or yaml from bytes, or anything
+        supporting buffer protocol, ex. mmap, without decoding it to a
+        string first when possible.
+
+        :param buf: the loaded document, encoded in utf-8
+        :param str fmt: the expected format, 'json' or 'yaml', None when unknown
+        """
+        start = len(_BOM_UTF8) if buf[:len(_BOM_UTF8)] == _BOM_UTF8 else 0
+
+        # the same as 'parse', json documents always start with '{' or '['
+        pos = _SPACES.match(buf, start).end()
+        if buf[pos:pos + 1] in (b'{', b'[') and fmt != consts.FILE_EXT_YAML:
+            try:
+                return _json_loads_buffer(buf, start)
+            except ValueError:
+                if fmt == consts.FILE_EXT_JSON:
+                    raise Exception('Unknown format startswith {0} ...'.format(
+                        bytes(buf[:10])))
+
+        if isinstance(buf, mmap.mmap):
+            # read as a stream, to avoid decoding the whole document
+            buf.seek(0)
+        try:
+            return yaml.load(buf, Loader=_YamlLoader)
+        except yaml.YAMLError:
+            raise Exception('Unknown format startswith {0} ...'.format(
+                bytes(buf[:10])))
+
     def load(self, path):
         """ load the resource, and return for parsing.
 
@@ -68,6 +255,11 @@ class LocalGetter(Getter):
     """ default getter implmenetation for local resource file
     """
 
+    mmap_threshold = 1024 * 1024
+    """ files of this size in bytes, or larger, are memory-mapped and
+    parsed without being read into a string, None to disable it.
+    """
+
     def __init__(self, path):
         super(LocalGetter, self).__init__(path)
 
@@ -118,8 +310,15 @@ class LocalGetter(Getter):
         logger.info('final path to load: [%s]', path)
 
         ret = None
-        with open(path, 'r') as file_handle:
-            ret = file_handle.read()
+        if self.mmap_threshold is not None and \
+                os.path.getsize(path) >= max(self.mmap_threshold, 1):
+            with open(path, 'rb') as file_handle:
+                # the mapping is still valid after the file is closed
+                ret = mmap.mmap(
+                    file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            with open(path, 'r') as file_handle:
+                ret = file_handle.read()
         return ret
 
 
@@ -166,6 +365,186 @@ class UrlGetter(SimpleGetter):
     __simple_getter_callback__ = _url_load
 
 
+def _decode_content(body, encoding):
+    """ decompress the body of a response by its Content-Encoding
+    """
+    encoding = (encoding or '').strip().lower()
+    if encoding in ('', 'identity'):
+        return body
+    if encoding in ('gzip', 'x-gzip'):
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # some servers send raw deflate stream without zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+
+    raise ValueError('Unknown content encoding: [{}]'.format(encoding))
+
+
+class HttpConnectionPool(object):
+    """ keep-alive connections to http/https servers, reused for
+    requests to the same host. It's safe to be shared between threads.
+
+    args:
+     - maxsize: the count of idle connections kept for each host
+     - timeout: the timeout of connections in seconds
+    """
+
+    def __init__(self, maxsize=4, timeout=60):
+        self.maxsize = maxsize
+        self.timeout = timeout
+
+        # (scheme, host) -> list of idle connections
+        self.__idle = {}
+        self.__lock = threading.Lock()
+
+    def _connect(self, scheme, host):
+        if scheme == 'https':
+            return six.moves.http_client.HTTPSConnection(
+                host, timeout=self.timeout)
+        return six.moves.http_client.HTTPConnection(host, timeout=self.timeout)
+
+    def _acquire(self, scheme, host):
+        with self.__lock:
+            idle = self.__idle.get((scheme, host), None)
+            if idle:
+                return idle.pop(), True
+        return self._connect(scheme, host), False
+
+    def _release(self, scheme, host, conn):
+        with self.__lock:
+            idle = self.__idle.setdefault((scheme, host), [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, url, headers=None):
+        """ send a GET request, and read the whole response
+
+        :return: the response and its body
+        """
+        parsed = six.moves.urllib.parse.urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            raise ValueError('Unsupported scheme: [{}]'.format(url))
+
+        target = parsed.path or '/'
+        if parsed.query:
+            target += '?' + parsed.query
+
+        while True:
+            conn, reused = self._acquire(parsed.scheme, parsed.netloc)
+            try:
+                conn.request('GET', target, headers=headers or {})
+                resp = conn.getresponse()
+                body = resp.read()
+            except (six.moves.http_client.HTTPException, socket.error):
+                conn.close()
+                if reused:
+                    # closed by server when idle, retry with a new one
+                    continue
+                raise
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(parsed.scheme, parsed.netloc, conn)
+            return resp, body
+
+    def close(self):
+        """ close all idle connections
+        """
+        with self.__lock:
+            idle, self.__idle = self.__idle, {}
+        for conns in six.itervalues(idle):
+            for conn in conns:
+                conn.close()
+
+
+class HttpGetter(SimpleGetter):
+    """ getter for remote documents via http/https, with keep-alive
+    connections shared by all instances, compressed responses, and
+    conditional requests when 'response_cache' is provided. Subclass
+    it to change these options:
+
+    class MyGetter(HttpGetter):
+        response_cache = FileResponseCache('/tmp/pyopenapi/http')
+
+    resolver = Resolver(default_getter=MyGetter)
+    """
+
+    pool = HttpConnectionPool()
+    """ an instance of HttpConnectionPool to send requests
+    """
+
+    response_cache = None
+    """ an instance of pyopenapi.migration.cache.ResponseCache, responses
+    are kept there to send conditional requests for them next time.
+    """
+
+    max_redirects = 10
+    """ count of redirects allowed for each document
+    """
+
+    def load(self, path):
+        logger.info('to load: [%s]', path)
+
+        cached = None
+        if self.response_cache is not None:
+            cached = self.response_cache.get(path)
+
+        headers = {'Accept-Encoding': 'gzip, deflate'}
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        url = path
+        for _ in six.moves.xrange(self.max_redirects + 1):
+            resp, body = self.pool.request(url, headers=headers)
+            location = resp.getheader('Location')
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                location = six.moves.urllib.parse.urljoin(url, location)
+                if location != url:
+                    # validators are of the cached response of 'path',
+                    # not of the document at another url
+                    headers.pop('If-None-Match', None)
+                    headers.pop('If-Modified-Since', None)
+                url = location
+                continue
+            break
+        else:
+            raise Exception('Too many redirects: [{}]'.format(path))
+
+        if resp.status == 304 and cached is not None:
+            logger.info('not modified: [%s]', path)
+            self.content_type = cached.get('content_type')
+            return cached['body']
+
+        if resp.status != 200:
+            raise six.moves.urllib.error.HTTPError(
+                url, resp.status, resp.reason, resp.msg, None)
+
+        body = _decode_content(body, resp.getheader('Content-Encoding'))
+        self.content_type = resp.getheader('Content-Type')
+
+        etag = resp.getheader('ETag')
+        last_modified = resp.getheader('Last-Modified')
+        if self.response_cache is not None and (etag or last_modified):
+            self.response_cache.set(
+                path,
+                dict(
+                    body=body,
+                    etag=etag,
+                    last_modified=last_modified,
+                    content_type=self.content_type))
+
+        return body
+
+
 class DictGetter(Getter):
     """ a getter accept a dict as parameter without loading from file / url
 
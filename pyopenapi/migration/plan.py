@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+import logging
+from collections import OrderedDict
+
+import six
+
+from ..utils import jr_split, normalize_jr
+from .spec import iter_spec_refs
+
+logger = logging.getLogger(__name__)
+
+
+class ResolvePlan(object):
+    """ JSON references to resolve in batch. Each distinct reference
+    is resolved once, and references pointing to other documents are
+    resolved in dependency order: the ones referenced by a target are
+    resolved before it, so resolving a target won't go down the whole
+    reference chain recursively.
+
+    With 'dep_parsers', references under raw specs of targets are followed
+    transitively, even those not requested, ex. a chain of schemas in
+    external documents each referencing the next one. They are resolved
+    from the end of the chain.
+    """
+
+    def __init__(self,
+                 app,
+                 from_spec_version,
+                 to_spec_version=None,
+                 remove_dummy=False,
+                 dep_parsers=None):
+        """
+        args:
+         - app: pyopenapi.migration.base.ApiBase
+         - from_spec_version: the spec version of documents where references are used
+         - to_spec_version: the expected spec version of resolved objects
+         - remove_dummy: passed to ApiBase.resolve_obj
+         - dep_parsers: a map from a parser to the parser of targets referenced
+                        under objects it parses, ex. Schema -> Schema.
+        """
+        self.__app = app
+        self.__from_spec_version = from_spec_version
+        self.__to_spec_version = to_spec_version
+        self.__remove_dummy = remove_dummy
+        self.__dep_parsers = dep_parsers or {}
+
+        # normalized reference -> parser -> list of callbacks
+        self.__requests = OrderedDict()
+
+        # normalized reference -> parser, for targets not requested
+        # but found when ordering
+        self.__implied = OrderedDict()
+
+    def add(self, jref, parser, callback):
+        """ request to resolve a normalized JSON reference
+
+        args:
+         - jref: the normalized JSON reference
+         - parser: the parser of the target object
+         - callback: called with (resolved object, the relocated reference)
+        """
+        parsers = self.__requests.setdefault(jref, OrderedDict())
+        parsers.setdefault(parser, []).append(callback)
+
+    def __len__(self):
+        return len(self.__requests)
+
+    def __parsers(self, jref):
+        parsers = self.__requests.get(jref, None)
+        return [self.__implied[jref]] if parsers is None else list(parsers)
+
+    def __parser_of_deps(self, jref):
+        for parser in self.__parsers(jref):
+            dep_parser = self.__dep_parsers.get(parser, None)
+            if dep_parser is not None:
+                return dep_parser
+        return None
+
+    def __is_resolved(self, jref):
+        url, jp = jr_split(jref)
+        from_version = self.__from_spec_version
+        version = self.__to_spec_version or from_version
+        store = self.__app.spec_obj_store
+        if version != from_version:
+            jp = store.relocate(url, jp, from_version, version)
+        try:
+            return store.get(url, jp, version) is not None
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+    def __iter_refs(self, jref, spec):
+        """ '$ref' in reference positions of the raw spec under 'jref',
+        according to parsers of it
+        """
+        refs = OrderedDict()
+        for parser in self.__parsers(jref):
+            for ref in iter_spec_refs(parser, spec):
+                refs[ref] = None
+        return list(refs)
+
+    def __deps(self, jref):
+        """ targets referenced by the raw spec under 'jref'
+        """
+        url, _ = jr_split(jref)
+        if url == self.__app.url:
+            # the root document is always loaded before resolving
+            return []
+
+        try:
+            spec = self.__app.resolver.resolve(jref)
+        except Exception:  # pylint: disable=broad-except
+            # leave the error to the time this reference is really resolved
+            logger.info('unable to plan: %s', jref, exc_info=True)
+            return []
+
+        dep_parser = self.__parser_of_deps(jref)
+        ret = []
+        for ref in self.__iter_refs(jref, spec):
+            try:
+                dep = normalize_jr(ref, url)
+            except ValueError:
+                continue
+            if dep == jref:
+                continue
+
+            if dep in self.__requests or dep in self.__implied:
+                ret.append(dep)
+            elif dep_parser is not None and not self.__is_resolved(dep):
+                self.__implied[dep] = dep_parser
+                ret.append(dep)
+        return ret
+
+    def order(self):
+        """ references sorted by dependencies, including those implied by
+        'dep_parsers'. References in a cycle are kept in the order they
+        are requested.
+        """
+        ret, done = [], set()
+        for root in list(self.__requests):
+            if root in done:
+                continue
+
+            # iterative post-order DFS, long reference chains
+            # won't hit the recursion limit.
+            done.add(root)
+            stack = [(root, iter(self.__deps(root)))]
+            while stack:
+                jref, deps = stack[-1]
+                for dep in deps:
+                    if dep not in done:
+                        done.add(dep)
+                        stack.append((dep, iter(self.__deps(dep))))
+                        break
+                else:
+                    stack.pop()
+                    ret.append(jref)
+
+        return ret
+
+    def run(self):
+        """ resolve all requested references, callbacks are called
+        in the order they are requested for each reference.
+        """
+        order = self.order()
+        requests, self.__requests = self.__requests, OrderedDict()
+        implied, self.__implied = self.__implied, OrderedDict()
+
+        if self.__to_spec_version:
+            self.__app.premigrate(order, self.__from_spec_version,
+                                  self.__to_spec_version)
+
+        for jref in order:
+            if jref in implied:
+                self.__resolve_implied(jref, implied[jref])
+                continue
+
+            for parser, callbacks in six.iteritems(requests[jref]):
+                resolved, new_ref = self.__resolve(jref, parser)
+                for callback in callbacks:
+                    callback(resolved, new_ref)
+
+    def __resolve(self, jref, parser):
+        return self.__app.resolve_obj(
+            jref,
+            from_spec_version=self.__from_spec_version,
+            parser=parser,
+            to_spec_version=self.__to_spec_version,
+            remove_dummy=self.__remove_dummy,
+        )
+
+    def __resolve_implied(self, jref, parser):
+        try:
+            self.__resolve(jref, parser)
+        except Exception:  # pylint: disable=broad-except
+            # it's not requested, leave the error to the time
+            # it's really resolved.
+            logger.info('unable to resolve: %s', jref, exc_info=True)
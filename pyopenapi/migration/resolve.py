@@ -4,30 +4,81 @@ from __future__ import absolute_import
 import os
 import inspect
 import logging
+from multiprocessing.pool import ThreadPool
 
 import six
 
-from ..utils import jr_split, jp_split
+from ..utils import jr_split, jp_split, normalize_jr, get_swagger_version
 from .getter import UrlGetter, LocalGetter
 
 logger = logging.getLogger(__name__)
 
 
+def iter_refs(spec):
+    """ iterate through values of '$ref' in a raw spec
+    """
+    objs = [spec]
+    while objs:
+        obj = objs.pop()
+        if isinstance(obj, dict):
+            for k, val in six.iteritems(obj):
+                if k == '$ref' and isinstance(val, six.string_types):
+                    yield val
+                elif isinstance(val, (dict, list)):
+                    objs.append(val)
+        elif isinstance(obj, list):
+            objs.extend(
+                [elm for elm in obj if isinstance(elm, (dict, list))])
+
+
+def _external_urls(spec, url):
+    """ collect urls of external documents referenced by '$ref' in a raw spec
+    """
+    # there is no JSON reference in 1.2, '$ref' there is the name of model
+    if get_swagger_version(spec) == '1.2':
+        return set()
+
+    ret = set()
+    for ref in iter_refs(spec):
+        try:
+            ret.add(jr_split(normalize_jr(ref, url))[0])
+        except ValueError:
+            logger.info('unable to normalize $ref: %s in %s', ref, url)
+
+    ret.discard(url)
+    return ret
+
+
 class Resolver(object):
     """ JSON Reference Resolver:
     resolving a JSON reference to a raw object (dict),
     then return and cache it.
     """
 
-    def __init__(self, url_load_hook=None, default_getter=None):
+    def __init__(self,
+                 url_load_hook=None,
+                 default_getter=None,
+                 prefetch=False,
+                 fetch_concurrency=8,
+                 doc_cache=None,
+                 interner=None):
         """
         args:
          - url_load_hook: a way to redirect url to a accessible place, for self testing
          - default_getter: the default getter used when none is provided in 'resolve' method
+         - prefetch: when a document is loaded, fetch all external documents it
+                     references, transitively and concurrently
+         - fetch_concurrency: the count of threads to fetch documents when prefetching
+         - doc_cache: pyopenapi.migration.cache.DocumentCache to keep parsed documents
+         - interner: pyopenapi.migration.spec.FragmentInterner to share strings and
+                     identical fragments of parsed documents
         """
         # a map from url to loaded json/yaml
         self.__cache = {}
 
+        # a map from url to the hash of content of loaded json/yaml
+        self.__stamps = {}
+
         # things to make unittest easier,
         # all urls to load json would go through this hook
         self.__url_load_hook = url_load_hook
@@ -35,36 +86,169 @@ class Resolver(object):
         # default getter for all resolving
         self.__default_getter = default_getter
 
-    def resolve(self, jref, getter=None):
-        """
-        """
-        url, json_pointer = jr_split(jref)
+        self.__prefetch = prefetch
+        self.__fetch_concurrency = fetch_concurrency
 
+        # persistent cache of parsed documents
+        self.__doc_cache = doc_cache
+
+        # share strings and fragments of parsed documents
+        self.__interner = interner
+
+    def _getter(self, url, getter=None):
         # apply hook when use this url to load
         # note that we didn't cache App with this local_url
         local_url = self.__url_load_hook(url) if self.__url_load_hook else url
 
         logger.info('%s patch to %s', url, local_url)
 
+        if not getter:
+            getter = self.__default_getter or UrlGetter
+            parsed = six.moves.urllib.parse.urlparse(local_url)
+            if parsed.scheme == 'file' and parsed.path:
+                getter = LocalGetter(os.path.join(parsed.netloc, parsed.path))
+
+        if inspect.isclass(getter):
+            # default initialization is passing the url
+            # you can override this behavior by passing an
+            # initialized getter object.
+            getter = getter(local_url)
+
+        # getters not derived from Getter, ex. generators,
+        # are left untouched
+        if self.__doc_cache is not None and hasattr(getter, 'doc_cache') \
+                and getter.doc_cache is None:
+            getter.doc_cache = self.__doc_cache
+        if self.__interner is not None and hasattr(getter, 'interner') \
+                and getter.interner is None:
+            getter.interner = self.__interner
+
+        return getter
+
+    def _load(self, url, getter=None):
+        """ load the document of an url, and the hash of its content
+        """
+        getter = self._getter(url, getter)
+        obj = six.advance_iterator(getter)
+        return obj, getattr(getter, 'last_stamp', None)
+
+    def _is_shared(self, getter):
+        # an initialized default getter is a stateful iterator, it
+        # can't be reused, or advanced by more than one thread
+        return getter is self.__default_getter
+
+    def stamp(self, url, getter=None):
+        """ load the document of an url again, and return the hash of its
+        content without parsing it. None is returned when the document
+        can't be loaded again.
+        """
+        getter = self._getter(url, getter)
+        if self._is_shared(getter) or not hasattr(getter, 'next_stamp'):
+            return None
+        return getter.next_stamp()
+
+    def get_stamp(self, url):
+        """ get the hash of content of a loaded document, recorded when it's
+        parsed. None is returned when it's not loaded or can't be hashed.
+        """
+        return self.__stamps.get(url, None)
+
+    @property
+    def interner(self):
+        """ FragmentInterner of parsed documents, None if not provided
+        """
+        return self.__interner
+
+    @property
+    def loaded_urls(self):
+        """ urls of documents loaded by this resolver
+        """
+        return [url for url, obj in six.iteritems(self.__cache) if obj]
+
+    def discard(self, url):
+        """ drop the cached document of an url
+        """
+        self.__cache.pop(url, None)
+        self.__stamps.pop(url, None)
+
+    def get_document(self, url):
+        """ get the cached document of an url, None when not loaded
+        """
+        return self.__cache.get(url, None)
+
+    def set_document(self, url, obj, stamp=None):
+        """ cache a document loaded elsewhere, ex. fetched asynchronously,
+        for upcoming resolving, along with the hash of its content
+        """
+        self.__cache[url] = obj
+        self.__stamps[url] = stamp
+
+    def _try_load(self, url):
+        try:
+            getter = self._getter(url)
+            if self._is_shared(getter):
+                # only getters created for each url are run in threads,
+                # others are left to on-demand resolving
+                return None, None
+            return six.advance_iterator(getter), getattr(
+                getter, 'last_stamp', None)
+        except Exception:  # pylint: disable=broad-except
+            # leave the error to the time this url is really resolved
+            logger.info('unable to prefetch: %s', url, exc_info=True)
+            return None, None
+
+    def prefetch(self, url, fetch_concurrency=None):
+        """ fetch external documents referenced by 'url' (transitively)
+        concurrently, and cache them for upcoming resolving. Documents
+        failed to fetch are skipped here and would be loaded again on demand.
+
+        args:
+         - url: the url of a loaded document
+         - fetch_concurrency: the count of threads to fetch documents,
+                              default to the one passed to constructor
+        """
+        spec = self.__cache.get(url, None)
+        if not spec:
+            return
+
+        skipped = set()
+        todo = _external_urls(spec, url) - set(self.__cache)
+        if not todo:
+            return
+
+        pool = ThreadPool(fetch_concurrency or self.__fetch_concurrency)
+        try:
+            while todo:
+                todo = sorted(todo)
+                found = set()
+                for target, (obj, stamp) in zip(
+                        todo, pool.map(self._try_load, todo)):
+                    if not obj:
+                        skipped.add(target)
+                        continue
+
+                    self.set_document(target, obj, stamp)
+                    found |= _external_urls(obj, target)
+
+                todo = found - set(self.__cache) - skipped
+        finally:
+            pool.close()
+            pool.join()
+
+    def resolve(self, jref, getter=None):
+        """
+        """
+        url, json_pointer = jr_split(jref)
+
         # check cache
         obj = self.__cache.get(url, None)
         if not obj:
             # load that object
-            if not getter:
-                getter = self.__default_getter or UrlGetter
-                parsed = six.moves.urllib.parse.urlparse(local_url)
-                if parsed.scheme == 'file' and parsed.path:
-                    getter = LocalGetter(
-                        os.path.join(parsed.netloc, parsed.path))
-
-            if inspect.isclass(getter):
-                # default initialization is passing the url
-                # you can override this behavior by passing an
-                # initialized getter object.
-                getter = getter(local_url)
-
-            obj = six.advance_iterator(getter)
-            self.__cache[url] = obj if obj else None
+            obj, stamp = self._load(url, getter)
+            self.set_document(url, obj if obj else None, stamp)
+
+            if obj and self.__prefetch:
+                self.prefetch(url)
 
         if obj:
             parts = jp_split(json_pointer)[1:]
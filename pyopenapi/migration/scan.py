@@ -3,21 +3,24 @@
 from __future__ import absolute_import
 import six
 
-from .spec import Base2Obj
+from .spec import Base2Obj, reachable_classes
 
 
 def default_tree_traversal(root, leaves):
     """ default tree traversal """
-    objs = [('#', root)]
+    # paths and objects are kept in separated stacks,
+    # to avoid allocating a tuple for each node.
+    paths, objs = ['#'], [root]
     while objs:
-        path, obj = objs.pop()
+        path, obj = paths.pop(), objs.pop()
 
         # name of child are json-pointer encoded, we don't have
         # to encode it again.
         if obj.__class__ not in leaves:
-            objs.extend(
-                map(lambda i: ('/'.join([path, i[0]]), i[1]),
-                    six.iteritems(obj.get_children())))
+            base = path + '/'
+            for name, chd in six.iteritems(obj.get_children()):
+                paths.append(base + name)
+                objs.append(chd)
 
         # the path we expose here follows JsonPointer described here
         #   http://tools.ietf.org/html/draft-ietf-appsawg-json-pointer-07
@@ -34,6 +37,7 @@ class DispatcherMeta(type):
             # but not share the same one with parents.
             spc['obj_route'] = {}
             spc['result_fn'] = [None]
+            spc['done_fn'] = [None]
 
         return type.__new__(mcs, name, bases, spc)
 
@@ -43,6 +47,7 @@ class Dispatcher(six.with_metaclass(DispatcherMeta, object)):
     """
     obj_route = {}
     result_fn = [None]
+    done_fn = [None]
 
     @classmethod
     def __add_route(cls, target_cls, func):
@@ -83,18 +88,73 @@ class Dispatcher(six.with_metaclass(DispatcherMeta, object)):
         cls.result_fn = [func]
         return func
 
+    @classmethod
+    def done(cls, func):
+        """ register a function called when the traversal of a scan is done
+        """
+
+        # avoid bound error
+        cls.done_fn = [func]
+        return func
 
-def _build_route(routes):
-    ret = []
-    for route in routes:
-        for obj in six.itervalues(vars(route.__class__)):
-            if not isinstance(obj, DispatcherMeta):
-                continue
 
-            ret.append((route, obj.obj_route, obj.result_fn[0]))
+# route class -> the dispatcher declared in it
+_DISPATCHERS = {}
+
+
+def _get_dispatcher(route_cls):
+    try:
+        return _DISPATCHERS[route_cls]
+    except KeyError:
+        pass
+
+    disp = None
+    for obj in six.itervalues(vars(route_cls)):
+        if isinstance(obj, DispatcherMeta):
+            disp = obj
             break
 
-    return ret
+    _DISPATCHERS[route_cls] = disp
+    return disp
+
+
+class _Dispatch(object):
+    """ dispatchers of routes in a scan
+    """
+
+    def __init__(self, routes, with_mro=False):
+        self.__routes = list(routes)
+        self.__dispatchers = [
+            _get_dispatcher(route.__class__) for route in self.__routes
+        ]
+        self.__with_mro = with_mro
+
+        # list of (route, obj_route, result function)
+        self.merged = [(route, disp.obj_route, disp.result_fn[0])
+                       for route, disp in zip(self.__routes,
+                                              self.__dispatchers)
+                       if disp is not None]
+
+    def handled_classes(self):
+        """ classes with handlers registered
+        """
+        ret = set()
+        for disp in self.__dispatchers:
+            if disp is not None:
+                ret.update(k for k, v in six.iteritems(disp.obj_route) if v)
+        return ret
+
+    def done(self):
+        """ call 'done' functions of routes
+        """
+        for disp, route in zip(self.__dispatchers, self.__routes):
+            if disp is not None and disp.done_fn[0]:
+                disp.done_fn[0](route)
+
+    def is_matched(self, cls, handled):
+        if self.__with_mro:
+            return issubclass(cls, tuple(handled))
+        return cls in handled
 
 
 def _handle_cls(cls, app, path, obj, the_self, route, res):
@@ -116,6 +176,48 @@ def _handle_cls_without_app(cls, path, obj, the_self, route, res):
             res(the_self, ret)
 
 
+class _PrunedLeaves(object):
+    """ leaves for tree traversal, including classes
+    that no handler could be reached beneath them
+    """
+
+    def __init__(self, leaves, dispatch):
+        self.__leaves = set(leaves)
+        self.__dispatch = dispatch
+        self.__handled = dispatch.handled_classes()
+        self.__pruned = {}
+
+    def __contains__(self, cls):
+        if cls in self.__leaves:
+            return True
+
+        try:
+            return self.__pruned[cls]
+        except KeyError:
+            pass
+
+        reachable = reachable_classes(cls) \
+            if issubclass(cls, Base2Obj) else None
+        pruned = self.__pruned[cls] = reachable is not None and not any(
+            self.__dispatch.is_matched(c, self.__handled) for c in reachable)
+        return pruned
+
+
+def _prune(root, leaves, dispatch):
+    """ make leaves for tree traversal. When all classes beneath
+    root are known, they are checked here to get a plain set.
+    """
+    pruned = _PrunedLeaves(leaves, dispatch)
+    universe = reachable_classes(root.__class__) \
+        if isinstance(root, Base2Obj) else None
+    if universe is None:
+        return pruned
+
+    ret = set(leaves)
+    ret.update(cls for cls in universe | set([root.__class__]) if cls in pruned)
+    return ret
+
+
 class Scanner(object):
     """ Scanner
     """
@@ -134,14 +236,17 @@ class Scanner(object):
         if root is None:
             raise ValueError('Can\'t scan because root==None')
 
-        merged_r = _build_route(route)
+        dispatch = _Dispatch(route, with_mro=True)
+        leaves = _prune(root, leaves, dispatch)
         for path, obj in nexter(root, leaves):
-            for args in merged_r:
+            for args in dispatch.merged:
                 for cls in obj.__class__.__mro__[:-1]:
                     if cls is Base2Obj:
                         break
                     _handle_cls(cls, self.app, path, obj, *args)
 
+        dispatch.done()
+
 
 def scan(route, root, nexter=default_tree_traversal, leaves=None):
     """ Scanner v2, the main change is to remove 'app' from default input. The depnedencies
@@ -152,7 +257,85 @@ def scan(route, root, nexter=default_tree_traversal, leaves=None):
     if root is None:
         raise ValueError('Can\'t scan because root==None')
 
-    merged_r = _build_route(route)
+    dispatch = _Dispatch(route)
+    leaves = _prune(root, leaves, dispatch)
     for path, obj in nexter(root, leaves):
-        for args in merged_r:
+        for args in dispatch.merged:
             _handle_cls_without_app(obj.__class__, path, obj, *args)
+
+    dispatch.done()
+
+
+def _fuse(routes):
+    """ group routes into passes, each pass is done in one traversal
+    """
+    passes = []
+    for route in routes:
+        if not passes or getattr(route, '__scan_barrier__', False):
+            passes.append([])
+        passes[-1].append(route)
+
+    return passes
+
+
+def fused_tree_traversal(root, leaves):
+    """ tree traversal for routes fused into one pass, each route has its
+    own leaves. A subtree is skipped only when no route needs to visit it.
+
+    :param leaves: a list of leaves, one for each route
+    :return: iterator of (path, object, indices of routes visiting it)
+    """
+    # indices of routes visiting children of (class, indices of routes)
+    children_of = {}
+
+    paths, objs, actives = ['#'], [root], [tuple(range(len(leaves)))]
+    while objs:
+        path, obj, active = paths.pop(), objs.pop(), actives.pop()
+
+        key = (obj.__class__, active)
+        try:
+            chd_active = children_of[key]
+        except KeyError:
+            chd_active = children_of[key] = tuple(
+                idx for idx in active if obj.__class__ not in leaves[idx])
+
+        if chd_active:
+            base = path + '/'
+            for name, chd in six.iteritems(obj.get_children()):
+                paths.append(base + name)
+                objs.append(chd)
+                actives.append(chd_active)
+
+        yield path, obj, active
+
+
+def scan_pipeline(route, root, nexter=fused_tree_traversal):
+    """ run routes in order, consecutive routes are fused into one traversal
+    unless a route requires a barrier.
+
+    Routes could declare these attributes:
+     - __scan_barrier__: True if it depends on the result of all routes before
+                         it over the whole tree.
+     - __scan_leaves__: list of classes not to traverse into. When fused, each
+                        route only visits objects it would visit when scanned
+                        alone, see 'fused_tree_traversal'.
+    """
+    if root is None:
+        raise ValueError('Can\'t scan because root==None')
+
+    for routes in _fuse(route):
+        dispatches, leaves = [], []
+        for r in routes:
+            dispatch = _Dispatch([r])
+            dispatches.append(dispatch)
+            leaves.append(
+                _prune(root, getattr(r, '__scan_leaves__', None) or [],
+                       dispatch))
+
+        for path, obj, active in nexter(root, leaves):
+            for idx in active:
+                for args in dispatches[idx].merged:
+                    _handle_cls_without_app(obj.__class__, path, obj, *args)
+
+        for dispatch in dispatches:
+            dispatch.done()
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+import logging
+import pickle
+import pkgutil
+import types
+import weakref
+
+import six
+from six.moves import copyreg
+
+logger = logging.getLogger(__name__)
+
+# the format of snapshot, bump it when the layout changed
+_FORMAT = 3
+
+
+def get_version():
+    """ the version stamp of pyopenapi used in snapshots
+    """
+    # VERSION is shipped as package data
+    version = pkgutil.get_data('pyopenapi', 'VERSION').decode('utf-8')
+    return '{}-{}'.format(version.splitlines()[0].strip(), _FORMAT)
+
+
+def _new_proxy(obj):
+    return None if obj is None else weakref.proxy(obj)
+
+
+def _reduce_proxy(proxy):
+    try:
+        # methods accessed through a proxy are bound
+        # to the referent, not the proxy.
+        obj = proxy.__repr__.__self__
+    except ReferenceError:
+        obj = None
+    return _new_proxy, (obj, )
+
+
+_PROXY_TYPES = (weakref.ProxyType, weakref.CallableProxyType)
+
+_PLAIN_TYPES = frozenset(
+    (dict, list, tuple, set, frozenset, six.text_type, six.binary_type, bool,
+     float, complex, type(None)) + six.integer_types)
+
+_OPAQUE_TYPES = (type, types.FunctionType, types.BuiltinFunctionType,
+                 types.ModuleType) + six.class_types
+
+
+def _reduce(obj):
+    if isinstance(obj, _PROXY_TYPES):
+        return _reduce_proxy(obj)
+
+    reduce_ = copyreg.dispatch_table.get(type(obj), None)
+    if reduce_ is not None:
+        return reduce_(obj)
+    return obj.__reduce_ex__(pickle.HIGHEST_PROTOCOL)
+
+
+class _Flattener(object):
+    """ pickle works recursively, and the object graph of a spec
+    is deep when $ref are resolved. Objects are reduced here one
+    by one into flat records, which refer to each other by index.
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.objs = []
+        self.creators = []
+        self.states = []
+
+    def persistent_id(self, obj):
+        """ index of a flattened object, used as a persistent id """
+        idx = self.index.get(id(obj), None)
+        if idx is not None and self.objs[idx] is obj:
+            return idx
+        return None
+
+    def walk(self, root):
+        """ reduce all objects reachable from 'root' """
+        pending = [root]
+        while pending:
+            val = pending.pop()
+            cls = type(val)
+            if cls in _PLAIN_TYPES:
+                if cls is dict:
+                    pending.extend(val.keys())
+                    pending.extend(val.values())
+                elif cls in (list, tuple, set, frozenset):
+                    pending.extend(val)
+                continue
+
+            if isinstance(val, _OPAQUE_TYPES) or id(val) in self.index:
+                continue
+
+            reduced = _reduce(val)
+            if isinstance(reduced, six.string_types):
+                # pickled as a global
+                continue
+
+            reduced = tuple(reduced) + (None, ) * (5 - len(reduced))
+            func, args, state, listitems, dictitems = reduced[:5]
+            listitems = None if listitems is None else list(listitems)
+            dictitems = None if dictitems is None else list(dictitems)
+
+            self.index[id(val)] = len(self.objs)
+            self.objs.append(val)
+            self.creators.append((func, args))
+            self.states.append((state, listitems, dictitems))
+            pending.extend((args, state, listitems, dictitems))
+
+
+class _Ref(object):  # pylint: disable=too-few-public-methods
+    """ placeholder of a flattened object not created yet """
+    __slots__ = ('idx', )
+
+    def __init__(self, idx):
+        self.idx = idx
+
+
+def _relink(val, objs):
+    cls = type(val)
+    if cls is _Ref:
+        return objs[val.idx]
+    if cls in (tuple, list):
+        return cls(_relink(v, objs) for v in val)
+    return val
+
+
+def _deps(val):
+    cls = type(val)
+    if cls is _Ref:
+        return [val.idx]
+    if cls in (tuple, list):
+        return [idx for v in val for idx in _deps(v)]
+    return []
+
+
+def _create(creators):
+    objs = [None] * len(creators)
+    created = [False] * len(creators)
+    for idx in range(len(creators)):
+        pending = [idx]
+        while pending:
+            cur = pending[-1]
+            if created[cur]:
+                pending.pop()
+                continue
+
+            func, args = creators[cur]
+            deps = [dep for dep in _deps(args) if not created[dep]]
+            if deps:
+                pending.extend(deps)
+                continue
+
+            objs[cur] = func(*_relink(args, objs))
+            created[cur] = True
+            pending.pop()
+    return objs
+
+
+def _build(obj, state, listitems, dictitems):
+    """ the same as what pickle does for objects reduced by
+    __reduce_ex__
+    """
+    if listitems:
+        if hasattr(obj, 'extend'):
+            obj.extend(listitems)
+        else:
+            for item in listitems:
+                obj.append(item)
+    if dictitems:
+        for key, val in dictitems:
+            obj[key] = val
+
+    if state is None:
+        return
+
+    setstate = getattr(obj, '__setstate__', None)
+    if setstate is not None:
+        setstate(state)
+        return
+
+    slotstate = None
+    if isinstance(state, tuple) and len(state) == 2:
+        state, slotstate = state
+    if state:
+        obj.__dict__.update(state)
+    if slotstate:
+        for key, val in slotstate.items():
+            setattr(obj, key, val)
+
+
+def dump(header, state, file_obj):
+    """ write a snapshot: 'header' is checked before loading 'state'
+    """
+    pickle.dump(header, file_obj, pickle.HIGHEST_PROTOCOL)
+
+    flattener = _Flattener()
+    flattener.walk(state)
+
+    # one pickler for both parts to share the memo, objects
+    # referred in both parts are kept identical.
+    pickler = pickle.Pickler(file_obj, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = flattener.persistent_id
+    pickler.dump(flattener.creators)
+    pickler.dump((flattener.states, state))
+
+
+def load_header(file_obj):
+    """ load the header of a snapshot, None is returned
+    when it's not a valid one
+    """
+    try:
+        header = pickle.load(file_obj)
+    except Exception:  # pylint: disable=broad-except
+        logger.info('invalid snapshot', exc_info=True)
+        return None
+
+    return header if isinstance(header, dict) else None
+
+
+def load_state(file_obj):
+    """ load the state of a snapshot, should be called after 'load_header'
+    """
+    objs = []
+    unpickler = pickle.Unpickler(file_obj)
+    unpickler.persistent_load = \
+        lambda idx: objs[idx] if objs else _Ref(idx)
+
+    objs.extend(_create(unpickler.load()))
+    states, state = unpickler.load()
+
+    # objects found later are usually children of former ones,
+    # build them first as pickle does.
+    for idx in reversed(range(len(objs))):
+        _build(objs[idx], *states[idx])
+    return state
@@ -7,9 +7,16 @@ from .obj import (
     child,
     internal,
     rename,
+    lazy_construction,
+    collect_refs,
+    interned_by,
+    reachable_classes,
+    iter_spec_refs,
+    iter_dump,
     map_,
     list_,
     _Map,
     _List,
     _Base,
 )
+from .intern import FragmentInterner
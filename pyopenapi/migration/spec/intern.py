@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import six
+
+
+class FragmentInterner(object):
+    """ share raw specs with the same content, ex. {'type': 'string'}
+    repeated thousands of times in converted specs.
+
+    Only content is shared: spec objects built from them are still
+    created for each location, and keep path-dependent states, like
+    path, parent and attributes. Containers with '$ref', at any level,
+    are not shared because '$ref' would be rewritten when resolving.
+
+    Keys and string values are interned as well, keys of parsed documents
+    are then identical to those used in code, ex. 'type' of field().
+    """
+
+    def __init__(self):
+        # key of content -> the shared container
+        self.__table = {}
+        # id of shared containers
+        self.__ids = set()
+        # shared containers restored from pickle, not in table
+        self.__restored = []
+        # strings unable to be interned by sys.intern, ex. unicode in py2
+        self.__strings = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def owns(self, spec):
+        """ check if a container is shared by this interner,
+        which should not be modified in place.
+        """
+        return id(spec) in self.__ids
+
+    def __len__(self):
+        return len(self.__ids)
+
+    def __reduce__(self):
+        return (FragmentInterner, (), [
+            v for v in six.itervalues(self.__table)
+        ] + self.__restored)
+
+    def __setstate__(self, state):
+        self.__restored = state
+        self.__ids = set(id(v) for v in state)
+        self.__strings = {}
+
+    def __string(self, val):
+        if type(val) is str:  # pylint: disable=unidiomatic-typecheck
+            return six.moves.intern(val)
+        return self.__strings.setdefault(val, val)
+
+    def __share(self, key, val):
+        try:
+            found = self.__table[key]
+        except KeyError:
+            self.misses += 1
+            self.__table[key] = val
+            self.__ids.add(id(val))
+            return val, ('o', id(val))
+
+        self.hits += 1
+        return found, ('o', id(found))
+
+    def __intern(self, spec):
+        """ return (the shared one, key of content), key would
+        be None when it can't be shared.
+        """
+        if isinstance(spec, (dict, list)):
+            if id(spec) in self.__ids:
+                return spec, ('o', id(spec))
+        else:
+            if isinstance(spec, six.string_types):
+                spec = self.__string(spec)
+            # 1, 1.0 and True are equal, but not the same
+            return spec, (type(spec), spec)
+
+        # scalars are handled here rather than recursion, for speed
+        string = self.__string
+        if isinstance(spec, dict):
+            ret, keys, shareable = {}, [], '$ref' not in spec
+            for k, val in six.iteritems(spec):
+                if isinstance(k, six.string_types):
+                    k = string(k)
+                if isinstance(val, (dict, list)):
+                    val, key = self.__intern(val)
+                else:
+                    if isinstance(val, six.string_types):
+                        val = string(val)
+                    key = (type(val), val)
+                ret[k] = val
+                if key is None:
+                    shareable = False
+                elif shareable:
+                    keys.append((k, key))
+
+            if not shareable:
+                return ret, None
+            return self.__share(('d', frozenset(keys)), ret)
+
+        ret, keys, shareable = [], [], True
+        for val in spec:
+            if isinstance(val, (dict, list)):
+                val, key = self.__intern(val)
+            else:
+                if isinstance(val, six.string_types):
+                    val = string(val)
+                key = (type(val), val)
+            ret.append(val)
+            if key is None:
+                shareable = False
+            elif shareable:
+                keys.append(key)
+
+        if not shareable:
+            return ret, None
+        return self.__share(('l', tuple(keys)), ret)
+
+    def intern(self, spec):
+        """ share containers in a raw spec with those having the same
+        content. The input is not modified.
+
+        :param spec: something parsed from json
+        :return: the raw spec with shared containers
+        """
+        return self.__intern(spec)[0]
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import absolute_import
+import contextlib
+import importlib
+import threading
 import types
 import copy
 import itertools
@@ -11,6 +14,82 @@ from ...utils import jp_compose, jp_split
 from ...errs import FieldNotExist
 
 
+class _Construction(object):
+    """ how objects are constructed, kept by objects to build
+    their children in the same way.
+    """
+
+    __slots__ = ('lazy', 'on_ref', 'interner')
+
+    def __init__(self, lazy=False, on_ref=None, interner=None):
+        self.lazy = lazy
+        self.on_ref = on_ref
+        self.interner = interner
+
+    def __reduce__(self):
+        # functions are not kept in snapshots, callable objects, ex.
+        # those adding referrers to a RefIndex, are. Children built
+        # after restored are still collected.
+        on_ref = None if isinstance(
+            self.on_ref,
+            (types.FunctionType, types.MethodType)) else self.on_ref
+        return (_Construction, (self.lazy, on_ref, self.interner))
+
+
+_PACKAGE = __name__.split('.')[0] + '.'
+
+_DEFAULT_CONSTRUCTION = _Construction()
+_MODE = threading.local()
+
+
+def _get_construction():
+    return getattr(_MODE, 'construction', _DEFAULT_CONSTRUCTION)
+
+
+@contextlib.contextmanager
+def _construct_with(construction):
+    origin = _get_construction()
+    _MODE.construction = construction
+    try:
+        yield
+    finally:
+        _MODE.construction = origin
+
+
+def lazy_construction(lazy=True):
+    """ objects constructed in this context would build their
+    children/elements on first access, instead of in constructor.
+    Objects built later keep the mode of their parents.
+    """
+    current = _get_construction()
+    return _construct_with(
+        _Construction(lazy, current.on_ref, current.interner))
+
+
+def collect_refs(on_ref):
+    """ objects with '$ref' constructed in this context, including
+    children built later, would be passed to 'on_ref'. Unlike functions,
+    callable objects passed as 'on_ref' are kept in snapshots.
+    """
+    current = _get_construction()
+    return _construct_with(
+        _Construction(current.lazy, on_ref, current.interner))
+
+
+def interned_by(interner):
+    """ objects constructed in this context, including children built
+    later, copy their raw specs shared by 'interner' before modifying them.
+    """
+    current = _get_construction()
+    return _construct_with(
+        _Construction(current.lazy, current.on_ref, interner))
+
+
+class _Pending(object):  # pylint: disable=too-few-public-methods
+    """ placeholder for elements of containers not built yet
+    """
+
+
 def field(key, required=False, default=None, restricted=False, readonly=True):
     """ property factory for primitives(string, int, ...)
     Args:
@@ -34,7 +113,7 @@ def field(key, required=False, default=None, restricted=False, readonly=True):
         return default
 
     def _writer_(self, val):
-        self.spec[key] = val
+        self.own_spec()[key] = val
 
     return property(_getter_, None if readonly else _writer_)
 
@@ -44,11 +123,13 @@ def internal(key, default=None):
     """
 
     def _getter_(self):
-        if key in self.internal:
+        if self.internal and key in self.internal:
             return self.internal[key]
         return default
 
     def _setter_(self, val):
+        if self.internal is None:
+            self.internal = {}
         self.internal[key] = val
 
     return property(_getter_, _setter_)
@@ -90,10 +171,12 @@ def child(key, child_builder=None, required=False, default=None):
             return self.children[key]
 
         # check if we have any overriden children
-        ovr = self.override.get(key, {})
+        ovr = self.get_override(key)
         chd = ovr.get('', None)
         if chd:
             self.children[key] = chd
+            if hasattr(chd, 'set_parent'):
+                chd.set_parent(self)
             return chd
 
         # lazy initialize of children
@@ -109,9 +192,11 @@ def child(key, child_builder=None, required=False, default=None):
             val = copy.copy(default)
 
         if val is not None:
-            chd = child_builder(
-                val, path=jp_compose(key, base=self.get_path()), override=ovr)
+            chd = self.build_child(child_builder, val,
+                                   jp_compose(key, base=self.get_path()), ovr)
             self.children[key] = chd
+            if hasattr(chd, 'set_parent'):
+                chd.set_parent(self)
             return chd
         return None
 
@@ -127,13 +212,27 @@ def child(key, child_builder=None, required=False, default=None):
 
 
 class _Base(object):
+    __slots__ = (
+        'spec',
+        'override',
+        'children_cache',
+        '__path',
+        '__parent',
+        '__construction',
+        '__weakref__',
+    )
+
     def __init__(self, spec, path=None, override=None):
         self.__path = path
         self.__parent = None
+        self.__construction = _get_construction()
         self.spec = spec
-        self.override = {}
+
         # inside 'override':
         #   (first token of jp_split) => (reminder of jp_split, value)
+        #
+        # allocated only when there is something to override
+        self.override = {} if override else None
 
         self.children_cache = {}
 
@@ -150,6 +249,34 @@ class _Base(object):
                     'invalid token found for "override": {}, in {}'.format(
                         k, path))
 
+    def get_override(self, key):
+        """ get overridden values under a key
+        """
+        return self.override.get(key, {}) if self.override else {}
+
+    def is_lazy(self):
+        """ check if children of this object are built on first access
+        """
+        return self.__construction.lazy
+
+    def build_child(self, builder, val, path, override):
+        """ build a child in the same construction mode as this object
+        """
+        if self.__construction is _get_construction():
+            return builder(val, path=path, override=override)
+
+        with _construct_with(self.__construction):
+            return builder(val, path=path, override=override)
+
+    def own_spec(self):
+        """ get 'spec' to modify in place, it's copied when shared
+        with other objects by interning.
+        """
+        interner = self.__construction.interner
+        if interner is not None and interner.owns(self.spec):
+            self.spec = copy.copy(self.spec)
+        return self.spec
+
     def is_set(self, k):
         """ check if a key is setted from Swagger API document
         :param k: the key to check
@@ -177,9 +304,187 @@ class _Base(object):
     def set_parent(self, parent):
         self.__parent = parent
 
+    def invalidate_ancestors_children_cache(self):
+        """ invalidate 'children_cache' of this object and its ancestors,
+        which might include flattened children of this one.
+        """
+        obj = self
+        while obj is not None:
+            obj.invalidate_children_cache()
+            obj = obj.get_parent()
+
+    def replace_child(self, key, val):
+        """ replace a child with another one
+
+        :param key: the key of this child in spec
+        :param val: a spec object, or something parsed from json to build one
+        :return: the new child
+        """
+        raise NotImplementedError()
+
     def get_path(self):
         return self.__path
 
+    def dump_items(self):
+        """ (key, value) pairs to dump, keys are indexes for lists
+        """
+        raise NotImplementedError()
+
+    def iter_dump(self, sort_keys=False):
+        """ events of dumping this object, without building the
+        whole dict returned by 'dump', refer to 'iter_dump'
+        """
+        return iter_dump(self, sort_keys=sort_keys)
+
+
+# events of 'iter_dump'
+START_MAP = 'start_map'
+MAP_KEY = 'map_key'
+END_MAP = 'end_map'
+START_ARRAY = 'start_array'
+END_ARRAY = 'end_array'
+SCALAR = 'scalar'
+
+
+def _escape(key):
+    if '~' in key or '/' in key:
+        return key.replace('~', '~0').replace('/', '~1')
+    return key
+
+
+def _sorted_items(items):
+    # the same as yaml.representer.BaseRepresenter.represent_mapping,
+    # keys can't be compared are kept in order.
+    items = list(items)
+    try:
+        items.sort(key=lambda item: item[0])
+    except TypeError:
+        pass
+    return iter(items)
+
+
+def iter_dump(obj, path='#', sort_keys=False):
+    """ events of dumping an object, which could be serialized
+    incrementally. Each event is (path, event, value):
+     - (path of map, START_MAP/END_MAP, None)
+     - (path of map, MAP_KEY, key)
+     - (path of list, START_ARRAY/END_ARRAY, None)
+     - (path of value, SCALAR, value)
+
+    The object is walked iteratively, only those objects along the
+    current path are kept.
+
+    :param obj: a spec object, or anything parsed from json
+    :param str path: the JSON pointer of 'obj'
+    :param bool sort_keys: keys of maps are sorted, only items of maps
+    along the current path are kept then.
+    """
+    # stack of (iterator of items, is map, path of container + '/')
+    stack = []
+    while True:
+        if isinstance(obj, (Base2Obj, _Map, dict)):
+            yield path, START_MAP, None
+            items = six.iteritems(obj) if isinstance(
+                obj, dict) else obj.dump_items()
+            stack.append((_sorted_items(items) if sort_keys else items, True,
+                          path + '/'))
+        elif isinstance(obj, _List):
+            yield path, START_ARRAY, None
+            stack.append((obj.dump_items(), False, path + '/'))
+        elif isinstance(obj, (list, tuple)):
+            yield path, START_ARRAY, None
+            stack.append((enumerate(obj), False, path + '/'))
+        else:
+            yield path, SCALAR, obj
+
+        while stack:
+            items, is_map, base = stack[-1]
+            try:
+                key, obj = six.advance_iterator(items)
+            except StopIteration:
+                stack.pop()
+                yield base[:-1], END_MAP if is_map else END_ARRAY, None
+                continue
+
+            if is_map:
+                yield base[:-1], MAP_KEY, key
+                path = base + _escape(
+                    key if isinstance(key, six.string_types) else str(key))
+            else:
+                path = base + str(key)
+            break
+        else:
+            return
+
+
+# (module, name) -> classes created by list_/map_, to make
+# them reachable by name when unpickling.
+_CONTAINER_CLASSES = {}
+
+
+def _container_class(base, prefix, builder):
+    key = (builder.__module__, prefix + builder.__name__)
+    cls = _CONTAINER_CLASSES.get(key, None)
+    if cls is not None and cls.__dict__['__child_builder__'] is builder:
+        return cls
+
+    cls = type(key[1], (base, ),
+               dict(
+                   __slots__=(),
+                   __module__=key[0],
+                   __child_builder__=builder,
+                   __child_builder_unbound__=isinstance(
+                       builder, types.FunctionType),
+               ))
+    _CONTAINER_CLASSES.setdefault(key, cls)
+    return cls
+
+
+def _new_container(module, name):
+    """ create an empty instance of classes from list_/map_ when unpickling
+    """
+    importlib.import_module(module)
+    cls = _CONTAINER_CLASSES[(module, name)]
+    return cls.__new__(cls)
+
+
+def _slots_state(obj):
+    """ get state of objects with __slots__ in the form accepted by
+    the default __setstate__ of pickle
+    """
+    # pylint: disable=protected-access
+    state = {}
+    for name in six.moves.copyreg._slotnames(type(obj)):
+        if hasattr(obj, name):
+            state[name] = getattr(obj, name)
+    return (getattr(obj, '__dict__', None), state)
+
+
+def _reduce_container(obj, protocol):
+    cls = type(obj)
+    if _CONTAINER_CLASSES.get((cls.__module__, cls.__name__), None) is cls:
+        return (_new_container, (cls.__module__, cls.__name__),
+                _slots_state(obj))
+    return super(_Base, obj).__reduce_ex__(protocol)
+
+
+def _build_elm(container, key, path_key, val):
+    """ build an element of _List/_Map
+    """
+    ovr = container.get_override(key)
+    elm = ovr.get('', None)
+    if not elm:
+        builder = container.__child_builder__.__func__ \
+            if container.__child_builder_unbound__ else container.__child_builder__
+        elm = container.build_child(builder, val,
+                                    jp_compose(path_key,
+                                               base=container.get_path()), ovr)
+
+    if hasattr(elm, 'set_parent'):
+        elm.set_parent(container)
+
+    return elm
+
 
 def list_(builder):
     """ class factory for _Map, would create a new class based on _List
@@ -188,12 +493,7 @@ def list_(builder):
      - builder: child class, whose __init__ in the form: (self, val), where 'val' is something parsed from json,
               would be assigned to __child_builder__ of the newly created class, or a function accept a argument in dict.
     """
-    return type('List_' + builder.__name__, (_List, ),
-                dict(
-                    __child_builder__=builder,
-                    __child_builder_unbound__=isinstance(
-                        builder, types.FunctionType),
-                ))
+    return _container_class(_List, 'List_', builder)
 
 
 class _List(_Base):
@@ -202,6 +502,8 @@ class _List(_Base):
     on all those objects.
     """
 
+    __slots__ = ('__elm', )
+
     __child_builder_unbound__ = False
 
     def __init__(self, spec, path=None, override=None):
@@ -213,26 +515,27 @@ class _List(_Base):
                 'should be a list when constructing _List, not {}, {}'.format(
                     str(type(spec)), path))
 
+        if self.is_lazy():
+            self.__elm = [_Pending] * len(spec)
+            return
+
         # generate children for all keys in spec
         for idx, e in enumerate(spec):
             idx = str(idx)
+            self.__elm.append(_build_elm(self, idx, idx, e))
 
-            ovr = self.override.get(idx, {})
-            elm = ovr.get('', None)
-            if not elm:
-                path = jp_compose(idx, base=self.get_path())
-                if self.__child_builder_unbound__:
-                    elm = self.__child_builder__.__func__(  # pylint: disable=no-member
-                        e,
-                        path=path,
-                        override=ovr)
-                else:
-                    elm = self.__child_builder__(e, path=path, override=ovr)  # pylint: disable=no-member
-
-            if hasattr(elm, 'set_parent'):
-                elm.set_parent(self)
+    def __get(self, idx):
+        elm = self.__elm[idx]
+        if elm is _Pending:
+            idx = idx + len(self.__elm) if idx < 0 else idx
+            elm = _build_elm(self, str(idx), str(idx), self.spec[idx])
+            self.__elm[idx] = elm
+        return elm
 
-            self.__elm.append(elm)
+    def __build_all(self):
+        for idx, elm in enumerate(self.__elm):
+            if elm is _Pending:
+                self.__get(idx)
 
     def resolve(self, parts):
         if isinstance(parts, six.string_types):
@@ -241,12 +544,15 @@ class _List(_Base):
         obj = self
         if parts:
             idx = parts.pop(0)
-            return self.__elm[int(idx)].resolve(parts)
+            return self.__get(int(idx)).resolve(parts)
         return obj
 
     def merge_children(self, other):
         raise NotImplementedError()
 
+    def __reduce_ex__(self, protocol):
+        return _reduce_container(self, protocol)
+
     def compare(self, other, base=None):
         # pylint: disable=unidiomatic-typecheck
         if type(self) != type(other):
@@ -271,6 +577,7 @@ class _List(_Base):
         if not self.__elm:
             return ret
 
+        self.__build_all()
         is_primitive = not hasattr(self.__elm[0], 'dump')
         if is_primitive:
             return copy.copy(self.__elm)
@@ -279,6 +586,9 @@ class _List(_Base):
             ret.append(e.dump())
         return ret
 
+    def dump_items(self):
+        return enumerate(self)
+
     # pylint: disable=no-self-use
     def get_field_names(self):
         return []
@@ -288,6 +598,7 @@ class _List(_Base):
         if ret:
             return ret
 
+        self.__build_all()
         for idx, obj in enumerate(self.__elm):
             if isinstance(obj, Base2Obj):
                 ret[str(idx)] = obj
@@ -303,16 +614,20 @@ class _List(_Base):
         return ret
 
     def __iter__(self):
-        for e in self.__elm:
-            yield e
+        for idx in six.moves.xrange(len(self.__elm)):
+            yield self.__get(idx)
 
     def __getitem__(self, idx):
-        return self.__elm[idx]
+        if isinstance(idx, slice):
+            self.__build_all()
+            return self.__elm[idx]
+        return self.__get(idx)
 
     def __len__(self):
         return len(self.__elm)
 
     def __eq__(self, other):
+        self.__build_all()
         return self.__elm == other
 
     def append(self, obj):
@@ -320,6 +635,21 @@ class _List(_Base):
 
         return self.__elm.append(obj)
 
+    def replace_child(self, key, val):
+        idx = int(key)
+        if isinstance(val, _Base):
+            self.own_spec()[idx] = val.spec
+            val.set_parent(self)
+        else:
+            self.own_spec()[idx] = val
+            if self.override:
+                self.override.pop(str(idx), None)
+            val = _build_elm(self, str(idx), str(idx), val)
+
+        self.__elm[idx] = val
+        self.invalidate_ancestors_children_cache()
+        return val
+
     def extend(self, other):
         self.invalidate_children_cache()
 
@@ -333,13 +663,7 @@ def map_(builder):
      - builder: child class, whose __init__ in the form: (self, val), where 'val' is something parsed from json,
               would be assigned to __child_builder__ of the newly created class, or a function accept a argument in dict.
     """
-
-    return type('Map_' + builder.__name__, (_Map, ),
-                dict(
-                    __child_builder__=builder,
-                    __child_builder_unbound__=isinstance(
-                        builder, types.FunctionType),
-                ))
+    return _container_class(_Map, 'Map_', builder)
 
 
 class _Map(_Base):
@@ -348,6 +672,8 @@ class _Map(_Base):
     on all those objects.
     """
 
+    __slots__ = ('__elm', )
+
     __child_builder_unbound__ = False
 
     def __init__(self, spec, path=None, override=None):
@@ -359,27 +685,24 @@ class _Map(_Base):
                 'should be an instance of dict when reaching _Map constructor, not {}, {}'.
                 format(str(type(spec)), self.get_path()))
 
+        if self.is_lazy():
+            self.__elm = dict.fromkeys(spec, _Pending)
+            return
+
         # generate children for all keys in spec
         for k in spec:
-            ovr = self.override.get(k, {})
-            elm = ovr.get('', None)
-            if not elm:
-                path = jp_compose(str(k), base=self.get_path())
-                if self.__child_builder_unbound__:
-                    elm = self.__child_builder__.__func__(  # pylint: disable=no-member
-                        spec[k],
-                        path=path,
-                        override=ovr)
-                else:
-                    elm = self.__child_builder__(  # pylint: disable=no-member
-                        spec[k],
-                        path=path,
-                        override=ovr)
+            self.__elm[k] = _build_elm(self, k, str(k), spec[k])
 
-            if hasattr(elm, 'set_parent'):
-                elm.set_parent(self)
+    def __get(self, key):
+        elm = self.__elm[key]
+        if elm is _Pending:
+            elm = _build_elm(self, key, str(key), self.spec[key])
+            self.__elm[key] = elm
+        return elm
 
-            self.__elm[k] = elm
+    def __build_all(self):
+        for key in [k for k, elm in six.iteritems(self.__elm) if elm is _Pending]:
+            self.__get(key)
 
     def resolve(self, parts):
         if isinstance(parts, six.string_types):
@@ -388,12 +711,15 @@ class _Map(_Base):
         obj = self
         if parts:
             key = parts.pop(0)
-            return self.__elm[key].resolve(parts)
+            return self.__get(key).resolve(parts)
         return obj
 
     def merge_children(self, other):
         raise NotImplementedError()
 
+    def __reduce_ex__(self, protocol):
+        return _reduce_container(self, protocol)
+
     def compare(self, other, base=None):
         # pylint: disable=unidiomatic-typecheck
         if type(self) != type(other):
@@ -406,6 +732,7 @@ class _Map(_Base):
         if diff:
             return False, jp_compose(diff[0], base=base)
 
+        self.__build_all()
         for name in self.__elm:
             new_base = jp_compose(name, base=base)
             if isinstance(self.__elm[name],
@@ -420,6 +747,7 @@ class _Map(_Base):
 
     def dump(self):
         ret = {}
+        self.__build_all()
         for k, obj in six.iteritems(self.__elm):
             if hasattr(obj, 'dump') and callable(obj.dump):
                 ret[k] = obj.dump()
@@ -428,6 +756,10 @@ class _Map(_Base):
 
         return ret
 
+    def dump_items(self):
+        for key in list(self.__elm):
+            yield key, self.__get(key)
+
     # pylint: disable=no-self-use
     def get_field_names(self):
         return []
@@ -440,6 +772,7 @@ class _Map(_Base):
         if ret:
             return ret
 
+        self.__build_all()
         for name, obj in six.iteritems(self.__elm):
             if isinstance(obj, Base2Obj):
                 ret[name] = obj
@@ -455,33 +788,51 @@ class _Map(_Base):
         return ret
 
     def __getitem__(self, key):
-        return self.__elm[key]
+        return self.__get(key)
 
     def __setitem__(self, key, obj):
         self.invalidate_children_cache()
 
         self.__elm[key] = obj
 
+    def replace_child(self, key, val):
+        if isinstance(val, _Base):
+            self.own_spec()[key] = val.spec
+            val.set_parent(self)
+        else:
+            self.own_spec()[key] = val
+            if self.override:
+                self.override.pop(key, None)
+            val = _build_elm(self, key, str(key), val)
+
+        self.__elm[key] = val
+        self.invalidate_ancestors_children_cache()
+        return val
+
     def __contains__(self, elm):
         return elm in self.__elm
 
     def __eq__(self, other):
+        self.__build_all()
         return self.__elm == other
 
     def iteritems(self):
+        self.__build_all()
         return six.iteritems(self.__elm)
 
     def itervalues(self):
+        self.__build_all()
         return six.itervalues(self.__elm)
 
     def items(self):
+        self.__build_all()
         return six.viewitems(self.__elm)
 
     def iterkeys(self):
         return six.iterkeys(self.__elm)
 
     def get(self, key, default=None):
-        return self.__elm.get(key, default)
+        return self.__get(key) if key in self.__elm else default
 
     def __len__(self):
         return len(self.__elm)
@@ -521,6 +872,13 @@ class FieldMeta(type):
         _update_to_spc(internal, intl)
         _update_to_spc(child, children)
 
+        # keep the compact layout of Base2Obj for classes of pyopenapi,
+        # attributes not listed in __slots__ should be declared in
+        # subclasses. Classes defined elsewhere keep their __dict__,
+        # unless they declare __slots__.
+        if spc.get('__module__', '').startswith(_PACKAGE):
+            spc.setdefault('__slots__', ())
+
         return type.__new__(mcs, name, bases, spc)
 
 
@@ -528,6 +886,12 @@ class Base2Obj(_Base):
     """ Base implementation of all Open API objects
     """
 
+    __slots__ = (
+        'children',
+        'internal',
+        'attrs',
+    )
+
     __children__ = {}
     __fields__ = {}
     __internal__ = {}
@@ -541,8 +905,17 @@ class Base2Obj(_Base):
         """
         super(Base2Obj, self).__init__(spec, path, override)
         self.children = {}
-        self.internal = {}
-        self.attrs = {}
+
+        # allocated on first write
+        self.internal = None
+        self.attrs = None
+
+        on_ref = _get_construction().on_ref
+        if on_ref and isinstance(spec, dict) and '$ref' in spec:
+            on_ref(self)
+
+        if self.is_lazy():
+            return
 
         # traverse through children
         for name in self.__children__:
@@ -664,6 +1037,23 @@ class Base2Obj(_Base):
 
         return ret
 
+    def dump_items(self):
+        children = self.__children__
+        for name in children:
+            child_ = getattr(self, name)
+            if child_:
+                yield name, child_
+
+        for name in self.__fields__:
+            if name in children and getattr(self, name):
+                continue
+            if not self.is_set(name):
+                continue
+
+            obj = getattr(self, name)
+            if obj is not None:
+                yield name, obj
+
     def attach_child(self, name, obj):
         if name not in self.__children__:
             raise Exception(
@@ -676,6 +1066,28 @@ class Base2Obj(_Base):
 
         self.invalidate_children_cache()
 
+    def replace_child(self, key, val):
+        for name, args in six.iteritems(self.__children__):
+            if (args.get('key', None) or name) == key:
+                break
+        else:
+            raise Exception(
+                'attemp to replace a children not in child fields {}:{}, {}'.
+                format(str(type(self)), key, self.get_path()))
+
+        if isinstance(val, _Base):
+            self.own_spec()[key] = val.spec
+            self.attach_child(name, val)
+        else:
+            self.own_spec()[key] = val
+            if self.override:
+                self.override.pop(key, None)
+            self.children.pop(key, None)
+            val = getattr(self, name)
+
+        self.invalidate_ancestors_children_cache()
+        return val
+
     @classmethod
     def attach_field(cls, name, **field_descriptor):
         desc = copy.copy(field_descriptor)
@@ -685,6 +1097,7 @@ class Base2Obj(_Base):
         setattr(cls, name, builder(key or name, **desc))
         if builder.__name__ == 'child':
             cls.__children__[name] = field_descriptor
+            _REACHABLE.clear()
         elif builder.__name__ == 'internal':
             cls.__internal__[name] = field_descriptor
 
@@ -728,15 +1141,120 @@ class Base2Obj(_Base):
          - group_cls: the AttributeGroup to init when None is found
         """
 
-        if namespace in self.attrs:
+        if self.attrs and namespace in self.attrs:
             return self.attrs[namespace]
 
         if group_cls is None:
             return None
 
         group = group_cls({})
+        if self.attrs is None:
+            self.attrs = {}
         self.attrs[namespace] = group
         return group
 
 
 Base2 = six.with_metaclass(FieldMeta, Base2Obj)
+
+# class -> classes reachable beneath it
+_REACHABLE = {}
+
+
+def _built_classes(builder):
+    """ classes of objects might be created by a child builder, None when unknown
+    """
+    if isinstance(builder, type):
+        if issubclass(builder, (_Map, _List)):
+            chd = builder.__child_builder__
+            return _built_classes(
+                six.get_unbound_function(chd)
+                if builder.__child_builder_unbound__ else chd)
+        if issubclass(builder, Base2Obj):
+            return set([builder])
+        return None
+
+    # functions could declare what they build by '__builds__'
+    builds = getattr(builder, '__builds__', None)
+    if builds is None:
+        return None
+
+    ret = set()
+    for b in builds:
+        classes = _built_classes(b)
+        if classes is None:
+            return None
+        ret |= classes
+    return ret
+
+
+def reachable_classes(cls):
+    """ get classes of objects which might be found beneath objects of
+    'cls', according to '__children__' declarations.
+
+    :return: a frozenset of classes, or None when unknown
+    """
+    try:
+        return _REACHABLE[cls]
+    except KeyError:
+        pass
+
+    ret, visited, stack = set(), set([cls]), [cls]
+    while stack:
+        for args in six.itervalues(stack.pop().__children__):
+            classes = _built_classes(args.get('child_builder', None))
+            if classes is None:
+                _REACHABLE[cls] = None
+                return None
+
+            ret |= classes
+            stack.extend(classes - visited)
+            visited |= classes
+
+    ret = _REACHABLE[cls] = frozenset(ret)
+    return ret
+
+
+def iter_spec_refs(builder, spec):
+    """ iterate through values of '$ref' in a raw spec to be built by
+    'builder'. Only '$ref' at positions of objects are counted, those
+    under values of fields, ex. 'example', 'default' or extensions,
+    are data. Raw specs under unknown builders, ex. functions without
+    '__builds__', are searched as a whole.
+    """
+    pending, yielded = [(builder, spec)], set()
+    while pending:
+        builder, spec = pending.pop()
+        if isinstance(builder, type) and issubclass(builder, (_Map, _List)):
+            chd = builder.__child_builder__
+            if builder.__child_builder_unbound__:
+                chd = six.get_unbound_function(chd)
+            if issubclass(builder, _Map) and isinstance(spec, dict):
+                pending.extend([(chd, val) for val in six.itervalues(spec)])
+            elif issubclass(builder, _List) and isinstance(spec, list):
+                pending.extend([(chd, elm) for elm in spec])
+            continue
+
+        if isinstance(builder, type) and issubclass(builder, Base2Obj):
+            if not isinstance(spec, dict):
+                continue
+            ref = spec.get('$ref', None)
+            if isinstance(ref, six.string_types) and id(spec) not in yielded:
+                yielded.add(id(spec))
+                yield ref
+            for name, args in six.iteritems(builder.__children__):
+                if name in spec:
+                    pending.append((args.get('child_builder', None),
+                                    spec[name]))
+            continue
+
+        builds = getattr(builder, '__builds__', None)
+        if builds is not None:
+            pending.extend([(b, spec) for b in builds])
+        elif isinstance(spec, dict):
+            for key, val in six.iteritems(spec):
+                if key == '$ref' and isinstance(val, six.string_types):
+                    yield val
+                else:
+                    pending.append((None, val))
+        elif isinstance(spec, list):
+            pending.extend([(None, elm) for elm in spec])
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import absolute_import
+import itertools
 import logging
 import os
 from collections import OrderedDict
@@ -14,6 +15,83 @@ from .spec import _Base
 logger = logging.getLogger(__name__)
 
 
+class _JpIndex(object):
+    """ a trie of cached spec objects, keyed by
+    tokens of JSON pointer.
+    """
+
+    def __init__(self):
+        self.children = {}
+        self.obj = None
+
+    def set(self, tokens, obj):
+        node = self
+        for token in tokens:
+            node = node.children.setdefault(token, _JpIndex())
+        node.obj = obj
+
+    def longest(self, tokens):
+        """ find the deepest node holding an object along 'tokens'
+
+        :return: (the object, count of tokens consumed) or (None, 0)
+        """
+        found, depth = self.obj, 0
+        node = self
+        for idx, token in enumerate(tokens):
+            node = node.children.get(token, None)
+            if node is None:
+                break
+            if node.obj is not None:
+                found, depth = node.obj, idx + 1
+        return found, depth
+
+    def find(self, tokens):
+        """ find the node exactly at 'tokens', return (parent, node)
+        """
+        parent, node = None, self
+        for token in tokens:
+            parent, node = node, node.children.get(token, None)
+            if node is None:
+                return None, None
+        return parent, node
+
+    def walk(self):
+        """ iterate through (relative JSON pointer, node) under this node,
+        only nodes holding an object are reported.
+        """
+        nodes = [('', self)]
+        while nodes:
+            path, node = nodes.pop()
+            if node.obj is not None:
+                yield path, node
+            for token, chd in six.iteritems(node.children):
+                nodes.append((path + '/' + token if path else token, chd))
+
+
+class _RouteIndex(_JpIndex):
+    """ compiled routes of one spec version for $ref relocation,
+    the target of each route is either:
+    - a JSON pointer, absolute one starts with '#'
+    - a nested _RouteIndex
+    - False, when no relocation is required
+    """
+
+    def __init__(self, routes=None):
+        super(_RouteIndex, self).__init__()
+
+        for from_, to_ in six.iteritems(routes or {}):
+            if isinstance(to_, dict):
+                to_ = _RouteIndex(to_) if to_ else False
+            elif isinstance(to_, six.string_types):
+                to_ = to_ or False
+            else:
+                raise Exception(
+                    'unexpected JSON pointer patch type: {}:{}'.format(
+                        str(type(to_)), to_))
+
+            self.set(from_.split('/') if from_ else [], to_)
+
+
 class SpecObjStore(object):
     """ cache of spec objects
     """
@@ -21,6 +99,11 @@ class SpecObjStore(object):
     def __init__(self, migratable_spec_versions=None):
         self.__spec_objs = {}
         self.__routes = {}
+        # url -> list of (version, _RouteIndex), compiled from routes
+        self.__route_tables = {}
+        # url -> (jp, from_spec, to_spec) -> relocated jp
+        self.__relocated = {}
+        self.__versions = {}
         self.__migratable_spec_versions = False \
             or migratable_spec_versions \
             or utils.get_supported_versions(os.path.join('migration', 'versions'), is_pkg=True)
@@ -37,25 +120,24 @@ class SpecObjStore(object):
                 'attemp to cache invalid object for {},{} with type: {}'.format(
                     url, jp, str(type(obj))))
 
-        self.__spec_objs.setdefault(url, {}).setdefault(jp, {}).update({
-            spec_version:
-            obj
-        })
+        self.__spec_objs.setdefault(url, {}).setdefault(
+            spec_version, _JpIndex()).set(jp.split('/'), obj)
 
     def get(self, url, jp, spec_version):
         """ get spec object from cache
         """
-        url_cache = self.__spec_objs.get(url, None)
-        if not url_cache:
+        index = self.__spec_objs.get(url, {}).get(spec_version, None)
+        if not index:
             return None
 
-        # try to find a 'jp' with common prefix with input under 'url'
-        for path, cache in six.iteritems(url_cache):
-            if jp.startswith(path) and spec_version in cache:
-                return cache[spec_version].resolve(
-                    utils.jp_split(jp[len(path):])[1:])
+        # find the longest cached JSON pointer which is
+        # an ancestor of 'jp' under 'url'
+        tokens = jp.split('/')
+        obj, depth = index.longest(tokens)
+        if obj is None:
+            return None
 
-        return None
+        return obj.resolve(utils.jp_split('/'.join(tokens[depth:])))
 
     def get_under(self, url, jp, spec_version, remove=True):
         """ get all children under 'jp', and remove them
@@ -70,12 +152,20 @@ class SpecObjStore(object):
         if not url_cache:
             return None
 
-        ret = {}
-        for path, cache in six.iteritems(url_cache):
-            if path.startswith(jp) and spec_version in cache:
-                ret[path[len(jp) + 1:]] = cache[spec_version]
-                if remove:
-                    del cache[spec_version]
+        index = url_cache.get(spec_version, None)
+        if not index:
+            return {}
+
+        tokens = jp.split('/')
+        parent, node = index.find(tokens)
+        if node is None:
+            return {}
+
+        ret = {path: chd.obj for path, chd in node.walk()}
+        if remove:
+            # everything under 'node' is taken, the whole subtree
+            # could be dropped at once.
+            del parent.children[tokens[-1]]
 
         return ret
 
@@ -124,43 +214,43 @@ class SpecObjStore(object):
 
         self.__routes[url][to_spec].update(routes)
 
+        # invalidate compiled tables and relocated JSON pointers
+        self.__route_tables.pop(url, None)
+        self.__relocated.pop(url, None)
+
+    def _version(self, version):
+        ret = self.__versions.get(version, None)
+        if ret is None:
+            ret = self.__versions.setdefault(version, StrictVersion(version))
+        return ret
+
+    def _route_tables(self, url):
+        tables = self.__route_tables.get(url, None)
+        if tables is None:
+            tables = [(self._version(version), _RouteIndex(version_routes))
+                      for version, version_routes in six.iteritems(
+                          self.__routes[url])]
+            self.__route_tables[url] = tables
+        return tables
+
     @staticmethod
-    def _patch_jp(jp, routes):
-        current_routes = routes
-        fixed_prefix = ''
-        patch_to = None
-        remain_jp = jp
+    def _patch_jp(jp, index):
+        tokens = jp.split('/')
+        fixed = pos = 0
         while True:
-            patch_from = None
-            for from_, to_ in six.iteritems(current_routes):
-                # find the longest prefix in from_
-                if not remain_jp.startswith(from_):
-                    continue
-                if not patch_from or len(from_) > len(patch_from):
-                    patch_from, patch_to = from_, to_
-
+            # find the longest prefix of remaining tokens
+            patch_to, depth = index.longest(tokens[pos:])
             if not patch_to:
-                break
+                # there is no need for relocation
+                return jp
 
-            if isinstance(patch_to, dict):
+            fixed, pos = pos, pos + depth
+            if isinstance(patch_to, _RouteIndex):
                 # nested route map
-                current_routes, patch_to = patch_to, None
-                fixed_prefix += ('/' if fixed_prefix else '') + patch_from
-                remain_jp = remain_jp[len(patch_from):]
-                remain_jp = remain_jp[1:] if remain_jp.startswith(
-                    '/') else remain_jp
+                index = patch_to
                 continue
-            elif isinstance(patch_to, six.string_types):
-                break
-
-            raise Exception('unexpected JSON pointer patch type: {}:{}'.format(
-                str(type(patch_to)), patch_to))
-
-        if not patch_to:
-            # there is no need for relocation
-            return jp
+            break
 
-        new_jp = None
         # let's patch the JSON pointer
         if patch_to.startswith('#'):
             # an absolute JSON point
@@ -168,12 +258,11 @@ class SpecObjStore(object):
         else:
             # a relavie path case, need to compose
             # a qualified JSON pointer
-            new_jp = fixed_prefix + '/' + patch_to
+            new_jp = '/'.join(tokens[:fixed]) + '/' + patch_to
 
-        remain = jp[len(fixed_prefix + patch_from) + 1:]  # +1 for '/'
-        if remain:
-            new_jp += ('' if new_jp.endswith('/') or remain.startswith('/') else
-                       '/') + remain
+        if pos < len(tokens):
+            new_jp += ('' if new_jp.endswith('/') else '/') + '/'.join(
+                tokens[pos:])
         return new_jp
 
     def relocate(self, url, jp, from_spec, to_spec=None):
@@ -190,27 +279,120 @@ class SpecObjStore(object):
             return jp
 
         to_spec = to_spec or consts.DEFAULT_OPENAPI_SPEC_VERSION
-        url_routes = self.__routes[url]
-
-        if to_spec not in url_routes:
+        if to_spec not in self.__routes[url]:
             raise Exception(
                 'unsupported target spec version when patching $ref: {}'.format(
                     to_spec))
 
-        from_spec = StrictVersion(from_spec)
-        to_spec = StrictVersion(to_spec)
+        relocated = self.__relocated.setdefault(url, {})
+        key = (jp, from_spec, to_spec)
+        cur = relocated.get(key, None)
+        if cur is not None:
+            return cur
+
+        from_version, to_version = self._version(from_spec), self._version(
+            to_spec)
         cur = jp
-        for version, version_routes in six.iteritems(url_routes):
-            version = StrictVersion(version)
-            if version <= from_spec:
+        for version, index in self._route_tables(url):
+            if version <= from_version:
                 continue
-            if version > to_spec:
+            if version > to_version:
                 break
 
-            cur = SpecObjStore._patch_jp(cur, version_routes)
+            cur = SpecObjStore._patch_jp(cur, index)
 
+        relocated[key] = cur
         return cur
 
     @property
     def routes(self):
         return self.__routes
+
+    def discard(self, url):
+        """ drop cached objects and routes of a document
+        """
+        self.__spec_objs.pop(url, None)
+        self.__routes.pop(url, None)
+        self.__route_tables.pop(url, None)
+        self.__relocated.pop(url, None)
+
+
+class _RefCollector(object):  # pylint: disable=too-few-public-methods
+    """ add referrers of a document to a RefIndex, unlike closures,
+    it could be kept in snapshots along with objects.
+    """
+
+    __slots__ = ('index', 'url')
+
+    def __init__(self, index, url):
+        self.index = index
+        self.url = url
+
+    def __call__(self, obj):
+        self.index.add(obj, self.url)
+
+
+class RefIndex(object):
+    """ index of objects with '$ref', built when constructing them:
+    spec version -> normalized '$ref' -> list of referrers
+    """
+
+    def __init__(self):
+        self.__refs = {}
+
+    def add(self, obj, url):
+        """ add a referrer
+
+        :param obj: a spec object with '$ref'
+        :param str url: url of the document 'obj' comes from
+        """
+        ref = obj.spec.get('$ref', None)
+        if not isinstance(ref, six.string_types):
+            return
+
+        spec_version = getattr(obj, '__swagger_version__', None)
+        self.__refs.setdefault(spec_version, {}).setdefault(
+            utils.normalize_jr(ref, url), []).append(obj)
+
+    def collector(self, url):
+        """ a callback for spec.collect_refs to add referrers of a document
+        """
+        return _RefCollector(self, url)
+
+    def remove(self, obj, url):
+        """ remove a referrer added by 'add'
+        """
+        refs = self.__refs.get(getattr(obj, '__swagger_version__', None), {})
+        ref = obj.spec.get('$ref', None)
+
+        # '$ref' might be changed after added, ex. relocated when
+        # resolving, every referrer is checked then.
+        candidates = [utils.normalize_jr(ref, url)] \
+            if isinstance(ref, six.string_types) else []
+        for jref in itertools.chain(candidates, list(refs)):
+            referrers = refs.get(jref, [])
+            for idx, referrer in enumerate(referrers):
+                if referrer is obj:
+                    del referrers[idx]
+                    if not referrers:
+                        del refs[jref]
+                    return
+
+    def get(self, jref, spec_version):
+        """ get referrers of a normalized JSON reference
+
+        :return: a list of spec objects
+        """
+        return list(self.__refs.get(spec_version, {}).get(jref, []))
+
+    def targets(self, spec_version):
+        """ get all normalized JSON references
+
+        :return: a list of str
+        """
+        return list(self.__refs.get(spec_version, {}))
+
+    def iteritems(self, spec_version):
+        """ iterate through (normalized JSON reference, referrers)
+        """
+        return six.iteritems(self.__refs.get(spec_version, {}))
@@ -2,10 +2,9 @@
 
 from __future__ import absolute_import
 from ....utils import jr_split
-from ...scan import scan
+from ...scan import scan, scan_pipeline
 from ..v1_2.scanner import Upgrade
 from .scanner import Resolve, YamlFixer, NormalizeRef, Merge
-from .objects import Operation
 
 
 def upgrade(obj, app, jref):
@@ -25,22 +24,21 @@ def upgrade(obj, app, jref):
 
     if ret.__swagger_version__ == '2.0':
         url, jp = jr_split(jref)
-        app.spec_obj_store.set(ret, url, jp, spec_version='2.0')
-
-        # normalize $ref
-        scan(root=ret, route=[NormalizeRef(url)])
-        # fix for yaml that treat response code as number
-        scan(root=ret, route=[YamlFixer()], leaves=[Operation])
 
         # cache this object before resolving external(possible) object
         app.spec_obj_store.set(ret, url, jp, spec_version='2.0')
 
-        # pre resolve Schema Object
-        # note: make sure this object is cached before using 'Resolve' scanner
-        scan(root=ret, route=[Resolve(app)])
-
-        # merge path-item
-        scan(root=ret, route=[Merge(app)])
+        # - normalize $ref
+        # - fix for yaml that treat response code as number
+        # - pre resolve Schema Object
+        #   note: make sure this object is cached before using 'Resolve' scanner
+        # - merge path-item
+        scan_pipeline(
+            root=ret,
+            route=[NormalizeRef(url),
+                   YamlFixer(),
+                   Resolve(app),
+                   Merge(app)])
     else:
         raise Exception('unsupported migration: {} to 2.0'.format(
             ret.__swagger_version__))
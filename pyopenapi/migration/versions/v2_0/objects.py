@@ -15,6 +15,9 @@ def is_str(spec, path, override):
         str(type(spec)), path))
 
 
+is_str.__builds__ = ()
+
+
 def if_not_ref_else(class_builder):
     def _f(spec, path, override):
         if '$ref' in spec:
@@ -22,6 +25,7 @@ def if_not_ref_else(class_builder):
         return class_builder(spec, path=path, override=override)
 
     _f.__name__ = 'if_not_ref_else_' + class_builder.__name__
+    _f.__builds__ = (Reference, class_builder)
     return _f
 
 
@@ -32,6 +36,7 @@ def if_not_bool_else(class_builder):
         return class_builder(spec, path=path, override=override)
 
     _f.__name__ = 'if_not_bool_else_' + class_builder.__name__
+    _f.__builds__ = (class_builder, )
     return _f
 
 
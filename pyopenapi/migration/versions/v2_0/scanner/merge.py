@@ -15,10 +15,19 @@ class Merge(object):
 
     def __init__(self, app):
         self.app = app
+        self.path_items = []
 
     @Disp.register([PathItem])
     def _path_item(self, path, obj):
+        # merged when all objects are resolved, ex. in the same pass
+        # with 'Resolve'.
         if obj.ref:
+            self.path_items.append((path, obj))
+
+    @Disp.done
+    def _done(self):
+        path_items, self.path_items = self.path_items, []
+        for path, obj in path_items:
             obj.get_attrs('migration',
                           PathItemAttributeGroup).final_obj = _merge_path_item(
                               obj, path, '2.0', '2.0', self.app, PathItem,
@@ -6,6 +6,7 @@ import six
 from .....utils import jp_compose
 from .....errs import SchemaError, JsonReferenceError
 from ....scan import Dispatcher
+from ....plan import ResolvePlan
 from ..objects import (
     Operation,
     Schema,
@@ -21,7 +22,7 @@ from ..attrs import (
 )
 
 
-def _resolve(obj, expected, attr_group_cls, app, path):
+def _resolve(obj, expected, attr_group_cls, plan, path):
     if not obj or not getattr(obj, 'ref', None):
         return
 
@@ -37,17 +38,14 @@ def _resolve(obj, expected, attr_group_cls, app, path):
         raise JsonReferenceError('empty normalized_ref for {} in {}'.format(
             obj.ref, path))
 
-    resolved, _ = app.resolve_obj(
-        attrs.normalized_ref,
-        from_spec_version='2.0',
-        parser=expected,
-        remove_dummy=True,
-    )
-    if not resolved:
-        raise JsonReferenceError('Unable to resolve: {} in {}'.format(
-            obj.normalized_ref, path))
+    def _done(resolved, _):
+        if not resolved:
+            raise JsonReferenceError('Unable to resolve: {} in {}'.format(
+                attrs.normalized_ref, path))
 
-    attrs.ref_obj = resolved
+        attrs.ref_obj = resolved
+
+    plan.add(attrs.normalized_ref, expected, _done)
 
 
 class Resolve(object):
@@ -58,27 +56,47 @@ class Resolve(object):
 
     def __init__(self, app):
         self.app = app
+        self.requests = []
+        # references under a schema are all schemas, chains of
+        # them are resolved from the end.
+        self.plan = ResolvePlan(
+            app,
+            from_spec_version='2.0',
+            remove_dummy=True,
+            dep_parsers={Schema: Schema})
+
+    def _request(self, *args):
+        # references are collected when the traversal is done, 'normalized_ref'
+        # of objects beneath the current one are not ready yet.
+        self.requests.append(args)
+
+    @Disp.done
+    def _done(self):
+        requests, self.requests = self.requests, []
+        for args in requests:
+            _resolve(*args)
+        self.plan.run()
 
     @Disp.register([Schema])
     def _schema(self, path, obj):
-        _resolve(obj, Schema, SchemaAttributeGroup, self.app, path)
+        self._request(obj, Schema, SchemaAttributeGroup, self.plan, path)
 
     @Disp.register([PathItem])
     def _path_item(self, path, obj):
-        _resolve(obj, PathItem, PathItemAttributeGroup, self.app, path)
+        self._request(obj, PathItem, PathItemAttributeGroup, self.plan, path)
 
         for idx, param in enumerate(obj.parameters or []):
-            _resolve(param, ParameterOrReference, ReferenceAttributeGroup,
-                     self.app, jp_compose([path, 'parameters',
-                                           str(idx)]))
+            self._request(param, ParameterOrReference, ReferenceAttributeGroup,
+                          self.plan, jp_compose([path, 'parameters',
+                                                 str(idx)]))
 
     @Disp.register([Operation])
     def _parameter(self, path, obj):
         for idx, param in enumerate(obj.parameters or []):
-            _resolve(param, ParameterOrReference, ReferenceAttributeGroup,
-                     self.app, jp_compose([path, 'parameters',
-                                           str(idx)]))
+            self._request(param, ParameterOrReference, ReferenceAttributeGroup,
+                          self.plan, jp_compose([path, 'parameters',
+                                                 str(idx)]))
 
         for k, resp in six.iteritems(obj.responses or {}):
-            _resolve(resp, ResponseOrReference, ReferenceAttributeGroup,
-                     self.app, jp_compose([path, 'responses', k]))
+            self._request(resp, ResponseOrReference, ReferenceAttributeGroup,
+                          self.plan, jp_compose([path, 'responses', k]))
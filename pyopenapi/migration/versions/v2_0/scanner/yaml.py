@@ -13,6 +13,8 @@ from ..objects import (
 class YamlFixer(object):
     """ fix objects loaded by pyaml """
 
+    __scan_leaves__ = [Operation]
+
     class Disp(Dispatcher):
         pass
 
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from ....utils import jr_split
-from ...scan import scan
+from ...scan import scan_pipeline
 from ..v2_0.scanner.upgrade import converters
 from ..v2_0.objects import (
     Swagger,
@@ -13,6 +13,16 @@ from ..v2_0.objects import (
 from .scanner import Resolve, NormalizeRef, Merge
 from . import objects
 
+# objects of 2.0 could be upgraded alone, others are
+# upgraded along with their ancestors.
+_UPGRADABLE = (Swagger, License, Info, Schema, PathItem)
+
+
+def is_upgradable(obj):
+    """ check if an object of 2.0 could be upgraded to 3.0.0 alone
+    """
+    return obj.__swagger_version__ == '3.0.0' or isinstance(obj, _UPGRADABLE)
+
 
 def upgrade(obj, app, jref):
     ret = obj
@@ -26,39 +36,42 @@ def upgrade(obj, app, jref):
 
         if isinstance(ret, Swagger):
             migrated, reloc = converters.to_openapi(ret, jp)
-            ret = objects.OpenApi(migrated, path=jp, override=override)
+            cls = objects.OpenApi
         elif isinstance(ret, License):
-            ret = objects.License(
-                converters.to_license(ret, jp), path=jp, override=override)
+            migrated, cls = converters.to_license(ret, jp), objects.License
         elif isinstance(ret, Info):
-            ret = objects.Info(
-                converters.to_info(ret, jp), path=jp, override=override)
+            migrated, cls = converters.to_info(ret, jp), objects.Info
         elif isinstance(ret, Schema):
-            ret = objects.Schema(
-                converters.to_schema(ret, jp), path=jp, override=override)
+            migrated, cls = converters.to_schema(ret, jp), objects.Schema
         elif isinstance(ret, PathItem):
             migrated, reloc = converters.to_path_item(ret, url, jp)
-            ret = objects.PathItem(migrated, path=jp, override=override)
+            cls = objects.PathItem
         else:
             raise Exception(
                 'unable to upgrade from 2.0: {} for type: {}'.format(
                     jref, str(type(ret))))
 
-    if ret.__swagger_version__ == '3.0.0':
-        # phase 1: normalized $ref
-        scan(root=ret, route=[NormalizeRef(url)])
+        # objects are still created for each location, only
+        # raw specs are shared
+        interner = getattr(app, 'fragment_interner', None)
+        if interner is not None:
+            migrated = interner.intern(migrated)
+        ret = cls(migrated, path=jp, override=override)
 
-        # phase 2: update cache for resolving $ref to current object
+    if ret.__swagger_version__ == '3.0.0':
+        # update cache for resolving $ref to current object
         # - because the external document might reference back,
         #   we have to cache ourselves here, just in case.
         app.spec_obj_store.set(ret, url, jp, spec_version='3.0.0')
         app.spec_obj_store.update_routes(url, '3.0.0', {jp: reloc})
 
-        # phase 3: resolve $ref
-        scan(root=ret, route=[Resolve(app)])
-
-        # phase 4: merge path item from $ref
-        scan(root=ret, route=[Merge(app)])
+        # - normalized $ref
+        # - resolve $ref
+        # - merge path item from $ref
+        scan_pipeline(
+            root=ret, route=[NormalizeRef(url),
+                             Resolve(app),
+                             Merge(app)])
     else:
         raise Exception('unsupported migration: {} to 3.0.0'.format(
             obj.__swagger_version__))
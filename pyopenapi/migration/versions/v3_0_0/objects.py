@@ -26,6 +26,7 @@ def if_not_ref_else(class_builder):
         return class_builder(spec, path=path, override=override)
 
     _f.__name__ = 'if_not_ref_else_' + class_builder.__name__
+    _f.__builds__ = (Reference, class_builder)
     return _f
 
 
@@ -36,6 +37,7 @@ def if_not_bool_else(class_builder):
         return class_builder(spec, path=path, override=override)
 
     _f.__name__ = 'if_not_bool_else_' + class_builder.__name__
+    _f.__builds__ = (class_builder, )
     return _f
 
 
@@ -48,6 +50,9 @@ def is_str(spec, path, override):
         str(type(spec)), path))
 
 
+is_str.__builds__ = ()
+
+
 def is_str_or_int(spec, path, override):
     if override:
         raise Exception('attemp to override "str" in {}'.format(path))
@@ -57,6 +62,9 @@ def is_str_or_int(spec, path, override):
         str(type(spec)), path))
 
 
+is_str_or_int.__builds__ = ()
+
+
 class Contact(Base2_v3_0_0):
     __fields__ = {
         'name': dict(),
@@ -487,6 +495,7 @@ class PathItem(Base2_v3_0_0):
 
 
 class Callback(map_(PathItem)):
+    __slots__ = ()
     __swagger_version__ = '3.0.0'
 
 
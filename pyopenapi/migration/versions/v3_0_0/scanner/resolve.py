@@ -6,6 +6,7 @@ import six
 from .....utils import jp_compose, jr_split
 from .....errs import JsonReferenceError
 from ....scan import Dispatcher
+from ....plan import ResolvePlan
 from ..objects import (
     PathItem,
     Schema,
@@ -33,7 +34,7 @@ from ..attrs import (
 )
 
 
-def _resolve(obj, expected, app, path):
+def _resolve(obj, expected, plan, path):
     if not obj:
         return
 
@@ -49,25 +50,20 @@ def _resolve(obj, expected, app, path):
                 obj.ref, path))
         return
 
-    resolved, new_ref = app.resolve_obj(
-        attrs.normalized_ref,
-        from_spec_version=app.original_spec_version
-        if app.original_spec_version == '3.0.0' else '2.0',
-        parser=expected,
-        to_spec_version='3.0.0',
-        remove_dummy=True,
-    )
-    if not resolved:
-        raise JsonReferenceError('Unable to resolve: {}'.format(
-            obj.normalized_ref))
+    def _done(resolved, new_ref):
+        if not resolved:
+            raise JsonReferenceError('Unable to resolve: {}'.format(
+                attrs.normalized_ref))
 
-    if obj.ref.startswith('#'):
-        _, obj.ref = jr_split(new_ref)
-    else:
-        obj.ref = new_ref
+        if obj.ref.startswith('#'):
+            _, obj.ref = jr_split(new_ref)
+        else:
+            obj.ref = new_ref
 
-    attrs.normalized_ref = new_ref
-    attrs.ref_obj = resolved
+        attrs.normalized_ref = new_ref
+        attrs.ref_obj = resolved
+
+    plan.add(attrs.normalized_ref, expected, _done)
 
 
 class Resolve(object):
@@ -78,157 +74,179 @@ class Resolve(object):
 
     def __init__(self, app):
         self.app = app
+        self.requests = []
+        self.plan = ResolvePlan(
+            app,
+            from_spec_version=app.original_spec_version
+            if app.original_spec_version == '3.0.0' else '2.0',
+            to_spec_version='3.0.0',
+            remove_dummy=True,
+            # references under a schema are all schemas, chains of
+            # them are resolved from the end.
+            dep_parsers={SchemaOrReference: SchemaOrReference})
+
+    def _request(self, *args):
+        # references are collected when the traversal is done, 'normalized_ref'
+        # of objects beneath the current one are not ready yet.
+        self.requests.append(args)
+
+    @Disp.done
+    def _done(self):
+        requests, self.requests = self.requests, []
+        for args in requests:
+            _resolve(*args)
+        self.plan.run()
 
     @Disp.register([PathItem])
     def _path_item(self, path, obj):
-        _resolve(obj, PathItem, self.app, path)
+        self._request(obj, PathItem, self.plan, path)
         # parameters
         for idx, param in enumerate(obj.parameters or []):
-            _resolve(param, ParameterOrReference, self.app,
-                     jp_compose([path, 'parameters',
-                                 str(idx)]))
+            self._request(param, ParameterOrReference, self.plan,
+                          jp_compose([path, 'parameters',
+                                      str(idx)]))
 
     @Disp.register([Schema])
     def _schema(self, path, obj):
         # allOf, oneOf, anyOf
 
         for idx, schema in enumerate(obj.all_of or []):
-            _resolve(schema, SchemaOrReference, self.app,
-                     jp_compose([path, 'allOf', str(idx)]))
+            self._request(schema, SchemaOrReference, self.plan,
+                          jp_compose([path, 'allOf', str(idx)]))
 
         for idx, schema in enumerate(obj.one_of or []):
-            _resolve(schema, SchemaOrReference, self.app,
-                     jp_compose([path, 'oneOf', str(idx)]))
+            self._request(schema, SchemaOrReference, self.plan,
+                          jp_compose([path, 'oneOf', str(idx)]))
 
         for idx, schema in enumerate(obj.any_of or []):
-            _resolve(schema, SchemaOrReference, self.app,
-                     jp_compose([path, 'anyOf', str(idx)]))
+            self._request(schema, SchemaOrReference, self.plan,
+                          jp_compose([path, 'anyOf', str(idx)]))
 
         # not
-        _resolve(obj.not_, SchemaOrReference, self.app,
-                 jp_compose([path, 'not']))
+        self._request(obj.not_, SchemaOrReference, self.plan,
+                      jp_compose([path, 'not']))
 
         # items
-        _resolve(obj.items, SchemaOrReference, self.app,
-                 jp_compose([path, 'items']))
+        self._request(obj.items, SchemaOrReference, self.plan,
+                      jp_compose([path, 'items']))
 
         # properties
         for k, schema in six.iteritems(obj.properties or {}):
-            _resolve(schema, SchemaOrReference, self.app,
-                     jp_compose([path, 'properties', k]))
+            self._request(schema, SchemaOrReference, self.plan,
+                          jp_compose([path, 'properties', k]))
 
         # additionalProperties
         if not isinstance(obj.additional_properties, bool):
-            _resolve(obj.additional_properties, SchemaOrReference, self.app,
-                     jp_compose([path, 'additionalProperties']))
+            self._request(obj.additional_properties, SchemaOrReference,
+                          self.plan, jp_compose([path, 'additionalProperties']))
 
     @Disp.register([Parameter, Header])
     def _parameter(self, path, obj):
         # schema field
-        _resolve(obj.schema, SchemaOrReference, self.app,
-                 jp_compose([path, 'schema']))
+        self._request(obj.schema, SchemaOrReference, self.plan,
+                      jp_compose([path, 'schema']))
 
         # examples field
         for k, example in six.iteritems(obj.examples or {}):
-            _resolve(example, ExampleOrReference, self.app,
-                     jp_compose([path, 'examples', k]))
+            self._request(example, ExampleOrReference, self.plan,
+                          jp_compose([path, 'examples', k]))
 
     @Disp.register([Encoding])
     def _encoding(self, path, obj):
         # headers field
         for k, header in six.iteritems(obj.headers or {}):
-            _resolve(header, HeaderOrReference, self.app,
-                     jp_compose([path, 'headers', k]))
+            self._request(header, HeaderOrReference, self.plan,
+                          jp_compose([path, 'headers', k]))
 
     @Disp.register([MediaType])
     def _media_type(self, path, obj):
         # schema field
-        _resolve(obj.schema, SchemaOrReference, self.app,
-                 jp_compose([path, 'schema']))
+        self._request(obj.schema, SchemaOrReference, self.plan,
+                      jp_compose([path, 'schema']))
 
         # examples field
         for k, example in six.iteritems(obj.examples or {}):
-            _resolve(example, ExampleOrReference, self.app,
-                     jp_compose([path, 'examples', k]))
+            self._request(example, ExampleOrReference, self.plan,
+                          jp_compose([path, 'examples', k]))
 
     @Disp.register([Response])
     def _response(self, path, obj):
         # headers
         for k, header in six.iteritems(obj.headers or {}):
-            _resolve(header, HeaderOrReference, self.app,
-                     jp_compose([path, 'headers', k]))
+            self._request(header, HeaderOrReference, self.plan,
+                          jp_compose([path, 'headers', k]))
 
         # links
         for k, link_ in six.iteritems(obj.links or {}):
-            _resolve(link_, LinkOrReference, self.app,
-                     jp_compose([path, 'links', k]))
+            self._request(link_, LinkOrReference, self.plan,
+                          jp_compose([path, 'links', k]))
 
     @Disp.register([Operation])
     def _operation(self, path, obj):
         # parameters
 
         for idx, param in enumerate(obj.parameters or []):
-            _resolve(param, ParameterOrReference, self.app,
-                     jp_compose([path, 'parameters',
-                                 str(idx)]))
+            self._request(param, ParameterOrReference, self.plan,
+                          jp_compose([path, 'parameters',
+                                      str(idx)]))
 
         # requestBody
-        _resolve(obj.request_body, RequestBodyOrReference, self.app,
-                 jp_compose([path, 'requestBody']))
+        self._request(obj.request_body, RequestBodyOrReference, self.plan,
+                      jp_compose([path, 'requestBody']))
 
         # responses
         for k, resp in six.iteritems(obj.responses or {}):
-            _resolve(resp, ResponseOrReference, self.app,
-                     jp_compose([path, 'responses', k]))
+            self._request(resp, ResponseOrReference, self.plan,
+                          jp_compose([path, 'responses', k]))
 
         # callbacks
         for k, callback in six.iteritems(obj.callbacks or {}):
-            _resolve(callback, CallbackOrReference, self.app,
-                     jp_compose([path, 'callbacks', k]))
+            self._request(callback, CallbackOrReference, self.plan,
+                          jp_compose([path, 'callbacks', k]))
 
     @Disp.register([Components])
     def _components(self, path, obj):
         # schemas
         for k, schema in six.iteritems(obj.schemas or {}):
-            _resolve(schema, SchemaOrReference, self.app,
-                     jp_compose([path, 'schemas', k]))
+            self._request(schema, SchemaOrReference, self.plan,
+                          jp_compose([path, 'schemas', k]))
 
         # responses
         for k, resp in six.iteritems(obj.responses or {}):
-            _resolve(resp, ResponseOrReference, self.app,
-                     jp_compose([path, 'responses', k]))
+            self._request(resp, ResponseOrReference, self.plan,
+                          jp_compose([path, 'responses', k]))
 
         # parameters
         for k, param in six.iteritems(obj.parameters or {}):
-            _resolve(param, ParameterOrReference, self.app,
-                     jp_compose([path, 'parameters', k]))
+            self._request(param, ParameterOrReference, self.plan,
+                          jp_compose([path, 'parameters', k]))
 
         # examples
         for k, example in six.iteritems(obj.examples or {}):
-            _resolve(example, ExampleOrReference, self.app,
-                     jp_compose([path, 'examples', k]))
+            self._request(example, ExampleOrReference, self.plan,
+                          jp_compose([path, 'examples', k]))
 
         # requestBodies
         for k, body in six.iteritems(obj.request_bodies or {}):
-            _resolve(body, RequestBodyOrReference, self.app,
-                     jp_compose([path, 'requestBodies', k]))
+            self._request(body, RequestBodyOrReference, self.plan,
+                          jp_compose([path, 'requestBodies', k]))
 
         # headers
         for k, header in six.iteritems(obj.headers or {}):
-            _resolve(header, HeaderOrReference, self.app,
-                     jp_compose([path, 'headers', k]))
+            self._request(header, HeaderOrReference, self.plan,
+                          jp_compose([path, 'headers', k]))
 
         # securitySchemes
         for k, sec in six.iteritems(obj.security_schemes or {}):
-            _resolve(sec, SecuritySchemeOrReference, self.app,
-                     jp_compose([path, 'securitySchemes', k]))
+            self._request(sec, SecuritySchemeOrReference, self.plan,
+                          jp_compose([path, 'securitySchemes', k]))
 
         # links
         for k, link_ in six.iteritems(obj.links or {}):
-            _resolve(link_, LinkOrReference, self.app,
-                     jp_compose([path, 'links', k]))
+            self._request(link_, LinkOrReference, self.plan,
+                          jp_compose([path, 'links', k]))
 
         # callbacks
         for k, callback in six.iteritems(obj.callbacks or {}):
-            _resolve(callback, CallbackOrReference, self.app,
-                     jp_compose([path, 'callbacks', k]))
+            self._request(callback, CallbackOrReference, self.plan,
+                          jp_compose([path, 'callbacks', k]))
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+""" write spec objects to files without building the whole dict returned
+by dump(), which is the same as what dump() returns when serialized.
+"""
+
+from __future__ import absolute_import
+import json
+
+import six
+import yaml
+
+from .spec import iter_dump
+from .spec.obj import (
+    START_MAP,
+    MAP_KEY,
+    END_MAP,
+    START_ARRAY,
+    END_ARRAY,
+    SCALAR,
+)
+
+# chunks kept before writing to file
+_BUFFER_SIZE = 512
+
+
+def _json_key(key, encode):
+    """ convert a key of map to string the same way as json module
+    """
+    if isinstance(key, six.string_types):
+        return key
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, float):
+        return encode(key)
+    if isinstance(key, six.integer_types):
+        return str(int(key))
+    raise TypeError('keys must be str, int, float, bool or None, not {}'.format(
+        type(key).__name__))
+
+
+def iter_json(obj, indent=None):
+    """ JSON text chunks of a spec object
+
+    :param obj: a spec object, or anything could be serialized by json module
+    :param int indent: the same as 'indent' of json.dumps
+    :raises TypeError: if a key of map can't be a key in JSON, like json.dumps
+    """
+    encode = json.JSONEncoder().encode
+    colon = ': ' if indent is not None else ':'
+    # count of items written, per level
+    counts = []
+    after_key = False
+    for _, kind, val in iter_dump(obj):
+        if kind in (END_MAP, END_ARRAY):
+            written = counts.pop()
+            if indent is not None and written:
+                yield '\n' + ' ' * (indent * len(counts))
+            yield '}' if kind == END_MAP else ']'
+            continue
+
+        if after_key:
+            after_key = False
+        elif counts:
+            if counts[-1]:
+                yield ','
+            counts[-1] += 1
+            if indent is not None:
+                yield '\n' + ' ' * (indent * len(counts))
+
+        if kind == MAP_KEY:
+            yield encode(_json_key(val, encode)) + colon
+            after_key = True
+        elif kind == SCALAR:
+            yield encode(val)
+        else:
+            counts.append(0)
+            yield '{' if kind == START_MAP else '['
+
+
+def _iter_yaml_events(obj):
+    yield yaml.StreamStartEvent()
+    yield yaml.DocumentStartEvent()
+
+    representer = yaml.representer.SafeRepresenter()
+    resolver = yaml.resolver.Resolver()
+    for _, kind, val in iter_dump(obj, sort_keys=True):
+        if kind == START_MAP:
+            yield yaml.MappingStartEvent(None, None, True)
+        elif kind == START_ARRAY:
+            yield yaml.SequenceStartEvent(None, None, True)
+        elif kind == END_MAP:
+            yield yaml.MappingEndEvent()
+        elif kind == END_ARRAY:
+            yield yaml.SequenceEndEvent()
+        else:
+            if kind == MAP_KEY and not isinstance(val, six.string_types):
+                val = str(val)
+
+            # the same as yaml.serializer.Serializer, ex. quote
+            # strings would be resolved to other types, like '200'
+            node = representer.represent_data(val)
+            implicit = (resolver.resolve(yaml.ScalarNode, node.value,
+                                         (True, False)) == node.tag,
+                        resolver.resolve(yaml.ScalarNode, node.value,
+                                         (False, True)) == node.tag)
+            yield yaml.ScalarEvent(None, node.tag, implicit, node.value)
+
+    yield yaml.DocumentEndEvent()
+    yield yaml.StreamEndEvent()
+
+
+def _write(chunks, handle):
+    buf = []
+    for chunk in chunks:
+        buf.append(chunk)
+        if len(buf) >= _BUFFER_SIZE:
+            handle.write(''.join(buf))
+            buf = []
+    if buf:
+        handle.write(''.join(buf))
+
+
+def write_json(obj, handle, indent=None):
+    """ write a spec object to a file object as JSON
+    """
+    _write(iter_json(obj, indent=indent), handle)
+
+
+def write_yaml(obj, handle):
+    """ write a spec object to a file object as YAML, keys of maps are
+    sorted as yaml.safe_dump does
+    """
+    yaml.emit(_iter_yaml_events(obj), handle, Dumper=yaml.SafeDumper)
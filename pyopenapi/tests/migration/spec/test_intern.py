@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+import unittest
+import copy
+import os
+import pickle
+
+from pyopenapi.migration.batch import ConvertApp
+from pyopenapi.migration.resolve import Resolver
+from pyopenapi.migration.spec import (
+    Base2,
+    FragmentInterner,
+    interned_by,
+    map_,
+)
+from pyopenapi.utils import compare_container, normalize_url
+from ...utils import get_test_data_folder
+
+
+class LeafObj(Base2):
+    __fields__ = {
+        'name': dict(readonly=False),
+    }
+
+
+class RootObj(Base2):
+    __fields__ = {
+        'name': dict(),
+    }
+    __children__ = {
+        'leaves': dict(child_builder=map_(LeafObj)),
+    }
+
+
+class FragmentInternerTestCase(unittest.TestCase):
+    """ test case for FragmentInterner """
+
+    def test_share(self):
+        """ identical containers are shared """
+        interner = FragmentInterner()
+        spec = {
+            'a': {
+                'type': 'string',
+                'enum': ['x', 'y']
+            },
+            'b': {
+                'type': 'string',
+                'enum': ['x', 'y']
+            },
+            'c': {
+                'type': 'string'
+            },
+        }
+        origin = copy.deepcopy(spec)
+
+        ret = interner.intern(spec)
+        self.assertEqual(ret, origin)
+        self.assertIs(ret['a'], ret['b'])
+        self.assertIs(ret['a']['enum'], ret['b']['enum'])
+        self.assertIsNot(ret['a'], ret['c'])
+        self.assertTrue(interner.owns(ret['a']))
+
+        # input is not modified
+        self.assertEqual(spec, origin)
+        self.assertIsNot(spec['a'], spec['b'])
+
+        # shared with fragments interned before
+        again = interner.intern({'d': {'type': 'string'}})
+        self.assertIs(again['d'], ret['c'])
+        self.assertIs(interner.intern(ret), ret)
+        self.assertTrue(interner.hits > 0)
+
+    def test_scalar_types(self):
+        """ 1, 1.0 and True are not the same """
+        interner = FragmentInterner()
+        ret = interner.intern([{'a': 1}, {'a': 1.0}, {'a': True}, {'a': 1}])
+        self.assertIsNot(ret[0], ret[1])
+        self.assertIsNot(ret[0], ret[2])
+        self.assertIsNot(ret[1], ret[2])
+        self.assertIs(ret[0], ret[3])
+        self.assertIs(type(ret[1]['a']), float)
+
+    def test_ref_not_shared(self):
+        """ containers with '$ref' are rewritten when resolving """
+        interner = FragmentInterner()
+        ret = interner.intern({
+            'a': {
+                'items': {
+                    '$ref': '#/definitions/s'
+                }
+            },
+            'b': {
+                'items': {
+                    '$ref': '#/definitions/s'
+                }
+            },
+            'c': [{
+                '$ref': '#/definitions/s'
+            }],
+            'd': [{
+                '$ref': '#/definitions/s'
+            }],
+        })
+        self.assertIsNot(ret['a'], ret['b'])
+        self.assertIsNot(ret['a']['items'], ret['b']['items'])
+        self.assertIsNot(ret['c'], ret['d'])
+        self.assertFalse(interner.owns(ret))
+        self.assertFalse(interner.owns(ret['a']['items']))
+
+    def test_pickle(self):
+        """ shared containers are still shared after unpickled """
+        interner = FragmentInterner()
+        ret = interner.intern({'a': {'b': 1}, 'c': {'b': 1}})
+
+        interner, ret = pickle.loads(
+            pickle.dumps((interner, ret), pickle.HIGHEST_PROTOCOL))
+        self.assertIs(ret['a'], ret['c'])
+        self.assertTrue(interner.owns(ret['a']))
+
+    def test_copy_on_write(self):
+        """ objects with shared spec are modified independently """
+        interner = FragmentInterner()
+        spec = interner.intern({
+            'name': 'root',
+            'leaves': {
+                'a': {
+                    'name': 'leaf'
+                },
+                'b': {
+                    'name': 'leaf'
+                },
+            }
+        })
+        with interned_by(interner):
+            obj = RootObj(spec)
+        leaves = obj.resolve('leaves')
+        leaves['a'].name = 'changed'
+        leaves.replace_child('b', LeafObj({'name': 'new'}))
+
+        self.assertEqual(leaves['a'].name, 'changed')
+        self.assertEqual(leaves['b'].name, 'new')
+        self.assertEqual(
+            obj.dump(), {
+                'name': 'root',
+                'leaves': {
+                    'a': {
+                        'name': 'changed'
+                    },
+                    'b': {
+                        'name': 'new'
+                    },
+                }
+            })
+
+        # interned ones are kept as they are
+        self.assertEqual(spec['leaves']['a'], {'name': 'leaf'})
+        self.assertIs(spec['leaves']['a'], spec['leaves']['b'])
+
+    def test_migrate(self):
+        """ migrated objects are the same with interning """
+        url = os.path.join(
+            get_test_data_folder(version='2.0', which='wordnik'),
+            'swagger.json')
+
+        expected = ConvertApp.create(url, '3.0.0')
+        app = ConvertApp.create(url, '3.0.0', intern_fragments=True)
+        self.assertTrue(len(app.fragment_interner) > 0)
+        self.assertEqual(
+            list(compare_container(app.root.dump(), expected.root.dump())),
+            [])
+
+        # objects are still created for each location
+        for name, schema in app.root.components.schemas.items():
+            self.assertEqual(schema.get_path(),
+                             '#/components/schemas/' + name)
+
+    def test_owning_interner(self):
+        """ raw specs are checked against the interner objects are built with
+        """
+        interner, other = FragmentInterner(), FragmentInterner()
+        spec = interner.intern({'name': 'leaf'})
+        with interned_by(interner):
+            self.assertIsNot(LeafObj(spec).own_spec(), spec)
+        with interned_by(other):
+            self.assertIs(LeafObj(spec).own_spec(), spec)
+
+        # the interner of a provided resolver
+        url = normalize_url(
+            os.path.join(
+                get_test_data_folder(version='2.0', which='wordnik'),
+                'swagger.json'))
+        resolver = Resolver(interner=interner)
+        app = ConvertApp.create(url, '2.0', resolver=resolver)
+        self.assertEqual(app.fragment_interner, None)
+        self.assertIsNot(app.raw.info.own_spec(),
+                         resolver.get_document(url)['info'])
+
+        app = ConvertApp.create(
+            url, '2.0', resolver=Resolver(interner=other),
+            intern_fragments=True)
+        self.assertIs(app.fragment_interner, other)
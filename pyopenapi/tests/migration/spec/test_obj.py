@@ -10,6 +10,9 @@ from pyopenapi.migration.spec import (
     rename,
     map_,
     list_,
+    lazy_construction,
+    reachable_classes,
+    iter_dump,
     _Map,
     _List,
 )
@@ -621,6 +624,96 @@ class Base2TestCase(unittest.TestCase):
         obj.attach_child('ccc', list_(AObj)([{'b': 1}, {'b': 4}]))
         self.assertEqual(obj.dump(), {'ccc': [{'b': 1}, {'b': 4}]})
 
+    def test_iter_dump(self):
+        """ [Base2Obj, _Map, _List].iter_dump
+        """
+        obj = CObj({'ccc': [{'b': 1, 'c': {'bb': 2}}]})
+        self.assertEqual(
+            list(obj.iter_dump()), [
+                ('#', 'start_map', None),
+                ('#', 'map_key', 'ccc'),
+                ('#/ccc', 'start_array', None),
+                ('#/ccc/0', 'start_map', None),
+                ('#/ccc/0', 'map_key', 'c'),
+                ('#/ccc/0/c', 'start_map', None),
+                ('#/ccc/0/c', 'map_key', 'bb'),
+                ('#/ccc/0/c/bb', 'scalar', 2),
+                ('#/ccc/0/c', 'end_map', None),
+                ('#/ccc/0', 'map_key', 'b'),
+                ('#/ccc/0/b', 'scalar', 1),
+                ('#/ccc/0', 'end_map', None),
+                ('#/ccc', 'end_array', None),
+                ('#', 'end_map', None),
+            ])
+
+        def _load(events):
+            # rebuild what dump() returns from events
+            stack, key, ret = [], None, None
+            for _, event, val in events:
+                if event == 'map_key':
+                    key = val
+                    continue
+
+                new = {} if event == 'start_map' else [] \
+                    if event == 'start_array' else val
+                if event in ('end_map', 'end_array'):
+                    stack.pop()
+                    continue
+
+                if not stack:
+                    ret = new
+                elif isinstance(stack[-1], dict):
+                    stack[-1][key] = new
+                else:
+                    stack[-1].append(new)
+
+                if event in ('start_map', 'start_array'):
+                    stack.append(new)
+            return ret
+
+        obj = DObj({
+            'd1': {
+                'a/b': [{
+                    'b': 1
+                }, {
+                    'b': 2,
+                    'a': [1, {
+                        'x': None
+                    }]
+                }]
+            },
+            'd2': [{}],
+            'd3': {
+                'k': {
+                    'kk': {
+                        'b': 3,
+                        'c': {}
+                    }
+                }
+            },
+        })
+        obj.d2[0]['new'] = AObj({'b': 4})
+        self.assertEqual(_load(obj.iter_dump()), obj.dump())
+        self.assertEqual(_load(obj.d1.iter_dump()), obj.d1.dump())
+        self.assertTrue(('#/d1/a~1b/1/a/1/x', 'scalar', None) in list(
+            obj.iter_dump()))
+
+        # plain containers
+        self.assertEqual(_load(iter_dump({'a': [1, {'b': 2}]})), {
+            'a': [1, {
+                'b': 2
+            }]
+        })
+        self.assertEqual(list(iter_dump(1, path='#/a')), [('#/a', 'scalar',
+                                                           1)])
+
+        # sorted keys
+        self.assertEqual([
+            val for _, event, val in obj.iter_dump(sort_keys=True)
+            if event == 'map_key'
+        ], ['d1', 'a/b', 'b', 'a', 'x', 'b', 'd2', 'new', 'b', 'd3', 'k',
+            'kk', 'b', 'c'])
+
     def test_resolve(self):
         """ [Base2Obj, _Map, _List].resolve
         """
@@ -982,3 +1075,75 @@ class Base2TestCase(unittest.TestCase):
         self.assertTrue('a' in obj.dump())
         self.assertTrue('b' in obj.dump())
         self.assertFalse('c' in obj.dump())
+
+    def test_lazy_construction(self):
+        """ make sure children are built on first access in lazy mode
+        """
+        spec = {
+            'd1': {
+                'k1': [{'a': 1, 'b': 1}, {'a': 2, 'b': 2}]
+            },
+            'd2': [{
+                'k2': {
+                    'a': 3,
+                    'b': 3
+                }
+            }],
+        }
+        with lazy_construction():
+            obj = DObj(spec)
+        self.assertTrue(obj.is_lazy())
+        self.assertEqual(obj.children, {})
+
+        # mode is kept after leaving that context
+        d1 = obj.d1
+        self.assertTrue(d1.is_lazy())
+        self.assertEqual(len(d1), 1)
+        self.assertTrue('k1' in d1)
+        self.assertEqual(id(d1['k1'].get_parent()), id(d1))
+        self.assertEqual(d1['k1'][-1].a, 2)
+        self.assertEqual(d1['k1'][1].get_path(), 'd1/k1/1')
+        self.assertEqual(obj.resolve(['d2', '0', 'k2']).a, 3)
+
+        # the same as the eager one
+        self.assertEqual(obj.dump(), DObj(spec).dump())
+        self.assertEqual(obj.compare(DObj(spec)), (True, ''))
+        self.assertFalse(DObj(spec).is_lazy())
+
+    def test_compact_layout(self):
+        """ make sure objects are kept in __slots__, and rarely
+        used dicts are allocated on demand
+        """
+        obj = CObj({'cc': {'key1': {'a': 1, 'b': 2}}, 'ccc': [{'b': 3}]})
+        for o in (obj, obj.cc, obj.ccc, obj.cc['key1']):
+            self.assertFalse(hasattr(o, '__dict__'))
+
+        elm = obj.cc['key1']
+        self.assertEqual(elm.override, None)
+        self.assertEqual(elm.internal, None)
+        self.assertEqual(elm.attrs, None)
+        self.assertEqual(elm.internal_c, None)
+        self.assertEqual(elm.get_attrs('test'), None)
+
+        elm.internal_c = 1
+        self.assertEqual(elm.internal_c, 1)
+        self.assertNotEqual(elm.get_attrs('test', BGroup), None)
+
+        # subclasses defined outside pyopenapi keep their __dict__
+        UserObj = type(BObj)('UserObj', (BObj, ), {'__module__': 'app.objs'})
+        obj = UserObj({'bb': 1})
+        obj.note = 'ad-hoc'
+        self.assertEqual(obj.note, 'ad-hoc')
+        self.assertEqual(obj.bb, 1)
+
+    def test_reachable_classes(self):
+        """ make sure classes beneath an object are collected
+        from __children__
+        """
+        self.assertEqual(reachable_classes(BObj), frozenset())
+        self.assertEqual(reachable_classes(AObj), frozenset([BObj]))
+        self.assertEqual(reachable_classes(CObj), frozenset([AObj, BObj]))
+        self.assertEqual(reachable_classes(DObj), frozenset([AObj, BObj]))
+
+        # unknown when builders don't declare what they build
+        self.assertEqual(reachable_classes(EObj), None)
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+import unittest
+import os
+
+import six
+
+from pyopenapi import consts
+from pyopenapi.migration.resolve import Resolver
+from pyopenapi.utils import compare_container, normalize_url
+from ..utils import get_test_data_folder, SampleApp
+
+if six.PY3:
+    import asyncio
+    from pyopenapi.migration import aio
+    _AsyncGetter = aio.AsyncGetter
+else:
+    asyncio = aio = None  # pylint: disable=invalid-name
+    _AsyncGetter = object
+
+
+class _DelayGetter(_AsyncGetter):
+    """ load documents from 'docs' after a delay, and record
+    count of documents loaded at the same time
+    """
+
+    docs = {}
+    stats = {}
+
+    def aload(self, path):
+        stats = self.stats
+        stats['loaded'].append(path)
+        stats['in_flight'] += 1
+        stats['max_in_flight'] = max(stats['max_in_flight'],
+                                     stats['in_flight'])
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+
+        def _done():
+            stats['in_flight'] -= 1
+            if path in self.docs:
+                future.set_result(self.docs[path])
+            else:
+                future.set_exception(IOError('not found: ' + path))
+
+        loop.call_later(0.02, _done)
+        return future
+
+
+class _SleepGetter(_AsyncGetter):
+    def aload(self, path):  # pylint: disable=unused-argument
+        return asyncio.sleep(0, result='{"swagger": "2.0"}')
+
+
+_BASE = 'https://test.com/api/'
+
+_DOCS = {
+    _BASE + 'root.json': {
+        'swagger': '2.0',
+        'definitions': {
+            'a': {
+                '$ref': 'a.json#/A'
+            },
+            'b': {
+                '$ref': 'b.json#/B'
+            },
+            'missing': {
+                '$ref': 'missing.json#/M'
+            },
+        }
+    },
+    _BASE + 'a.json': '{"A": {"$ref": "c.json#/C"}}',
+    _BASE + 'b.json': 'B:\n  type: string\n',
+    _BASE + 'c.json': {
+        'C': {
+            'type': 'integer'
+        }
+    },
+}
+
+
+@unittest.skipIf(six.PY2, 'asyncio is not available')
+class AsyncTestCase(unittest.TestCase):
+    """ test case for asyncio API """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+        class _Getter(_DelayGetter):
+            docs = _DOCS
+            stats = dict(loaded=[], in_flight=0, max_in_flight=0)
+
+        self.getter = _Getter
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_fetch(self):
+        """ external documents are fetched concurrently """
+        resolver = Resolver(default_getter=self.getter)
+        doc = self._run(aio.fetch(resolver, _BASE + 'root.json'))
+        self.assertEqual(doc, _DOCS[_BASE + 'root.json'])
+
+        stats = self.getter.stats
+        self.assertEqual(
+            sorted(stats['loaded']),
+            sorted([_BASE + 'missing.json'] + list(_DOCS.keys())))
+        self.assertEqual(stats['max_in_flight'], 3)
+
+        self.assertEqual(
+            resolver.get_document(_BASE + 'a.json'),
+            {'A': {
+                '$ref': 'c.json#/C'
+            }})
+        self.assertEqual(
+            resolver.get_document(_BASE + 'b.json'), {'B': {
+                'type': 'string'
+            }})
+        self.assertEqual(resolver.get_document(_BASE + 'c.json'),
+                         _DOCS[_BASE + 'c.json'])
+        self.assertEqual(resolver.get_document(_BASE + 'missing.json'), None)
+
+        # cached ones are not fetched again, failed ones are retried
+        self._run(aio.fetch(resolver, _BASE + 'root.json'))
+        self.assertEqual(len(stats['loaded']), 6)
+        self.assertEqual(stats['loaded'][-1], _BASE + 'missing.json')
+
+        # unable to load the document itself
+        self.assertRaises(Exception, self._run,
+                          aio.fetch(resolver, _BASE + 'not_existed.json'))
+
+    def test_resolve(self):
+        """ resolve JSON references """
+        resolver = Resolver(default_getter=self.getter)
+        self.assertEqual(
+            self._run(aio.resolve(resolver, _BASE + 'a.json#/A')),
+            {'$ref': 'c.json#/C'})
+        self.assertEqual(
+            self._run(aio.resolve(resolver, _BASE + 'c.json#/C/type')),
+            'integer')
+        self.assertEqual(
+            sorted(self.getter.stats['loaded']),
+            [_BASE + 'a.json', _BASE + 'c.json'])
+
+    def test_plain_iterator(self):
+        """ blocking getters not derived from Getter """
+
+        def _getter():
+            yield {'A': {'type': 'string'}}
+
+        resolver = Resolver()
+        self.assertEqual(
+            self._run(
+                aio.resolve(resolver, _BASE + 'a.json#/A/type', _getter())),
+            'string')
+        self.assertEqual(resolver.get_stamp(_BASE + 'a.json'), None)
+
+    def test_sync(self):
+        """ async getters work as iterators without running event loop """
+        self.assertEqual(
+            next(_SleepGetter(_BASE + 'root.json')), {'swagger': '2.0'})
+
+        resolver = Resolver(default_getter=_SleepGetter)
+        self.assertEqual(
+            resolver.resolve(_BASE + 'root.json#/swagger'), '2.0')
+
+    def test_load_obj(self):
+        """ load and migrate objects without blocking the event loop """
+        url = normalize_url(
+            os.path.join(
+                get_test_data_folder(version='2.0', which='ex/relative'),
+                'public.yaml'))
+        expected = SampleApp.create(url, to_spec_version='3.0.0')
+
+        app = SampleApp(url, None, None, consts.SCOPE_SEPARATOR)
+        ticks = []
+
+        def _tick():
+            ticks.append(self.loop.time())
+            self.loop.call_soon(_tick)
+
+        self.loop.call_soon(_tick)
+        raw = self._run(aio.load_obj(app, url))
+        self.assertTrue(len(ticks) > 0)
+        self.assertEqual(app.resolver.get_document(url.replace(
+            'public.yaml', 'login.yaml'))['post']['operationId'], 'post_login')
+
+        root = self._run(aio.migrate_obj(app, raw, url, '3.0.0'))
+        self.assertEqual(
+            list(compare_container(root.dump(), expected.root.dump())), [])
+
+        obj, _ = self._run(
+            aio.resolve_obj(
+                app, url + '#/paths/~1login', '2.0', to_spec_version='3.0.0'))
+        self.assertEqual(
+            list(
+                compare_container(obj.dump(),
+                                  expected.root.paths['/login'].dump())), [])
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+import unittest
+import os
+import json
+import multiprocessing
+import shutil
+import tempfile
+
+import six
+
+from pyopenapi.migration import batch
+from pyopenapi.migration.batch import BatchConverter, convert, _output_names
+from pyopenapi.migration.cache import DocumentCache, FileDocumentCache
+from pyopenapi.utils import compare_container, normalize_url
+from ..utils import get_test_data_folder, SampleApp
+
+
+class _CountingCache(DocumentCache):
+    """ count loading of documents by path """
+
+    def __init__(self):
+        self.docs = {}
+        self.loaded = {}
+
+    def get(self, path, stamp):
+        self.loaded[path] = self.loaded.get(path, 0) + 1
+        return self.docs.get((path, stamp), None)
+
+    def set(self, path, stamp, obj):
+        self.docs[(path, stamp)] = obj
+
+
+class BatchConvertTestCase(unittest.TestCase):
+    """ test case for converting many specs at once """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.base = get_test_data_folder(version='2.0', which='ex/relative')
+        self.urls = [
+            os.path.join(self.base, 'public.yaml'),
+            os.path.join(self.base, 'internal.yaml'),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _check(self, reports):
+        self.assertEqual(len(reports), 2)
+        for url, report in zip(self.urls, reports):
+            self.assertEqual(report['error'], None)
+            for phase in ('load', 'migrate', 'dump', 'total'):
+                self.assertTrue(phase in report['timings'])
+
+            with open(report['output'], 'r') as handle:
+                converted = json.load(handle)
+            expected = SampleApp.create(url, to_spec_version='3.0.0')
+            self.assertEqual(
+                sorted(compare_container(converted, expected.root.dump())),
+                [])
+
+        with open(os.path.join(self.folder, 'summary.json'), 'r') as handle:
+            summary = json.load(handle)
+        self.assertEqual(summary['converted'], 2)
+        self.assertEqual(summary['failed'], 0)
+        self.assertEqual([r['url'] for r in summary['specs']],
+                         [r['url'] for r in reports])
+
+    def test_convert(self):
+        """ documents shared by specs are loaded once """
+        cache = _CountingCache()
+        reports = convert(self.urls, self.folder, doc_cache=cache)
+        self._check(reports)
+
+        self.assertEqual(
+            sorted(os.listdir(self.folder)),
+            ['internal.json', 'public.json', 'summary.json'])
+        for path, count in cache.loaded.items():
+            self.assertEqual(count, 1, path)
+        self.assertTrue(
+            [p for p in cache.loaded if p.endswith('login.yaml')])
+
+    def test_convert_in_pool(self):
+        """ convert in a pool of processes """
+        self._check(convert(self.urls, self.folder, processes=2))
+
+    @unittest.skipUnless(six.PY3, 'start methods are only available in py3')
+    def test_convert_in_spawned_pool(self):
+        """ caches are passed to workers started by 'spawn' """
+        cache = FileDocumentCache(os.path.join(self.folder, 'cache'))
+        output = os.path.join(self.folder, 'output')
+        os.makedirs(output)
+
+        pool_cls = batch.Pool
+        batch.Pool = multiprocessing.get_context('spawn').Pool
+        try:
+            reports = convert(self.urls, output, processes=2, doc_cache=cache)
+        finally:
+            batch.Pool = pool_cls
+
+        self.assertEqual([r['error'] for r in reports], [None, None])
+        self.assertTrue(os.listdir(os.path.join(self.folder, 'cache')))
+
+    def test_migrate_in_pool(self):
+        """ migrate documents of each spec in a pool of processes """
+        self._check(convert(self.urls, self.folder, migrate_processes=2))
+
+        # workers of the pool are daemonic, and can't have pools
+        self.assertRaises(
+            ValueError,
+            convert,
+            self.urls,
+            self.folder,
+            processes=2,
+            migrate_processes=2)
+
+    def test_shared_objects(self):
+        """ migrated objects of shared documents are reused by specs """
+        converter = BatchConverter(self.folder)
+        store = converter.spec_obj_store
+        login = normalize_url(os.path.join(self.base, 'login.yaml'))
+
+        self.assertEqual(converter.convert(self.urls[0], 'a.json')['error'],
+                         None)
+        shared = store.get(login, '#', '3.0.0')
+        self.assertTrue(shared is not None)
+
+        self.assertEqual(converter.convert(self.urls[1], 'b.json')['error'],
+                         None)
+        self.assertTrue(store.get(login, '#', '3.0.0') is shared)
+
+    def test_referencing_dropped(self):
+        """ shared documents referencing a converted spec are dropped
+        along with it
+        """
+        spec = {
+            'swagger': '2.0',
+            'info': {
+                'title': 'a',
+                'version': '1'
+            },
+            'paths': {
+                '/pets': {
+                    '$ref': 'common.json'
+                }
+            },
+            'definitions': {
+                'Pet': {
+                    'type': 'object'
+                }
+            },
+        }
+        for name in ('a', 'b'):
+            spec['info']['title'] = name
+            with open(os.path.join(self.folder, name + '.json'),
+                      'w') as handle:
+                json.dump(spec, handle)
+        with open(os.path.join(self.folder, 'common.json'), 'w') as handle:
+            json.dump({
+                'get': {
+                    'responses': {
+                        '200': {
+                            'description': 'ok',
+                            'schema': {
+                                '$ref': 'a.json#/definitions/Pet'
+                            }
+                        }
+                    }
+                }
+            }, handle)
+
+        output = os.path.join(self.folder, 'output')
+        converter = BatchConverter(output)
+        store = converter.spec_obj_store
+        common = normalize_url(os.path.join(self.folder, 'common.json'))
+
+        path = os.path.join(self.folder, 'a.json')
+        self.assertEqual(converter.convert(path, 'a.json')['error'], None)
+        self.assertEqual(store.get(common, '#', '3.0.0'), None)
+        self.assertEqual(store.get(common, '#', '2.0'), None)
+
+        path = os.path.join(self.folder, 'b.json')
+        report = converter.convert(path, 'b.json')
+        self.assertEqual(report['error'], None)
+        with open(report['output'], 'r') as handle:
+            converted = json.load(handle)
+        expected = SampleApp.create(path, to_spec_version='3.0.0')
+        self.assertEqual(
+            sorted(compare_container(converted, expected.root.dump())), [])
+
+    def test_failed(self):
+        """ failed specs are reported, others are still converted """
+        reports = convert(
+            [os.path.join(self.base, 'not_existed.yaml')] + self.urls,
+            self.folder)
+        self.assertTrue(reports[0]['error'])
+        self.assertEqual(reports[0]['output'], None)
+        self.assertEqual(reports[1]['error'], None)
+        self.assertEqual(reports[2]['error'], None)
+
+    def test_output_names(self):
+        """ names of output files are unique """
+        self.assertEqual(
+            _output_names([
+                'http://a.com/v1/swagger.json',
+                'http://a.com/v2/swagger.json',
+                'http://a.com/',
+                '/tmp/public.yaml',
+            ]), ['swagger.json', 'swagger_1.json', 'spec.json', 'public.json'])
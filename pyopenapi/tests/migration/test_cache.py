@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import unittest
+import os
+import shutil
+import tempfile
+import time
+
+from pyopenapi.migration.cache import FileDocumentCache
+from pyopenapi.migration.resolve import Resolver
+from pyopenapi.utils import normalize_url
+from ..utils import get_test_data_folder
+
+
+class _CountingCache(FileDocumentCache):
+    def __init__(self, folder, **kwargs):
+        super(_CountingCache, self).__init__(folder, **kwargs)
+        self.hits = 0
+
+    def get(self, path, stamp):
+        obj = super(_CountingCache, self).get(path, stamp)
+        if obj is not None:
+            self.hits += 1
+        return obj
+
+
+class _ScanningCache(FileDocumentCache):
+    def __init__(self, folder, **kwargs):
+        super(_ScanningCache, self).__init__(folder, **kwargs)
+        self.scans = 0
+
+    def _scan(self):
+        self.scans += 1
+        return super(_ScanningCache, self)._scan()
+
+
+class FileDocumentCacheTestCase(unittest.TestCase):
+    """ test case for persistent cache of parsed documents """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _entries(self):
+        return [name for name in os.listdir(self.folder)]
+
+    def test_get_set(self):
+        """ a document is keyed by path and stamp """
+        cache = FileDocumentCache(os.path.join(self.folder, 'not_existed'))
+
+        cache.set('/tmp/swagger.yaml', 'stamp', {'swagger': '2.0'})
+        self.assertEqual(
+            cache.get('/tmp/swagger.yaml', 'stamp'), {'swagger': '2.0'})
+        self.assertEqual(cache.get('/tmp/swagger.yaml', 'another'), None)
+        self.assertEqual(cache.get('/tmp/swagger.json', 'stamp'), None)
+
+    def test_corrupted(self):
+        """ corrupted cached files are removed """
+        cache = FileDocumentCache(self.folder)
+
+        cache.set('/tmp/swagger.yaml', 'stamp', {'swagger': '2.0'})
+        target = os.path.join(self.folder, self._entries()[0])
+        with open(target, 'wb') as handle:
+            handle.write(b'not a pickle')
+
+        self.assertEqual(cache.get('/tmp/swagger.yaml', 'stamp'), None)
+        self.assertEqual(self._entries(), [])
+
+    def test_evict_by_age(self):
+        """ cached files not used for a while are evicted """
+        cache = FileDocumentCache(self.folder, max_age=60)
+
+        cache.set('/tmp/1.yaml', 'stamp', {'swagger': '2.0'})
+        target = os.path.join(self.folder, self._entries()[0])
+        past = time.time() - 120
+        os.utime(target, (past, past))
+
+        self.assertEqual(cache.get('/tmp/1.yaml', 'stamp'), None)
+        self.assertEqual(self._entries(), [])
+
+        cache.set('/tmp/1.yaml', 'stamp', {'swagger': '2.0'})
+        os.utime(os.path.join(self.folder, self._entries()[0]), (past, past))
+        cache.set('/tmp/2.yaml', 'stamp', {'swagger': '2.0'})
+        self.assertEqual(cache.get('/tmp/1.yaml', 'stamp'), None)
+        self.assertEqual(
+            cache.get('/tmp/2.yaml', 'stamp'), {'swagger': '2.0'})
+
+    def test_evict_by_size(self):
+        """ least recently used ones are evicted first """
+        cache = FileDocumentCache(self.folder)
+        cache.set('/tmp/1.yaml', 'stamp', {'swagger': '2.0'})
+        size = os.path.getsize(os.path.join(self.folder, self._entries()[0]))
+
+        cache = FileDocumentCache(self.folder, max_size=size * 2)
+        past = time.time() - 120
+        os.utime(os.path.join(self.folder, self._entries()[0]), (past, past))
+        cache.set('/tmp/2.yaml', 'stamp', {'swagger': '2.0'})
+        self.assertEqual(len(self._entries()), 2)
+
+        cache.set('/tmp/3.yaml', 'stamp', {'swagger': '2.0'})
+        self.assertEqual(len(self._entries()), 2)
+        self.assertEqual(cache.get('/tmp/1.yaml', 'stamp'), None)
+        self.assertNotEqual(cache.get('/tmp/2.yaml', 'stamp'), None)
+        self.assertNotEqual(cache.get('/tmp/3.yaml', 'stamp'), None)
+
+    def test_evict_without_scan(self):
+        """ the folder is scanned once, usage is tracked in memory """
+        cache = FileDocumentCache(self.folder)
+        cache.set('/tmp/0.yaml', 'stamp', {'swagger': '2.0'})
+        size = os.path.getsize(os.path.join(self.folder, self._entries()[0]))
+
+        cache = _ScanningCache(self.folder, max_size=size * 3)
+        for idx in range(1, 10):
+            cache.set('/tmp/{}.yaml'.format(idx), 'stamp', {'swagger': '2.0'})
+            # keep the first one used
+            self.assertNotEqual(cache.get('/tmp/1.yaml', 'stamp'), None)
+
+        self.assertEqual(cache.scans, 1)
+        self.assertEqual(len(self._entries()), 3)
+        self.assertNotEqual(cache.get('/tmp/1.yaml', 'stamp'), None)
+        self.assertNotEqual(cache.get('/tmp/8.yaml', 'stamp'), None)
+        self.assertNotEqual(cache.get('/tmp/9.yaml', 'stamp'), None)
+
+    def test_resolver(self):
+        """ warm start would get parsed documents from cache """
+        url = normalize_url(
+            os.path.join(
+                get_test_data_folder(version='2.0', which='yaml'),
+                'swagger.yaml'))
+
+        cold = Resolver(doc_cache=_CountingCache(self.folder))
+        spec = cold.resolve(url)
+
+        cache = _CountingCache(self.folder)
+        warm = Resolver(doc_cache=cache)
+        self.assertEqual(warm.resolve(url), spec)
+        self.assertEqual(cache.hits, 1)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import unittest
+import os
+import json
+import shutil
+import sys
+import tempfile
+
+import six
+import yaml
+
+from pyopenapi.migration.cli import main
+from ..utils import get_test_data_folder, SampleApp
+
+
+class ConvertCliTestCase(unittest.TestCase):
+    """ test case for pyopenapi-convert """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = get_test_data_folder(version='2.0', which='wordnik')
+        self.expected = SampleApp.create(
+            self.path, to_spec_version='3.0.0').root.dump()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_output(self):
+        """ write json/yaml, by the extension of output """
+        for name, load in (('out.json', json.load), ('out.yaml',
+                                                     yaml.safe_load)):
+            output = os.path.join(self.folder, name)
+            self.assertEqual(main([self.path, '-o', output]), 0)
+            with open(output, 'r') as handle:
+                self.assertEqual(load(handle), self.expected)
+
+    def test_stdout_profile(self):
+        """ write to stdout, and timings to stderr """
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = six.StringIO(), six.StringIO()
+        try:
+            main([self.path, '--profile', '--indent', '2'])
+            out, err = sys.stdout.getvalue(), sys.stderr.getvalue()
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+
+        self.assertEqual(json.loads(out), self.expected)
+        self.assertEqual([line.split()[0] for line in err.splitlines()],
+                         ['load', 'migrate', 'write', 'total'])
@@ -1,10 +1,22 @@
 # -*- coding: utf-8 -*-
 import unittest
+import hashlib
 import os
 import json
-
-from pyopenapi.migration.getter import UrlGetter, DictGetter, SimpleGetter
+import mmap
+import shutil
+import sys
+import tempfile
+
+from pyopenapi.migration.getter import (
+    Getter,
+    LocalGetter,
+    UrlGetter,
+    DictGetter,
+    SimpleGetter,
+)
 from pyopenapi.migration.resolve import Resolver
+from pyopenapi.migration.spec import FragmentInterner
 from pyopenapi.utils import compare_container
 from ..utils import get_test_data_folder, SampleApp
 
@@ -232,3 +244,139 @@ class GetterTestCase(unittest.TestCase):
         # should raise some specific error
         self.assertRaises(
             _MyCustomException, SampleApp.load, path, getter=_MyCustomGetter)
+
+    def test_parse_format(self):
+        """ make sure json/yaml are detected robustly """
+        expected = {'swagger': '2.0', 'paths': {}}
+
+        # json with leading whitespace or BOM
+        self.assertEqual(
+            Getter.parse('\n  {"swagger": "2.0", "paths": {}}'), expected)
+        self.assertEqual(
+            Getter.parse(u'\ufeff{"swagger": "2.0", "paths": {}}'), expected)
+
+        # yaml, in block and flow style
+        self.assertEqual(
+            Getter.parse('swagger: "2.0"\npaths: {}\n'), expected)
+        self.assertEqual(
+            Getter.parse('{swagger: "2.0", paths: {}}'), expected)
+        self.assertEqual(
+            Getter.parse('{swagger: "2.0", paths: {}}', fmt='yaml'), expected)
+
+        # invalid json when json is expected
+        self.assertRaises(
+            Exception, Getter.parse, '{swagger: "2.0"}', fmt='json')
+
+    def test_dict_getter_bytes(self):
+        """ bytes with BOM returned from 'load' are accepted """
+        getter = DictGetter(
+            ['/tmp/swagger.json'],
+            {'/tmp/swagger.json': u'\ufeff {"swagger": "2.0"}'.encode('utf-8')})
+        self.assertEqual(next(getter), {'swagger': '2.0'})
+
+    def test_stamp(self):
+        """ the hash of content is recorded when parsing """
+        url = 'https://test.com/swagger.json'
+        doc = {'swagger': '2.0', 'paths': {}}
+        resolver = Resolver(default_getter=DictGetter([url], {url: doc}))
+        resolver.resolve(url)
+
+        stamp = resolver.get_stamp(url)
+        self.assertNotEqual(stamp, None)
+        self.assertEqual(DictGetter([url], {url: dict(doc)}).next_stamp(),
+                         stamp)
+        self.assertNotEqual(
+            DictGetter([url], {
+                url: {
+                    'swagger': '2.0'
+                }
+            }).next_stamp(), stamp)
+
+    def test_interner(self):
+        """ strings and fragments of parsed documents are shared """
+        doc = json.dumps({
+            'definitions': {
+                'a': {
+                    'type': 'string',
+                    'description': 'x' * 100
+                },
+                'b': {
+                    'type': 'string',
+                    'description': 'x' * 100
+                },
+                'c': {
+                    '$ref': '#/definitions/a'
+                },
+            }
+        })
+        interner = FragmentInterner()
+        getter = DictGetter(['/tmp/swagger.json'], {'/tmp/swagger.json': doc})
+        getter.interner = interner
+        obj = next(getter)
+
+        defs = obj['definitions']
+        self.assertIs(defs['a'], defs['b'])
+        self.assertIs(defs['a']['type'], sys.intern('string'))
+        key = [k for k in defs['a'] if k == 'description'][0]
+        self.assertIs(key, sys.intern('description'))
+        self.assertFalse(interner.owns(defs['c']))
+        self.assertFalse(interner.owns(obj))
+
+        # passed to getters by resolver
+        url = 'https://test.com/swagger.json'
+        resolver = Resolver(
+            default_getter=DictGetter([url], {url: doc}), interner=interner)
+        obj = resolver.resolve(url + '#/definitions/b')
+        self.assertIs(obj, defs['b'])
+
+    def test_parse_buffer(self):
+        """ documents in bytes are parsed without decoding first """
+        expected = {'swagger': '2.0', 'paths': {}}
+
+        self.assertEqual(
+            Getter.parse_buffer(b'\xef\xbb\xbf\n {"swagger": "2.0", "paths": {}}'),
+            expected)
+        self.assertEqual(
+            Getter.parse_buffer(b'swagger: "2.0"\npaths: {}\n'), expected)
+        self.assertEqual(
+            Getter.parse_buffer(b'{swagger: "2.0", paths: {}}'), expected)
+        self.assertEqual(
+            Getter.parse_buffer(u'{"name": "\u4e2d\u6587"}'.encode('utf-8')),
+            {'name': u'\u4e2d\u6587'})
+        self.assertRaises(
+            Exception, Getter.parse_buffer, b'{swagger: "2.0"}', fmt='json')
+
+    def test_local_mmap(self):
+        """ large local files are memory-mapped """
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+
+        expected = {'swagger': '2.0', 'info': {'title': u'\u4e2d\u6587'}}
+        docs = {
+            'a.json': b'\xef\xbb\xbf' + json.dumps(expected).encode('utf-8'),
+            'b.yaml': u'swagger: "2.0"\ninfo:\n  title: \u4e2d\u6587\n'.encode(
+                'utf-8'),
+        }
+
+        class _Getter(LocalGetter):
+            mmap_threshold = 1
+
+        for name, content in docs.items():
+            path = os.path.join(folder, name)
+            with open(path, 'wb') as handle:
+                handle.write(content)
+
+            loaded = _Getter(path).load(path)
+            self.assertTrue(isinstance(loaded, mmap.mmap))
+            loaded.close()
+
+            getter = _Getter(path)
+            self.assertEqual(next(getter), expected)
+            self.assertEqual(getter.last_stamp,
+                             hashlib.sha1(content).hexdigest())
+            self.assertEqual(
+                _Getter(path).next_stamp(),
+                hashlib.sha1(content).hexdigest())
+
+            # the same as those not mapped
+            self.assertEqual(next(LocalGetter(path)), expected)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+import unittest
+import gzip
+import io
+import json
+import shutil
+import tempfile
+import threading
+import zlib
+
+import six
+from six.moves import BaseHTTPServer, socketserver
+
+from pyopenapi.migration.cache import MemoryResponseCache, FileResponseCache
+from pyopenapi.migration.getter import (
+    HttpGetter,
+    HttpConnectionPool,
+    _decode_content,
+)
+from pyopenapi.migration.resolve import Resolver
+
+_LAST_MODIFIED = 'Mon, 01 Jan 2018 00:00:00 GMT'
+
+_DOCS = {
+    '/api/root.json': {
+        'swagger': '2.0',
+        'definitions': {
+            'user': {
+                '$ref': 'user.yaml#/User'
+            }
+        }
+    },
+    '/api/user.yaml': u'User:\n  type: object\n  description: 中文\n',
+}
+
+
+def _gzip(body):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as handle:
+        handle.write(body)
+    return buf.getvalue()
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """ serve documents with validators and compression, and
+    record connections and requests
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.stats['connections'] += 1
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _send(self, code, headers, body=b''):
+        self.send_response(code)
+        for name, val in headers:
+            self.send_header(name, val)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        stats = self.server.stats
+        stats['requests'].append(self.path)
+
+        if self.path == '/api/moved.json':
+            self._send(301, [('Location', '/api/root.json')])
+            return
+
+        doc = _DOCS.get(self.path, None)
+        if doc is None:
+            self._send(404, [])
+            return
+
+        etag = '"{}"'.format(self.path)
+        validators = [('ETag', etag), ('Last-Modified', _LAST_MODIFIED)]
+        if self.headers.get('If-None-Match') == etag or \
+                self.headers.get('If-Modified-Since') == _LAST_MODIFIED:
+            stats['not_modified'].append(self.path)
+            self._send(304, validators)
+            return
+
+        if isinstance(doc, dict):
+            body = json.dumps(doc).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            body = doc.encode('utf-8')
+            content_type = 'application/yaml'
+
+        headers = validators + [('Content-Type', content_type)]
+        accepted = self.headers.get('Accept-Encoding', '')
+        if 'gzip' in accepted and self.server.encoding == 'gzip':
+            body = _gzip(body)
+            headers.append(('Content-Encoding', 'gzip'))
+        elif 'deflate' in accepted and self.server.encoding == 'deflate':
+            body = zlib.compress(body)
+            headers.append(('Content-Encoding', 'deflate'))
+
+        self._send(200, headers, body)
+
+
+class _Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class HttpGetterTestCase(unittest.TestCase):
+    """ test case for HttpGetter against a local http server """
+
+    def setUp(self):
+        self.server = _Server(('127.0.0.1', 0), _Handler)
+        self.server.stats = dict(
+            connections=0, requests=[], not_modified=[])
+        self.server.encoding = 'gzip'
+        self._serve()
+
+        self.base = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        self.folder = tempfile.mkdtemp()
+
+        class _Getter(HttpGetter):
+            pool = HttpConnectionPool(timeout=5)
+            response_cache = MemoryResponseCache()
+
+        self.getter = _Getter
+
+    def _serve(self):
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs=dict(poll_interval=0.05))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.getter.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.folder)
+
+    def _load(self, path):
+        return next(self.getter(self.base + path))
+
+    def test_load(self):
+        """ compressed json/yaml are loaded """
+        self.assertEqual(self._load('/api/root.json'), _DOCS['/api/root.json'])
+        self.assertEqual(
+            self._load('/api/user.yaml'),
+            {'User': {
+                'type': 'object',
+                'description': u'中文'
+            }})
+
+        self.server.encoding = 'deflate'
+        self.assertEqual(self._load('/api/root.json'), _DOCS['/api/root.json'])
+
+        # deflate without zlib header
+        self.assertEqual(
+            _decode_content(zlib.compress(b'{}')[2:-4], 'deflate'), b'{}')
+        self.assertRaises(ValueError, _decode_content, b'{}', 'br')
+
+    def test_keep_alive(self):
+        """ connections are reused """
+        for _ in six.moves.xrange(3):
+            self._load('/api/root.json')
+            self._load('/api/user.yaml')
+        self.assertEqual(len(self.server.stats['requests']), 6)
+        self.assertEqual(self.server.stats['connections'], 1)
+
+        # connections closed by server are replaced
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.server = _Server(self.server.server_address, _Handler)
+        self.server.stats = dict(
+            connections=0, requests=[], not_modified=[])
+        self.server.encoding = None
+        self._serve()
+        self.assertEqual(self._load('/api/root.json'), _DOCS['/api/root.json'])
+
+    def test_not_modified(self):
+        """ unchanged documents are not downloaded again """
+        first = self._load('/api/user.yaml')
+        self.assertEqual(self.server.stats['not_modified'], [])
+
+        self.assertEqual(self._load('/api/user.yaml'), first)
+        self.assertEqual(self.server.stats['not_modified'], ['/api/user.yaml'])
+
+        # cached in files, across getters
+        class _FileGetter(HttpGetter):
+            pool = self.getter.pool
+            response_cache = FileResponseCache(self.folder)
+
+        self.assertEqual(next(_FileGetter(self.base + '/api/user.yaml')), first)
+        self.assertEqual(next(_FileGetter(self.base + '/api/user.yaml')), first)
+        self.assertEqual(self.server.stats['not_modified'],
+                         ['/api/user.yaml', '/api/user.yaml'])
+
+    def test_redirect(self):
+        """ redirects are followed """
+        self.assertEqual(self._load('/api/moved.json'), _DOCS['/api/root.json'])
+        self.assertEqual(self.server.stats['requests'],
+                         ['/api/moved.json', '/api/root.json'])
+
+    def test_redirect_not_conditional(self):
+        """ validators of a cached response are not sent to another url
+        when redirected
+        """
+        self.getter.response_cache.set(
+            self.base + '/api/moved.json',
+            dict(
+                body='{"stale": true}',
+                etag=None,
+                last_modified=_LAST_MODIFIED,
+                content_type='application/json'))
+
+        self.assertEqual(self._load('/api/moved.json'), _DOCS['/api/root.json'])
+        self.assertEqual(self.server.stats['not_modified'], [])
+
+    def test_not_found(self):
+        """ errors are raised as HTTPError """
+        self.assertRaises(six.moves.urllib.error.HTTPError, self._load,
+                          '/api/not_found.json')
+
+        # the connection is still usable
+        self.assertEqual(self._load('/api/root.json'), _DOCS['/api/root.json'])
+        self.assertEqual(self.server.stats['connections'], 1)
+
+    def test_resolver(self):
+        """ external documents are loaded via the same connection """
+        resolver = Resolver(default_getter=self.getter, prefetch=True)
+        user = resolver.resolve(self.base + '/api/root.json#/definitions/user')
+        self.assertEqual(user, {'$ref': 'user.yaml#/User'})
+        self.assertEqual(
+            resolver.resolve(self.base + '/api/user.yaml#/User')['type'],
+            'object')
+        self.assertEqual(
+            sorted(self.server.stats['requests']),
+            ['/api/root.json', '/api/user.yaml'])
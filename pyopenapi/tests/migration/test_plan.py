@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+import unittest
+import os
+import json
+import shutil
+import tempfile
+
+from pyopenapi.migration import base as app_base
+from pyopenapi.migration.base import ApiBase
+from pyopenapi.migration.plan import ResolvePlan
+from pyopenapi.migration.scan import default_tree_traversal
+from pyopenapi.migration.versions.v3_0_0.objects import Schema
+from pyopenapi.utils import normalize_url, compare_container
+from ..utils import SampleApp
+
+
+class _CountingApp(SampleApp):
+    """ count calls to resolve_obj by JSON reference """
+
+    def __init__(self, *args, **kwargs):
+        super(_CountingApp, self).__init__(*args, **kwargs)
+        self.resolved = {}
+
+    def resolve_obj(self, jref, *args, **kwargs):
+        self.resolved[jref] = self.resolved.get(jref, 0) + 1
+        return super(_CountingApp, self).resolve_obj(jref, *args, **kwargs)
+
+
+class _PoolApp(_CountingApp):
+    """ migrate independent documents in a process pool """
+
+    # pylint: disable=super-init-not-called,non-parent-init-called
+    def __init__(self, url, url_load_hook, resolver, sep):
+        ApiBase.__init__(
+            self,
+            url,
+            url_load_hook=url_load_hook,
+            resolver=resolver,
+            sep=sep,
+            processes=2)
+
+        self.raw = None
+        self.root = None
+        self.resolved = {}
+        self.migrated = []
+
+    def migrate_obj(self, obj, jref, spec_version):
+        self.migrated.append((jref.split('#')[0], spec_version))
+        return super(_PoolApp, self).migrate_obj(obj, jref, spec_version)
+
+
+class ResolvePlanTestCase(unittest.TestCase):
+    """ test case for resolving references in batch """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _chain(self, count):
+        """ a spec referencing the first one of 'count' schemas
+        in external documents, each one references only the next one
+        """
+        for idx in range(count):
+            spec = {'type': 'object'}
+            if idx + 1 < count:
+                spec['properties'] = {
+                    'next': {
+                        '$ref': 's{}.json'.format(idx + 1)
+                    }
+                }
+            with open(os.path.join(self.folder, 's{}.json'.format(idx)),
+                      'w') as handle:
+                json.dump(spec, handle)
+
+        path = os.path.join(self.folder, 'swagger.json')
+        with open(path, 'w') as handle:
+            json.dump({
+                'swagger': '2.0',
+                'info': {
+                    'title': 'chain',
+                    'version': '1.0'
+                },
+                'paths': {},
+                'definitions': {
+                    'D0': {
+                        '$ref': 's0.json'
+                    }
+                },
+            }, handle)
+        return path
+
+    def test_order(self):
+        """ references are sorted by dependencies """
+        path = self._chain(4)
+        app = SampleApp.load(path)
+        base = normalize_url(self.folder) + '/'
+
+        plan = ResolvePlan(app, from_spec_version='2.0')
+        for idx in (0, 2, 1, 3, 2):
+            plan.add(base + 's{}.json'.format(idx), None, None)
+
+        self.assertEqual(len(plan), 4)
+        self.assertEqual(plan.order(), [
+            base + 's3.json',
+            base + 's2.json',
+            base + 's1.json',
+            base + 's0.json',
+        ])
+
+    def test_long_chain(self):
+        """ long reference chains won't hit the recursion limit, even
+        each document references only the next one
+        """
+        path = self._chain(400)
+        base = normalize_url(self.folder) + '/'
+
+        app = _CountingApp.create(path, to_spec_version='2.0')
+        schema = app.root.definitions['D0']
+        for idx in range(399):
+            schema = schema.get_attrs('migration').ref_obj
+            self.assertEqual(schema.properties['next'].ref,
+                             's{}.json'.format(idx + 1))
+            schema = schema.properties['next']
+
+        # once when planned from the root, once for its referrer
+        self.assertEqual(app.resolved[base + 's0.json'], 1)
+        self.assertEqual(app.resolved[base + 's200.json'], 2)
+
+        app = _CountingApp.create(path, to_spec_version='3.0.0')
+        schema = app.root.components.schemas['D0']
+        for idx in range(399):
+            schema = schema.get_attrs('migration').ref_obj
+            self.assertEqual(schema.properties['next'].ref,
+                             base + 's{}.json#'.format(idx + 1))
+            schema = schema.properties['next']
+
+        # the same in each spec version
+        self.assertEqual(app.resolved[base + 's0.json'], 2)
+        self.assertEqual(app.resolved[base + 's200.json'], 4)
+
+    def test_refs_in_data(self):
+        """ '$ref' under values of fields, ex. 'example', are data,
+        not references to follow
+        """
+        path = self._chain(2)
+        with open(os.path.join(self.folder, 's0.json'), 'r') as handle:
+            spec = json.load(handle)
+        data = {'$ref': 'missing.json'}
+        spec.update({
+            'example': data,
+            'default': data,
+            'enum': [data],
+            'x-data': data,
+        })
+        with open(os.path.join(self.folder, 's0.json'), 'w') as handle:
+            json.dump(spec, handle)
+        base = normalize_url(self.folder) + '/'
+
+        app = _CountingApp.create(path, to_spec_version='3.0.0')
+        self.assertEqual(
+            sorted(app.resolved),
+            [base + 's0.json', base + 's1.json'])
+        schema = app.root.components.schemas['D0']
+        self.assertEqual(
+            schema.get_attrs('migration').ref_obj.example, data)
+
+    def test_premigrate(self):
+        """ independent documents are migrated in a process pool,
+        and the result is the same as the one migrated serially
+        """
+        path = self._chain(2)
+        for idx in range(2, 6):
+            with open(os.path.join(self.folder, 's{}.json'.format(idx)),
+                      'w') as handle:
+                json.dump({
+                    'type': 'object',
+                    'properties': {
+                        'id': {
+                            'type': 'integer',
+                            'format': 'int64'
+                        },
+                        'tags': {
+                            'type': 'array',
+                            'items': {
+                                'type': 'string'
+                            }
+                        },
+                    }
+                }, handle)
+
+        with open(path, 'r') as handle:
+            spec = json.load(handle)
+        for idx in range(2, 6):
+            spec['definitions']['D{}'.format(idx)] = {
+                '$ref': 's{}.json'.format(idx)
+            }
+        with open(path, 'w') as handle:
+            json.dump(spec, handle)
+
+        app = _PoolApp.create(path, to_spec_version='3.0.0')
+        other = SampleApp.create(path, to_spec_version='3.0.0')
+
+        base = normalize_url(self.folder) + '/'
+        migrated = set(app.migrated)
+        # s0 references s1, it's not independent
+        self.assertTrue((base + 's0.json', '3.0.0') in migrated)
+        for idx in range(1, 6):
+            self.assertFalse(
+                (base + 's{}.json'.format(idx), '3.0.0') in migrated)
+
+            jref = base + 's{}.json#'.format(idx)
+            obj, _ = app.resolve_obj(jref, from_spec_version='3.0.0')
+            self.assertTrue(isinstance(obj, Schema))
+            if idx > 1:
+                self.assertEqual(obj.properties['tags'].items.type, 'string')
+
+            expected, _ = other.resolve_obj(jref, from_spec_version='3.0.0')
+            self.assertEqual(
+                sorted(compare_container(obj.dump(), expected.dump())), [])
+
+        self.assertEqual(
+            sorted(compare_container(app.root.dump(), other.root.dump())), [])
+
+    def test_premigrate_paths(self):
+        """ objects migrated in a process pool are the same as those
+        migrated in this process, including their paths
+        """
+        path = os.path.join(self.folder, 'swagger.json')
+        with open(path, 'w') as handle:
+            json.dump({
+                'swagger': '2.0',
+                'info': {
+                    'title': 'paths',
+                    'version': '1.0'
+                },
+                'paths': {},
+                'definitions': {
+                    'D{}'.format(idx): {
+                        '$ref': 'd{}.json#/definitions/T'.format(idx)
+                    }
+                    for idx in range(4)
+                },
+            }, handle)
+        for idx in range(4):
+            with open(os.path.join(self.folder, 'd{}.json'.format(idx)),
+                      'w') as handle:
+                json.dump({
+                    'definitions': {
+                        'T': {
+                            'type': 'object',
+                            'properties': {
+                                'ids': {
+                                    'type': 'array',
+                                    'items': {
+                                        'type': 'integer'
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }, handle)
+
+        pools = []
+
+        def _pool(*args, **kwargs):
+            pools.append(pool_cls(*args, **kwargs))
+            return pools[-1]
+
+        pool_cls, app_base.Pool = app_base.Pool, _pool
+        try:
+            app = _PoolApp.create(path, to_spec_version='3.0.0')
+        finally:
+            app_base.Pool = pool_cls
+        other = SampleApp.create(path, to_spec_version='3.0.0')
+
+        # one pool for the whole migration, closed when it's done
+        self.assertEqual(len(pools), 1)
+        self.assertRaises((ValueError, AssertionError), pools[0].map, len,
+                          [])
+
+        base = normalize_url(self.folder) + '/'
+        for idx in range(4):
+            jref = base + 'd{}.json#/definitions/T'.format(idx)
+            self.assertFalse((jref.split('#')[0], '3.0.0') in app.migrated)
+
+            obj, new_ref = app.resolve_obj(jref, from_spec_version='3.0.0')
+            expected, expected_ref = other.resolve_obj(
+                jref, from_spec_version='3.0.0')
+            self.assertEqual(new_ref, expected_ref)
+            self.assertEqual(
+                sorted(compare_container(obj.dump(), expected.dump())), [])
+            self.assertEqual(
+                [(p, o.get_path())
+                 for p, o in default_tree_traversal(obj, [])],
+                [(p, o.get_path())
+                 for p, o in default_tree_traversal(expected, [])])
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from pyopenapi.migration.cache import DocumentCache
+from pyopenapi.migration.getter import DictGetter
+from pyopenapi.migration.resolve import Resolver
+from pyopenapi.migration.spec import FragmentInterner
+from ..utils import get_test_data_folder, gen_test_folder_hook, SampleApp
+
+
+class _RecordingHook(object):
+    def __init__(self, folder):
+        self.hook = gen_test_folder_hook(folder)
+        self.urls = []
+
+    def __call__(self, url):
+        self.urls.append(url)
+        return self.hook(url)
+
+
+class ResolverPrefetchTestCase(unittest.TestCase):
+    """ test case for prefetching external documents """
+
+    def test_prefetch(self):
+        """ make sure external documents are fetched
+        along with the root document
+        """
+        hook = _RecordingHook(get_test_data_folder(version='2.0', which='ex'))
+        resolver = Resolver(url_load_hook=hook, prefetch=True)
+
+        resolver.resolve('file:///root/swagger.json')
+        self.assertEqual(
+            sorted(hook.urls),
+            sorted([
+                'file:///root/swagger.json',
+                'file:///full/swagger.json',
+                'file:///partial/path_item/swagger.json',
+                'file:///partial/schema/swagger.json',
+                'file:///root/path_item.json',
+            ]))
+
+        # nothing is loaded again when migrating
+        app = SampleApp.create(
+            url='file:///root/swagger.json',
+            resolver=resolver,
+            to_spec_version='2.0')
+        self.assertEqual(len(hook.urls), 5)
+        self.assertNotEqual(app.root, None)
+
+    def test_prefetch_relative(self):
+        """ relative references are fetched transitively,
+        with limited concurrency
+        """
+        hook = _RecordingHook(get_test_data_folder(version='2.0', which='ex'))
+        resolver = Resolver(
+            url_load_hook=hook, prefetch=True, fetch_concurrency=1)
+
+        resolver.resolve('file:///reuse/swagger.json')
+        self.assertEqual(
+            sorted(hook.urls),
+            sorted([
+                'file:///reuse/swagger.json',
+                'file:///reuse/definitions/definitions/models.json',
+                'file:///reuse/definitions/models.json',
+                'file:///reuse/operations.json',
+                'file:///reuse/parameters/parameters.json',
+                'file:///reuse/responses.json',
+            ]))
+
+    def test_prefetch_failure(self):
+        """ documents failed to be prefetched are left to
+        on-demand resolving
+        """
+        hook = _RecordingHook(get_test_data_folder(version='2.0', which='ex'))
+        resolver = Resolver(url_load_hook=hook)
+
+        resolver.resolve('file:///partial/schema/swagger.json')
+        resolver.prefetch('file:///not/loaded/swagger.json')
+        self.assertEqual(hook.urls, ['file:///partial/schema/swagger.json'])
+
+        self.assertRaises(Exception, resolver.resolve,
+                          'file:///not/existed/swagger.json')
+
+    def test_prefetch_initialized_getter(self):
+        """ an initialized getter is not shared by threads,
+        documents are loaded on demand in order
+        """
+        urls = [
+            'http://test.com/root.json',
+            'http://test.com/a.json',
+            'http://test.com/b.json',
+        ]
+        getter = DictGetter(
+            urls[:], {
+                urls[0]: {
+                    'definitions': {
+                        'a': {
+                            '$ref': 'a.json#/A'
+                        },
+                        'b': {
+                            '$ref': 'b.json#/B'
+                        },
+                    }
+                },
+                urls[1]: {
+                    'A': 'a'
+                },
+                urls[2]: {
+                    'B': 'b'
+                },
+            })
+        resolver = Resolver(default_getter=getter, prefetch=True)
+
+        resolver.resolve(urls[0])
+        self.assertEqual(getter.urls, urls[1:])
+        self.assertEqual(resolver.loaded_urls, [urls[0]])
+
+        self.assertEqual(resolver.resolve(urls[1] + '#/A'), 'a')
+        self.assertEqual(resolver.resolve(urls[2] + '#/B'), 'b')
+
+
+class ResolverGetterTestCase(unittest.TestCase):
+    """ test case for getters not derived from Getter """
+
+    def test_plain_iterator(self):
+        """ any iterator of documents could be a getter """
+
+        def _getter():
+            yield {'A': {'type': 'string'}}
+
+        resolver = Resolver(
+            doc_cache=DocumentCache(), interner=FragmentInterner())
+        url = 'http://test.com/root.json'
+
+        self.assertEqual(
+            resolver.resolve(url + '#/A', getter=_getter()),
+            {'type': 'string'})
+        self.assertEqual(resolver.get_stamp(url), None)
+        self.assertEqual(resolver.stamp(url, getter=_getter()), None)
@@ -2,13 +2,27 @@
 import unittest
 import weakref
 
-from pyopenapi.migration.scan import Scanner, Dispatcher, scan
+from pyopenapi.migration.scan import (
+    Scanner,
+    Dispatcher,
+    scan,
+    scan_pipeline,
+    default_tree_traversal,
+    fused_tree_traversal,
+)
 from pyopenapi.migration.versions.v1_2.objects import (
     ApiDeclaration, Authorization, Operation, ResponseMessage, Parameter)
 from pyopenapi.migration.versions.v3_0_0.objects import (
     Header as Header3,
     Parameter as Parameter3,
+    Info as Info3,
+    License as License3,
+    OpenApi as OpenApi3,
+    PathItem as PathItem3,
+    Schema as Schema3,
 )
+from pyopenapi.migration.versions.v2_0 import scanner as scanner2
+from pyopenapi.migration.versions.v3_0_0 import scanner as scanner3
 from ..utils import get_test_data_folder, SampleApp
 
 
@@ -199,3 +213,152 @@ class Scanner2TestCase(unittest.TestCase):
 
         self.assertEqual(count_param.total[Header3], 1)
         self.assertEqual(count_param.total[Parameter3], 0)
+
+    def test_pipeline(self):
+        """ make sure routes are fused into one traversal unless
+        a barrier is declared, and each route only visits objects
+        it would visit when scanned alone
+        """
+
+        class _CountSchema(object):
+            class Disp(Dispatcher):
+                pass
+
+            def __init__(self):
+                self.total = 0
+
+            @Disp.register([Schema3])
+            def _schema(self, _, __):
+                self.total += 1
+
+        header = Header3({'schema': {'type': 'string'}})
+        walks = []
+
+        def _nexter(root, leaves):
+            walks.append([])
+            for path, obj, active in fused_tree_traversal(root, leaves):
+                walks[-1].append((obj.__class__, active))
+                yield path, obj, active
+
+        routes = [_CountSchema() for _ in range(3)]
+        routes[1].__scan_leaves__ = [Header3]
+        routes[2].__scan_barrier__ = True
+
+        scan_pipeline(route=routes, root=header, nexter=_nexter)
+
+        self.assertEqual([r.total for r in routes], [1, 0, 1])
+        self.assertEqual(walks, [
+            [(Header3, (0, 1)), (Schema3, (0, ))],
+            [(Header3, (0, )), (Schema3, (0, ))],
+        ])
+
+    def test_pipeline_visits(self):
+        """ a fused pass visits fewer objects than routes scanned alone,
+        and migration scanners are fused into one pass
+        """
+        app = SampleApp.load(
+            get_test_data_folder(version='2.0', which='wordnik'))
+
+        def _visits(routes):
+            visited = []
+
+            def _nexter(root, leaves):
+                for path, obj, active in fused_tree_traversal(root, leaves):
+                    visited.append(path)
+                    yield path, obj, active
+
+            scan_pipeline(route=routes, root=app.raw, nexter=_nexter)
+            return len(visited)
+
+        norm_ref = _visits([scanner2.NormalizeRef(app.url)])
+        yaml_fixer = _visits([scanner2.YamlFixer()])
+        fused = _visits([scanner2.NormalizeRef(app.url), scanner2.YamlFixer()])
+
+        # objects beneath Operation are still visited for NormalizeRef
+        self.assertTrue(yaml_fixer < norm_ref)
+        self.assertEqual(fused, norm_ref)
+        self.assertTrue(fused < norm_ref + yaml_fixer)
+
+        for routes in ([
+                scanner2.NormalizeRef(app.url),
+                scanner2.YamlFixer(),
+                scanner2.Resolve(app),
+                scanner2.Merge(app)
+        ], [
+                scanner3.NormalizeRef(app.url),
+                scanner3.Resolve(app),
+                scanner3.Merge(app)
+        ]):
+            self.assertFalse(
+                any(getattr(r, '__scan_barrier__', False) for r in routes))
+
+    def test_register_after_scan(self):
+        """ make sure handlers registered after a scan
+        are used by later scans
+        """
+
+        class _Count(object):
+            class Disp(Dispatcher):
+                pass
+
+            def __init__(self):
+                self.total = 0
+
+        header = Header3({})
+        count = _Count()
+        scan(route=[count], root=header)
+        self.assertEqual(count.total, 0)
+
+        @_Count.Disp.register([Header3])
+        def _header(self, _, __):
+            self.total += 1
+
+        scan(route=[count], root=header)
+        self.assertEqual(count.total, 1)
+
+    def test_pruned_traversal(self):
+        """ make sure subtrees without any possible matched object
+        are skipped
+        """
+
+        class _CountLicense(object):
+            class Disp(Dispatcher):
+                pass
+
+            def __init__(self):
+                self.total = 0
+
+            @Disp.register([License3])
+            def _license(self, _, __):
+                self.total += 1
+
+        root = OpenApi3({
+            'openapi': '3.0.0',
+            'info': {
+                'title': 'test',
+                'version': '1.0',
+                'license': {
+                    'name': 'MIT'
+                },
+            },
+            'paths': {
+                '/a': {
+                    'get': {
+                        'responses': {}
+                    }
+                }
+            },
+        })
+        visited = []
+
+        def _nexter(root, leaves):
+            for path, obj in default_tree_traversal(root, leaves):
+                visited.append(obj.__class__)
+                yield path, obj
+
+        count = _CountLicense()
+        scan(route=[count], root=root, nexter=_nexter)
+        self.assertEqual(count.total, 1)
+        self.assertTrue(Info3 in visited)
+        self.assertTrue(PathItem3 in visited)
+        self.assertEqual(len(visited), 4)
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+import unittest
+import io
+import json
+import os
+import pickle
+import random
+import shutil
+import tempfile
+
+from pyopenapi.utils import compare_container
+from pyopenapi.migration.spec import map_, list_
+from pyopenapi.migration.versions.v3_0_0.objects import (
+    Reference,
+    Schema,
+    SchemaOrReference,
+)
+from ..utils import (
+    get_test_data_folder,
+    gen_test_folder_hook,
+    SampleApp,
+)
+
+
+def _create(folder):
+    return SampleApp.create(
+        url='file:///root.yml',
+        url_load_hook=gen_test_folder_hook(folder),
+        to_spec_version='3.0.0')
+
+
+def _restore(folder, snapshot, **kwargs):
+    app = SampleApp('file:///root.yml', gen_test_folder_hook(folder), None,
+                    '!##!')
+    snapshot.seek(0)
+    return app, app.load_snapshot(snapshot, **kwargs)
+
+
+class SnapshotTestCase(unittest.TestCase):
+    """ test case for snapshot of migrated objects """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        shutil.copytree(
+            get_test_data_folder(version='3.0.0', which='external'),
+            os.path.join(cls.folder, 'external'))
+        cls.folder = os.path.join(cls.folder, 'external')
+
+        cls.app = _create(cls.folder)
+        cls.snapshot = io.BytesIO()
+        cls.app.dump_snapshot(cls.snapshot, stamp='v1')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(os.path.dirname(cls.folder))
+
+    def test_restore(self):
+        """ restored objects are identical to migrated ones """
+        app, restored = _restore(self.folder, self.snapshot, stamp='v1')
+        self.assertTrue(restored)
+        self.assertEqual(app.original_spec_version, '3.0.0')
+        self.assertEqual(app.current_spec_version, '3.0.0')
+        self.assertEqual(
+            compare_container(app.root.dump(), self.app.root.dump()), [])
+
+        # resolved $ref are kept
+        schema, _ = app.resolve_obj(
+            '#/components/schemas/partial_1',
+            from_spec_version='3.0.0',
+        )
+        self.assertTrue(isinstance(schema, Reference))
+        self.assertTrue(
+            isinstance(schema.get_attrs('migration').ref_obj, Schema))
+        self.assertEqual(schema.get_attrs('migration').ref_obj.type_, 'string')
+
+        # a restored app could be dumped again
+        snapshot = io.BytesIO()
+        app.dump_snapshot(snapshot, stamp='v1')
+        _, restored = _restore(self.folder, snapshot, stamp='v1')
+        self.assertTrue(restored)
+
+    def test_stale(self):
+        """ stale snapshots are not restored """
+        _, restored = _restore(self.folder, self.snapshot, stamp='v2')
+        self.assertFalse(restored)
+
+        _, restored = _restore(self.folder, io.BytesIO(b'not a snapshot'))
+        self.assertFalse(restored)
+
+        app = SampleApp('file:///another.yml',
+                        gen_test_folder_hook(self.folder), None, '!##!')
+        self.snapshot.seek(0)
+        self.assertFalse(app.load_snapshot(self.snapshot, stamp='v1'))
+
+    def test_source_changed(self):
+        """ snapshot is stale when any source document is changed """
+        app = _create(self.folder)
+        snapshot = io.BytesIO()
+        app.dump_snapshot(snapshot)
+
+        path = os.path.join(self.folder, 'partial_1.yml')
+        with open(path, 'rb') as handle:
+            origin = handle.read()
+        try:
+            with open(path, 'ab') as handle:
+                handle.write(b'\n# changed\n')
+
+            _, restored = _restore(self.folder, snapshot)
+            self.assertFalse(restored)
+            _, restored = _restore(
+                self.folder, snapshot, check_sources=False)
+            self.assertTrue(restored)
+        finally:
+            with open(path, 'wb') as handle:
+                handle.write(origin)
+
+    def test_source_changed_before_dump(self):
+        """ sources are not loaded again when dumping, the hash of content
+        is recorded when they are parsed
+        """
+        urls = []
+        hook = gen_test_folder_hook(self.folder)
+
+        def _hook(url):
+            urls.append(url)
+            return hook(url)
+
+        app = SampleApp.create(
+            url='file:///root.yml',
+            url_load_hook=_hook,
+            to_spec_version='3.0.0')
+        loaded = len(urls)
+
+        path = os.path.join(self.folder, 'partial_1.yml')
+        with open(path, 'rb') as handle:
+            origin = handle.read()
+        try:
+            with open(path, 'ab') as handle:
+                handle.write(b'\n# changed\n')
+
+            snapshot = io.BytesIO()
+            app.dump_snapshot(snapshot)
+            self.assertEqual(len(urls), loaded)
+        finally:
+            with open(path, 'wb') as handle:
+                handle.write(origin)
+
+        # the snapshot is kept with the content before changed
+        _, restored = _restore(self.folder, snapshot)
+        self.assertTrue(restored)
+
+        with open(path, 'ab') as handle:
+            handle.write(b'\n# changed\n')
+        try:
+            _, restored = _restore(self.folder, snapshot)
+            self.assertFalse(restored)
+        finally:
+            with open(path, 'wb') as handle:
+                handle.write(origin)
+
+    def test_lazy(self):
+        """ children of lazy objects built after restored are still
+        added to the ref index
+        """
+
+        class _LazyApp(SampleApp):
+            def __init__(self, *args):
+                super(_LazyApp, self).__init__(*args, lazy=True)
+
+        hook = gen_test_folder_hook(self.folder)
+        app = _LazyApp.load('file:///root.yml', url_load_hook=hook)
+        snapshot = io.BytesIO()
+        app.dump_snapshot(snapshot)
+
+        app = _LazyApp('file:///root.yml', hook, None, '!##!')
+        snapshot.seek(0)
+        self.assertTrue(app.load_snapshot(snapshot))
+
+        jref = 'file:///root.yml#/components/parameters/test3.p1'
+        self.assertEqual(app.ref_index.get(jref, '3.0.0'), [])
+        param = app.raw.paths['/test3'].get.parameters[0]
+        self.assertEqual(app.ref_index.get(jref, '3.0.0'), [param])
+
+    def test_pickle_container(self):
+        """ classes created by map_/list_ are reused and could be pickled
+        """
+        self.assertTrue(map_(SchemaOrReference) is map_(SchemaOrReference))
+
+        obj = list_(map_(SchemaOrReference))([{
+            'a': {
+                'type': 'string'
+            }
+        }], path='#')
+        loaded = pickle.loads(pickle.dumps(obj))
+        self.assertTrue(type(loaded) is type(obj))
+        self.assertEqual(loaded.dump(), obj.dump())
+        self.assertTrue(isinstance(loaded[0]['a'], Schema))
+
+
+class LargeSnapshotTestCase(unittest.TestCase):
+    """ test case for snapshot of large, cross-referenced specs """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+
+        # a long chain of $ref, plus random ones in between
+        count = 1000
+        rnd = random.Random(0)
+        definitions = {}
+        for idx in range(count):
+            definitions['d{}'.format(idx)] = {
+                'type': 'object',
+                'properties': {
+                    'next': {
+                        '$ref': '#/definitions/d{}'.format((idx + 1) % count)
+                    },
+                    'any': {
+                        '$ref': '#/definitions/d{}'.format(
+                            rnd.randrange(count))
+                    },
+                }
+            }
+
+        with open(os.path.join(cls.folder, 'root.yml'), 'w') as handle:
+            json.dump({
+                'swagger': '2.0',
+                'info': {
+                    'title': 'large',
+                    'version': '1.0.0'
+                },
+                'paths': {},
+                'definitions': definitions,
+            }, handle)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+    def test_restore(self):
+        """ snapshot of a large spec could be written and restored """
+        app = _create(self.folder)
+        snapshot = io.BytesIO()
+        app.dump_snapshot(snapshot)
+
+        restored_app, restored = _restore(self.folder, snapshot)
+        self.assertTrue(restored)
+        self.assertEqual(
+            compare_container(restored_app.root.dump(), app.root.dump()), [])
+
+        schema, _ = restored_app.resolve_obj(
+            '#/components/schemas/d10/properties/next',
+            from_spec_version='3.0.0',
+        )
+        self.assertTrue(isinstance(schema, Reference))
+        ref_obj = schema.get_attrs('migration').ref_obj
+        self.assertTrue(isinstance(ref_obj, Schema))
+        self.assertEqual(ref_obj.get_path(), '#/components/schemas/d11')
@@ -5,8 +5,9 @@ import unittest
 import json
 
 from pyopenapi.migration.store import SpecObjStore
-from pyopenapi.migration.versions.v2_0.objects import Swagger, Info
-from ..utils import get_test_file
+from pyopenapi.migration.versions.v2_0.objects import Swagger, Info, Schema
+from pyopenapi.utils import normalize_url
+from ..utils import get_test_file, get_test_data_folder, SampleApp
 
 
 class SpecObjStoreTestCase(unittest.TestCase):
@@ -41,6 +42,36 @@ class SpecObjStoreTestCase(unittest.TestCase):
         # attemp to get its parent -> Swagger
         self.assertEqual(None, cache2.get(url, '#', version))
 
+    def test_cache_get_longest_prefix(self):
+        """ make sure the deepest cached ancestor is picked,
+        and only whole tokens of JSON pointer are matched
+        """
+        cache = SpecObjStore()
+
+        url = 'http://localhost'
+        version = '2.0'
+        obj = Swagger(
+            json.loads(get_test_file(version, 'wordnik', 'swagger.json')), '#',
+            {})
+        order = Swagger({})
+
+        cache.set(obj, url, '#', version)
+        cache.set(order, url, '#/definitions/Order', version)
+
+        self.assertEqual(id(order), id(cache.get(url, '#/definitions/Order',
+                                                 version)))
+        self.assertEqual(
+            id(obj.definitions['Pet']),
+            id(cache.get(url, '#/definitions/Pet', version)))
+
+        # '#/definitions/Ord' is not an ancestor of '#/definitions/Order'
+        cache2 = SpecObjStore()
+        cache2.set(obj.definitions['Order'], url, '#/definitions/Ord', version)
+        self.assertEqual(None, cache2.get(url, '#/definitions/Order', version))
+
+        # unknown url
+        self.assertEqual(None, cache.get('http://127.0.0.1', '#', version))
+
     def test_cache_get_under(self):
         """ check if 'get_under' works
         """
@@ -104,6 +135,34 @@ class SpecObjStoreTestCase(unittest.TestCase):
         # get with empty string is not allowed
         self.assertRaises(Exception, cache.get_under, url, '', version)
 
+    def test_cache_get_under_token_boundary(self):
+        """ siblings sharing a common string prefix are not
+        descendants, and should be kept when removing
+        """
+        cache = SpecObjStore()
+
+        url = 'http://localhost'
+        version = '2.0'
+        order, order_x = Swagger({}), Swagger({})
+
+        cache.set(order, url, '#/definitions/Order', version)
+        cache.set(order_x, url, '#/definitions/OrderX', version)
+
+        under = cache.get_under(url, '#/definitions/Order', version)
+        self.assertEqual(list(under.keys()), [''])
+        self.assertEqual(id(order), id(under['']))
+        self.assertEqual(None, cache.get(url, '#/definitions/Order', version))
+        self.assertEqual(
+            id(order_x), id(cache.get(url, '#/definitions/OrderX', version)))
+
+        # the removed JSON pointer could be cached again
+        cache.set(order, url, '#/definitions/Order', version)
+        self.assertEqual(
+            id(order), id(cache.get(url, '#/definitions/Order', version)))
+
+        # nothing cached under this JSON pointer
+        self.assertEqual({}, cache.get_under(url, '#/paths', version))
+
     def test_cache_get_until(self):
         """ make sure we could get latest object
         """
@@ -220,6 +279,34 @@ class SpecObjStoreTestCase(unittest.TestCase):
             store.relocate(url, '#/some/json/pointer', '1.2', '3.0.0'),
             '#/some3/json3/pointer')
 
+    def test_route_cached_relocation(self):
+        """ make sure relocated JSON pointers are refreshed
+        when routes are updated, and routes only match whole tokens
+        """
+        url = 'http://localhost/some/path'
+        store = SpecObjStore()
+
+        store.update_routes(url, '3.0.0', {'#/definitions': '#/schemas'})
+        self.assertEqual(
+            store.relocate(url, '#/definitions/User', '2.0', '3.0.0'),
+            '#/schemas/User')
+        self.assertEqual(
+            store.relocate(url, '#/definitions/User', '2.0', '3.0.0'),
+            '#/schemas/User')
+        self.assertEqual(
+            store.relocate(url, '#/definitionsX/User', '2.0', '3.0.0'),
+            '#/definitionsX/User')
+
+        store.update_routes(url, '3.0.0', {'#/definitions/User': '#/users'})
+        self.assertEqual(
+            store.relocate(url, '#/definitions/User', '2.0', '3.0.0'),
+            '#/users')
+
+        # nothing to patch when 'to' is not newer than 'from'
+        self.assertEqual(
+            store.relocate(url, '#/definitions/User', '3.0.0', '3.0.0'),
+            '#/definitions/User')
+
     def test_route_nested_route(self):
         """ make sure nested route works
         """
@@ -261,3 +348,29 @@ class SpecObjStoreTestCase(unittest.TestCase):
         self.assertEqual(
             store.relocate(url, '#/paths/~1p3/parameters/3', '2.0', '3.0.0'),
             '#/paths/~1p3/x-pyopenapi_internal_request_body')
+
+
+class RefIndexTestCase(unittest.TestCase):
+    """ test case for RefIndex """
+
+    def test_referrers(self):
+        """ objects with '$ref' are indexed when loading and migrating
+        """
+        path = get_test_data_folder(version='2.0', which='wordnik')
+        app = SampleApp.create(path, to_spec_version='3.0.0')
+        pet = normalize_url(path) + '#/definitions/Pet'
+
+        referrers = app.ref_index.get(pet, '2.0')
+        self.assertEqual(len(referrers), 5)
+        for obj in referrers:
+            self.assertTrue(isinstance(obj, Schema))
+            self.assertEqual(obj.ref, '#/definitions/Pet')
+        self.assertTrue(referrers[0].get_path().endswith(
+            '/paths/~1pet/put/parameters/0/schema'))
+
+        # referrers in migrated objects
+        self.assertEqual(len(app.ref_index.get(pet, '3.0.0')), 10)
+        self.assertEqual(
+            sorted(app.ref_index.targets('2.0')),
+            sorted(app.ref_index.targets('3.0.0')))
+        self.assertEqual(app.ref_index.get(pet, '1.2'), [])
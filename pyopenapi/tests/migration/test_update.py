@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import unittest
+import copy
+
+from pyopenapi.utils import normalize_url, compare_container
+from pyopenapi.migration.getter import DictGetter
+from pyopenapi.migration.resolve import Resolver
+from pyopenapi.migration.versions.v2_0.objects import Schema as Schema2
+from pyopenapi.migration.versions.v3_0_0.objects import Schema
+from ..utils import get_test_data_folder, SampleApp
+
+
+class UpdateObjTestCase(unittest.TestCase):
+    """ test case for replacing part of loaded documents """
+
+    def setUp(self):
+        self.path = get_test_data_folder(version='2.0', which='wordnik')
+        self.app = SampleApp.create(self.path, to_spec_version='3.0.0')
+
+    def test_update_schema(self):
+        """ replace a schema referenced by others """
+        spec = copy.deepcopy(self.app.raw.spec['definitions']['Pet'])
+        spec['properties']['age'] = {'type': 'integer'}
+
+        new = self.app.update_obj('#/definitions/Pet', spec)
+        self.assertTrue(isinstance(new, Schema))
+        self.assertEqual(id(new), id(self.app.root.components.schemas['Pet']))
+        self.assertEqual(new.properties['age'].type, 'integer')
+        self.assertTrue(
+            isinstance(self.app.raw.definitions['Pet'], Schema2))
+        self.assertTrue('age' in self.app.raw.definitions['Pet'].properties)
+
+        # referrers are linked to new objects
+        pet = normalize_url(self.path) + '#/definitions/Pet'
+        for version in ('2.0', '3.0.0'):
+            referrers = self.app.ref_index.get(pet, version)
+            self.assertTrue(referrers)
+            for obj in referrers:
+                ref_obj = obj.get_attrs('migration').ref_obj
+                self.assertEqual(ref_obj.properties['age'].type, 'integer')
+
+        # the same as the one created from scratch
+        getter = DictGetter(['https://petstore.com'], {
+            'https://petstore.com': copy.deepcopy(self.app.raw.spec)
+        })
+        other = SampleApp.create(
+            'https://petstore.com',
+            resolver=Resolver(default_getter=getter),
+            to_spec_version='3.0.0')
+        self.assertEqual(
+            sorted(
+                compare_container(
+                    self.app.root.dump(), other.root.dump(),
+                    exclude=['$ref'])), [])
+        self.assertEqual(
+            self.app.root.dump()['components']['schemas']['Pet'],
+            other.root.dump()['components']['schemas']['Pet'])
+
+    def test_update_not_migratable(self):
+        """ objects can't be migrated alone are rejected,
+        and nothing is changed
+        """
+        raw = copy.deepcopy(self.app.raw.dump())
+        root = copy.deepcopy(self.app.root.dump())
+        old = self.app.resolve_obj(
+            '#/paths/~1pet/put', from_spec_version='2.0')[0]
+
+        spec = copy.deepcopy(self.app.raw.spec['paths']['/pet']['put'])
+        spec['summary'] = 'changed'
+        self.assertRaises(ValueError, self.app.update_obj,
+                          '#/paths/~1pet/put', spec)
+
+        self.assertEqual(self.app.raw.dump(), raw)
+        self.assertEqual(self.app.root.dump(), root)
+        self.assertIs(
+            self.app.resolve_obj(
+                '#/paths/~1pet/put', from_spec_version='2.0')[0], old)
+
+        # the parent could still be updated
+        spec = copy.deepcopy(self.app.raw.spec['paths']['/pet'])
+        spec['put']['summary'] = 'changed'
+        self.app.update_obj('#/paths/~1pet', spec)
+        self.assertEqual(self.app.root.paths['/pet'].put.summary, 'changed')
+        self.assertEqual(self.app.raw.paths['/pet'].put.summary, 'changed')
+
+    def test_update_invalid(self):
+        """ root objects, or objects not loaded can't be updated """
+        self.assertRaises(ValueError, self.app.update_obj, '#', {})
+        self.assertRaises(ValueError, self.app.update_obj,
+                          'http://another.com/swagger.json#/definitions/Pet',
+                          {})
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import unittest
+import json
+
+import six
+import yaml
+
+from pyopenapi.migration.writer import iter_json, write_json, write_yaml
+from ..utils import get_test_data_folder, SampleApp
+
+
+class WriterTestCase(unittest.TestCase):
+    """ test case for writing spec objects without dumping them """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.apps = [
+            SampleApp.create(
+                get_test_data_folder(version='1.2', which='wordnik'),
+                to_spec_version='2.0'),
+            SampleApp.create(
+                get_test_data_folder(version='2.0', which='wordnik'),
+                to_spec_version='3.0.0'),
+        ]
+
+    def test_json(self):
+        """ the same as the result of dump() """
+        for app in self.apps:
+            for indent in (None, 2):
+                handle = six.StringIO()
+                write_json(app.root, handle, indent=indent)
+                self.assertEqual(
+                    json.loads(handle.getvalue()), app.root.dump())
+
+    def test_json_text(self):
+        """ the same text as json.dumps for plain containers """
+        obj = {'a': [1, 2.5, None, True, u'é'], 'b': {}, 'c': []}
+        for indent, separators in ((None, (',', ':')), (4, (',', ': '))):
+            self.assertEqual(''.join(iter_json(obj, indent=indent)),
+                             json.dumps(
+                                 obj, indent=indent, separators=separators))
+
+    def test_json_keys(self):
+        """ keys are converted the same way as json.dumps """
+        obj = {True: 1, False: 2, None: 3, 200: 4, 1.5: 5, u'é': 6}
+        self.assertEqual(''.join(iter_json(obj)),
+                         json.dumps(obj, separators=(',', ':')))
+
+        self.assertRaises(TypeError, ''.join, iter_json({(1, 2): 1}))
+
+    def test_yaml(self):
+        """ scalars are quoted when needed """
+        for app in self.apps:
+            handle = six.StringIO()
+            write_yaml(app.root, handle)
+            self.assertEqual(
+                yaml.safe_load(handle.getvalue()), app.root.dump())
+
+        obj = {'200': 'yes', 'a': ['1', 1, 1e-05, None, 'x: y'], 'b': {}}
+        handle = six.StringIO()
+        write_yaml(obj, handle)
+        self.assertEqual(yaml.safe_load(handle.getvalue()), obj)
+
+    def test_yaml_text(self):
+        """ the same text as yaml.safe_dump, keys are sorted """
+        obj = {'b': 1, 'a': {'d': [1, {'z': 1, 'y': 2}], 'c': None}}
+        for root in [app.root for app in self.apps] + [obj]:
+            handle = six.StringIO()
+            write_yaml(root, handle)
+            expected = root if isinstance(root, dict) else root.dump()
+            self.assertEqual(handle.getvalue(),
+                             yaml.safe_dump(expected, default_flow_style=False))
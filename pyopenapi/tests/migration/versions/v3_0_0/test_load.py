@@ -20,7 +20,8 @@ class Load_3_0_0_SpecTestCase(unittest.TestCase):
                     get_test_file(
                         version='3.0.0',
                         which='openapi',
-                        file_name='api-with-examples.yaml')),
+                        file_name='api-with-examples.yaml'),
+                    Loader=yaml.SafeLoader),
                 path='#')
         except:
             self.fail('unable to load api-with-examples.yaml')
@@ -35,7 +36,8 @@ class Load_3_0_0_SpecTestCase(unittest.TestCase):
                     get_test_file(
                         version='3.0.0',
                         which='openapi',
-                        file_name='petstore-expanded.yaml')),
+                        file_name='petstore-expanded.yaml'),
+                    Loader=yaml.SafeLoader),
                 path='#')
         except:
             self.fail('unable to load petstore-expanded.yaml')
@@ -50,7 +52,8 @@ class Load_3_0_0_SpecTestCase(unittest.TestCase):
                     get_test_file(
                         version='3.0.0',
                         which='openapi',
-                        file_name='petstore.yaml')),
+                        file_name='petstore.yaml'),
+                    Loader=yaml.SafeLoader),
                 path='#')
         except:
             self.fail('unable to load petstore.yaml')
@@ -64,7 +67,8 @@ class Load_3_0_0_SpecTestCase(unittest.TestCase):
                 yaml.load(
                     get_test_file(
                         version='3.0.0', which='openapi',
-                        file_name='uber.yaml')),
+                        file_name='uber.yaml'),
+                    Loader=yaml.SafeLoader),
                 path='#')
         except:
             self.fail('unable to load uber.yaml')
@@ -79,7 +83,8 @@ class Load_3_0_0_SpecTestCase(unittest.TestCase):
                     get_test_file(
                         version='3.0.0',
                         which='openapi',
-                        file_name='link-example.yaml')),
+                        file_name='link-example.yaml'),
+                    Loader=yaml.SafeLoader),
                 path='#')
         except:
             self.fail('unable to load link-example.yaml')
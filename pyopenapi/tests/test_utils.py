@@ -174,6 +174,22 @@ class SwaggerUtilsTestCase(unittest.TestCase):
         self.assertEqual(
             utils.normalize_jr('#/definitions/User'), '#/definitions/User')
 
+    def test_normalize_jr_root(self):
+        """ relative references in documents at the root of a server,
+        no '//' in the path
+        """
+        self.assertEqual(
+            utils.normalize_jr('User.json#/User',
+                               'http://test.com/swagger.json'),
+            'http://test.com/User.json#/User')
+        self.assertEqual(
+            utils.normalize_jr('definitions/User.json',
+                               'https://test.com/swagger.json'),
+            'https://test.com/definitions/User.json')
+        self.assertEqual(
+            utils.normalize_jr('User.json', 'file:///swagger.json'),
+            'file:///User.json')
+
     def test_get_swagger_version(self):
         self.assertEqual(
             utils.get_swagger_version({
@@ -125,9 +125,15 @@ class SampleApp(ApiBase):
     """ app for test
     """
 
-    def __init__(self, url, url_load_hook, resolver, sep):
+    __snapshot_fields__ = ('raw', 'root')
+
+    def __init__(self, url, url_load_hook, resolver, sep, **kwargs):
         super(SampleApp, self).__init__(
-            url, url_load_hook=url_load_hook, resolver=resolver, sep=sep)
+            url,
+            url_load_hook=url_load_hook,
+            resolver=resolver,
+            sep=sep,
+            **kwargs)
 
         self.raw = None
         self.root = None
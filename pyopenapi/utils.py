@@ -3,6 +3,7 @@ from __future__ import absolute_import
 import sys
 import re
 import os
+import posixpath
 import functools
 import pkgutil
 import distutils
@@ -266,8 +267,9 @@ def normalize_jr(json_ref, url=None):
             # it's the path of relative file
             url_part = six.moves.urllib.parse.urlunparse(
                 url_parsed[:2] +
-                ('/'.join([os.path.dirname(url_parsed.path), url_part]),
-                 ) + url_parsed[3:])
+                (posixpath.join(
+                    posixpath.dirname(url_parsed.path), url_part), ) +
+                url_parsed[3:])
             url_part = derelativise_url(url_part)
     else:
         url_part = url
@@ -5,6 +5,7 @@ version = open('pyopenapi/VERSION', 'r').readline().strip()
 setup(
     name = 'pyopenapi',
     packages = find_packages(exclude=['*.tests.*']),
+    package_data = {'pyopenapi': ['VERSION']},
     version = version,
     description = 'Library for developing backward-compatible tools on OpenAPI',
     author = 'Mission Liao',
@@ -23,6 +24,11 @@ setup(
         'Programming Language :: Python :: 3.4',
         'Topic :: Software Development :: Libraries :: Python Modules',
     ],
-    install_requires = ['six >= 1.7.2', 'pyaml>=15.03.1', 'validate_email']
+    install_requires = ['six >= 1.7.2', 'pyaml>=15.03.1', 'validate_email'],
+    entry_points = {
+        'console_scripts': [
+            'pyopenapi-convert = pyopenapi.migration.cli:main',
+        ],
+    },
 )
 